@@ -1,41 +1,42 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
 from app.core.config import settings
-from app.db.session import get_db_connection
+from app.core.principal import get_principal, is_active
+from app.core.security import decode_access_token, oauth2_scheme
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
-
-async def get_current_user(token: str = Depends(oauth2_scheme), db = Depends(get_db_connection)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        payload = decode_access_token(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-        
-    async with db.cursor() as cursor:
-        await cursor.execute(
-            "SELECT id, email, firstname, lastname FROM fos_user WHERE (email = %s OR username = %s) AND is_valid = TRUE AND enabled = TRUE",
-            (email, email)
-        )
-        user = await cursor.fetchone()
-        
+
+    # Signed snapshot in the token (opt-in), otherwise the cached principal;
+    # fos_user is only queried on a cache miss
+    user = payload.get("principal") if settings.JWT_EMBED_PRINCIPAL else None
     if user is None:
+        user = await get_principal(email)
+
+    if user is None or not is_active(user):
         raise credentials_exception
-        
-    return {
-        "id": user[0],
-        "email": user[1],
-        "firstname": user[2],
-        "lastname": user[3]
-    }
+
+    return user
+
+def require_roles(*roles: str):
+    """Dependency: the current user, who must have at least one of the roles (403 otherwise)"""
+    async def check_roles(user = Depends(get_current_user)):
+        if not set(roles) & set(user.get("roles", ())):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+        return user
+    return check_roles
 
 # For private endpoints
 def get_auth_user():
@@ -47,4 +48,4 @@ async def get_optional_user(
 ):
     if not token:
         return None
-    return await get_current_user(token) 
\ No newline at end of file
+    return await get_current_user(token)
@@ -1,6 +1,19 @@
-from fastapi import Depends
-from app.core.cache import get_cached_data, set_cached_data, invalidate_cache, clear_cache
-from typing import Any, Optional, Callable
+from fastapi import Depends, Request, Response
+from fastapi.encoders import jsonable_encoder
+from functools import wraps
+import inspect
+import logging
+from app.core.cache import get_cached_data, set_cached_data, invalidate_cache, clear_cache, build_cache_key
+from app.core.config import settings
+from app.core.serialization import RawJSONResponse
+from app.db.repositories.translation import negotiate_locale
+from typing import Any, Optional, Callable, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_REQUEST_PARAM = "cache_request__"
+# Cached body of a handler that returned an already-encoded JSON response
+_RAW_JSON = "__raw_json__"
 
 def get_cache(
     key: str,
@@ -9,12 +22,12 @@ def get_cache(
 ):
     """
     Cache dependency factory.
-    
+
     Args:
         key: Cache key
         expire: Cache expiration in seconds
         key_builder: Optional function to build dynamic cache key
-        
+
     Returns:
         Cache dependency function
     """
@@ -25,15 +38,107 @@ def get_cache(
     ) -> Any:
         # Build cache key if key_builder is provided
         cache_key = key_builder(*args, **kwargs) if key_builder else key
-        
+
         # Try to get from cache
         cached_data = await get_cached_data(cache_key)
         if cached_data is not None:
             return cached_data
-            
+
         # If not in cache, get fresh data
         data = await get_data(*args, **kwargs)
         await set_cached_data(cache_key, data, expire)
         return data
-        
-    return cache_dependency 
\ No newline at end of file
+
+    return cache_dependency
+
+def inject_parameter(signature: inspect.Signature, name: str, annotation: type) -> Tuple[inspect.Signature, str, bool]:
+    """
+    Make FastAPI inject `annotation` (Request, Response...) into a wrapped handler.
+
+    FastAPI injects a single parameter per such type, so an existing one (declared
+    by the handler or by another decorator) is reused. Returns the signature, the
+    parameter name and whether the wrapper added it (and must pop it from kwargs).
+    """
+    for parameter in signature.parameters.values():
+        if parameter.annotation is annotation:
+            return signature, parameter.name, False
+    signature = signature.replace(parameters=[
+        *signature.parameters.values(),
+        inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=annotation)
+    ])
+    return signature, name, True
+
+def request_locale(request: Request) -> str:
+    """Translation locale negotiated from Accept-Language (TRANSLATION_DEFAULT_LOCALE if none is supported)"""
+    return negotiate_locale(request.headers.get("accept-language"))
+
+def build_route_cache_key(namespace: str, request: Request) -> str:
+    """Cache key made of the route namespace, path params, sorted query params and locale"""
+    path_params = ",".join(f"{k}={v}" for k, v in sorted(request.path_params.items()))
+    query_params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return build_cache_key("route", namespace, path_params, query_params, request_locale(request))
+
+def cached_route(
+    namespace: str,
+    expire: int = settings.CACHE_DEFAULT_EXPIRE,
+    tags: Sequence[str] = ()
+):
+    """
+    Declarative response cache for a route handler.
+
+    The JSON-encoded result is stored in Redis under a key built from the
+    route namespace, path/query params and request locale, and registered
+    under every tag so write endpoints can invalidate it with invalidate_tags().
+    Handlers returning a JSON Response (see app.core.serialization) have their
+    encoded body cached and served as is. Cache failures never fail the request.
+
+    Args:
+        namespace: Route identifier used in the cache key
+        expire: Cache expiration in seconds
+        tags: Tag templates formatted with the handler's arguments,
+            e.g. "answer_type:{answer_type_id}"
+
+    Example:
+        @router.get("/answer-types/{answer_type_id}")
+        @cached_route("answer_type:detail", tags=["answer_type:{answer_type_id}"])
+        async def get_answer_type(answer_type_id: int, db=Depends(get_db_connection)): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        # Let FastAPI inject the Request without the handler having to declare it
+        signature, request_param, owns_request = inject_parameter(inspect.signature(func), _REQUEST_PARAM, Request)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs.pop(request_param) if owns_request else kwargs[request_param]
+            cache_key = build_route_cache_key(namespace, request)
+            try:
+                cached_data = await get_cached_data(cache_key)
+                if isinstance(cached_data, dict) and _RAW_JSON in cached_data:
+                    return RawJSONResponse(content=cached_data[_RAW_JSON])
+                if cached_data is not None:
+                    return cached_data
+            except Exception as e:
+                logger.warning("Cache read failed for %s: %s", cache_key, e)
+
+            result = await func(*args, **kwargs)
+            if isinstance(result, Response):
+                if result.status_code != 200 or result.media_type != "application/json":
+                    return result
+                cached_data = {_RAW_JSON: result.body.decode()}
+            else:
+                cached_data = jsonable_encoder(result)
+            try:
+                await set_cached_data(
+                    cache_key,
+                    cached_data,
+                    expire,
+                    tags=[tag.format(**kwargs) for tag in tags]
+                )
+            except Exception as e:
+                logger.warning("Cache write failed for %s: %s", cache_key, e)
+            return result
+
+        wrapper.__signature__ = signature
+        return wrapper
+
+    return decorator
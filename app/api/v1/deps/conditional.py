@@ -0,0 +1,131 @@
+from fastapi import Request, Response, status
+from functools import wraps
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib
+import inspect
+import logging
+from app.api.v1.deps.cache import inject_parameter
+from app.core.cache import get_cached_data, set_cached_data
+from app.core.config import settings
+from typing import Any, Awaitable, Callable, NamedTuple, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+_REQUEST_PARAM = "conditional_request__"
+_RESPONSE_PARAM = "conditional_response__"
+
+class Validator(NamedTuple):
+    """Validators of the representation a handler would return"""
+    etag: str
+    last_modified: Optional[datetime] = None
+
+def make_etag(*parts: Any) -> str:
+    """Strong, opaque entity tag derived from the given parts"""
+    digest = hashlib.blake2b("\x1f".join(str(part) for part in parts).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+def http_date(value: datetime) -> str:
+    """IMF-fixdate of a datetime (naive values are UTC, like the update_date columns)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/"x" matches "x"
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+def is_not_modified(request: Request, validator: Validator) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no If-None-Match is sent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, validator.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or validator.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    last_modified = validator.last_modified
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have a one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+def _validator_headers(validator: Validator) -> dict:
+    headers = {"ETag": validator.etag}
+    if validator.last_modified is not None:
+        headers["Last-Modified"] = http_date(validator.last_modified)
+    return headers
+
+async def cached_version(
+    key: str,
+    load: Callable[[], Awaitable[Optional[Any]]],
+    expire: int = settings.CACHE_DEFAULT_EXPIRE,
+    tags: Sequence[str] = ()
+) -> Optional[Any]:
+    """
+    Version data (revision, timestamps, counts...) from cache, loaded on a miss.
+    Register it under the same tags as the cached responses so writes invalidate both.
+    Cache failures never fail the request; None results are not cached.
+    """
+    try:
+        version = await get_cached_data(key)
+        if version is not None:
+            return version
+    except Exception as e:
+        logger.warning("Cache read failed for %s: %s", key, e)
+
+    version = await load()
+    if version is not None:
+        try:
+            await set_cached_data(key, version, expire, tags=tags)
+        except Exception as e:
+            logger.warning("Cache write failed for %s: %s", key, e)
+    return version
+
+def conditional_route(validate: Callable[..., Awaitable[Optional[Validator]]], vary: Sequence[str] = ()):
+    """
+    Conditional GET for a route handler.
+
+    `validate` receives the Request and the handler's arguments and returns the
+    validators of the current representation (or None, e.g. when the resource does
+    not exist). If the request's If-None-Match / If-Modified-Since match, a 304 is
+    returned without calling the handler; otherwise ETag and Last-Modified are
+    added to the handler's response. Put it above @cached_route so 304s skip the
+    response cache as well. `vary` lists the request headers the representation
+    depends on (they must also feed the ETag).
+
+    Example:
+        @router.get("/answer-types/{answer_type_id}")
+        @conditional_route(answer_type_validator, vary=["Accept-Language"])
+        @cached_route("answer_type:detail", tags=["answer_type:{answer_type_id}"])
+        async def get_answer_type(answer_type_id: int, db=Depends(get_db_connection)): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        signature, request_param, owns_request = inject_parameter(inspect.signature(func), _REQUEST_PARAM, Request)
+        signature, response_param, owns_response = inject_parameter(signature, _RESPONSE_PARAM, Response)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs.pop(request_param) if owns_request else kwargs[request_param]
+            response: Response = kwargs.pop(response_param) if owns_response else kwargs[response_param]
+            validator = await validate(request, **{name: value for name, value in kwargs.items() if name != request_param})
+            if validator is None:
+                return await func(*args, **kwargs)
+            headers = _validator_headers(validator)
+            if vary:
+                headers["Vary"] = ", ".join(vary)
+            if is_not_modified(request, validator):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            result = await func(*args, **kwargs)
+            # FastAPI only merges the injected response's headers into responses it builds
+            (result if isinstance(result, Response) else response).headers.update(headers)
+            return result
+
+        wrapper.__signature__ = signature
+        return wrapper
+
+    return decorator
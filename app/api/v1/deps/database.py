@@ -1,14 +1,11 @@
-from fastapi import Depends
-from app.db.session import get_db_connection
+from typing import AsyncIterator
+from app.db.session import acquire_connection
 from aiomysql import Connection
 
-async def get_db() -> Connection:
+async def get_db() -> AsyncIterator[Connection]:
     """
     Database connection dependency.
-    Yields a database connection and ensures it's closed after use.
+    Yields a pooled connection and ensures it's returned to the pool after use.
     """
-    conn = await get_db_connection()
-    try:
+    async with acquire_connection() as conn:
         yield conn
-    finally:
-        conn.close() 
\ No newline at end of file
@@ -1,12 +1,12 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from app.core.security import create_access_token, verify_password
+from app.core.security import create_access_token, verify_password_async
 from app.db.session import get_db_connection
 from app.core.config import settings
-import bcrypt
-from ldap3 import Server, Connection, ALL
-from ldap3.core.exceptions import LDAPException, LDAPBindError
+from app.core.errors import AppError
+from app.core.ldap_auth import ldap_authenticate
+from app.core.principal import get_principal, principal_claims
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,68 +18,55 @@ async def login(
     db = Depends(get_db_connection)
 ):
     try:
-        logger.info(f"Login attempt for user: {form_data.username}")
-        
+        logger.debug("Login attempt for user: %s", form_data.username)
+
         # Get user from database
         async with db.cursor() as cursor:
             await cursor.execute(
-                "SELECT id, email, password, ldap_user FROM fos_user WHERE (email = %s OR username = %s) AND is_valid = TRUE AND enabled = TRUE",
+                "SELECT id, email, password, ldap_user, ldap_server_id FROM fos_user WHERE (email = %s OR username = %s) AND is_valid = TRUE AND enabled = TRUE",
                 (form_data.username, form_data.username)
             )
             user = await cursor.fetchone()
-            logger.info(f"User query result: {user is not None}")
 
         if not user:
-            logger.warning(f"User not found: {form_data.username}")
+            logger.warning("Login failed: user not found: %s", form_data.username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        user_id, email, password_hash, ldap_user = user            
+        user_id, email, password_hash, ldap_user, ldap_server_id = user
         password = str(form_data.password)  # Cast to str to fix type issues
-        logger.info(f"User found - ID: {user_id}, LDAP: {ldap_user}")
 
         if ldap_user:
-            logger.info("Attempting LDAP authentication")
-            async with db.cursor() as cursor:
-                await cursor.execute(
-                    "SELECT url, bind_dn, password, user_base_dn FROM ldap_servers WHERE id = 1"
-                )
-                ldap_server = await cursor.fetchone()
-                ldap_url, bind_dn, bind_pw, user_base_dn = ldap_server
-
-            try:
-                # Direct bind like PHP version
-                server = Server(ldap_url, get_info=ALL)
-                conn = Connection(server, user=user_base_dn, password=form_data.password, auto_bind=True)
-                conn.unbind()
-                logger.info("LDAP authentication successful")
-            except (LDAPException, LDAPBindError) as e:
-                logger.error(f"LDAP authentication failed: {str(e)}")
+            logger.debug("Attempting LDAP authentication (server %s)", ldap_server_id or settings.LDAP_DEFAULT_SERVER_ID)
+            if not await ldap_authenticate(db, ldap_server_id, password):
+                logger.warning("Login failed: LDAP authentication failed for user %s", user_id)
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="LDAP authentication failed",
                     headers={"WWW-Authenticate": "Bearer"},
                 )
-        else:
-            logger.info("Attempting local password authentication")
-            if not verify_password(password, password_hash):
-                logger.warning("Local password authentication failed")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Incorrect email or password",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            logger.info("Local password authentication successful")
+        elif not await verify_password_async(password, password_hash):
+            logger.warning("Login failed: wrong password for user %s", user_id)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Incorrect email or password",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
         # Create access token
+        token_data = {"sub": email}  # use email as subject
+        if settings.JWT_EMBED_PRINCIPAL:
+            principal = await get_principal(email)
+            if principal is not None:
+                token_data.update(principal_claims(principal))
         access_token = create_access_token(
-            data={"sub": email},  # use email as subject
+            data=token_data,
             expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         )
-        logger.info("Access token created successfully")
+        logger.info("Login succeeded for user %s (%s)", user_id, "ldap" if ldap_user else "local")
 
         return {
             "access_token": access_token,
@@ -90,15 +77,8 @@ async def login(
             }
         }
         
-    except HTTPException:
+    except (HTTPException, AppError):
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in login: {str(e)}", exc_info=True)
+        logger.exception("Unexpected error in login: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    # Symfony uses bcrypt with the format "$2y$" while Python's bcrypt uses "$2b$"
-    # We need to replace the prefix to make it compatible
-    if hashed_password.startswith('$2y$'):
-        hashed_password = '$2b$' + hashed_password[4:]
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8')) 
\ No newline at end of file
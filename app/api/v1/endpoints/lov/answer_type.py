@@ -1,78 +1,384 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from app.models.lov.answer_type import AnswerType, AnswerTypeCreate, UserShort
-from app.db.session import get_db_connection
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Literal, Optional, Tuple
+from app.models.lov.answer_type import (
+    AnswerType, AnswerTypeCreate, AnswerTypeImport, AnswerTypeImportReport, AnswerTypePage,
+    AnswerTypeRecord, AnswerTypeRecordPage, UserShort
+)
+from app.db.repositories.lov.answer_type import (
+    ANSWER_TYPE_ITEM_TAG, ANSWER_TYPE_LIST_TAG, EXPORT_COLUMNS, AnswerTypeFilter, answer_types
+)
+from app.db.repositories.lov.answer_type_search import answer_type_search
+from app.db.session import acquire_connection, get_db_connection
 from app.api.v1.deps.auth import get_current_user
+from app.api.v1.deps.cache import cached_route, request_locale
+from app.api.v1.deps.conditional import Validator, cached_version, conditional_route, make_etag
+from app.core.cache import build_cache_key
+from app.core.config import settings
+from app.core.errors import ValidationError
+from app.core.serialization import json_response
+from contextlib import aclosing
 from datetime import datetime
+from pydantic import ValidationError as PydanticValidationError
 from slugify import slugify
+import asyncio
+import codecs
+import csv
+import io
+import json
+import logging
+import time
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
-@router.get("/answer-types", response_model=List[AnswerType])
-async def list_answer_types(db=Depends(get_db_connection)):
+async def answer_types_validator(request: Request, db, **_) -> Validator:
+    """Collection validators: a table fingerprint plus the query (filters, cursor, size) and locale"""
+    async def load():
+        async with db.cursor() as cursor:
+            await cursor.execute("SELECT MAX(update_date), COUNT(*) FROM answer_type")
+            last_update, count = await cursor.fetchone()
+        return [last_update.isoformat() if last_update else None, count]
+
+    last_update, count = await cached_version(
+        build_cache_key("answer_type", "fingerprint"), load, tags=[ANSWER_TYPE_LIST_TAG]
+    )
+    query = sorted(request.query_params.multi_items())
+    return Validator(
+        make_etag("answer_types", last_update, count, query, request_locale(request)),
+        datetime.fromisoformat(last_update) if last_update else None
+    )
+
+async def answer_type_validator(request: Request, answer_type_id: int, db, **_) -> Optional[Validator]:
+    """Item validators, from a primary-key lookup (no joins); None if the answer type does not exist"""
+    async def load():
+        async with db.cursor() as cursor:
+            await cursor.execute("SELECT revision, update_date FROM answer_type WHERE id = %s", (answer_type_id,))
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        return [row[0], row[1].isoformat() if row[1] else None]
+
+    version = await cached_version(
+        build_cache_key("answer_type", "version", answer_type_id), load,
+        tags=[ANSWER_TYPE_ITEM_TAG.format(answer_type_id=answer_type_id)]
+    )
+    if version is None:
+        return None
+    revision, last_update = version
+    # disable/enable do not bump revision, so update_date is part of the tag too
+    return Validator(
+        make_etag("answer_type", answer_type_id, revision, last_update, request_locale(request)),
+        datetime.fromisoformat(last_update) if last_update else None
+    )
+
+@router.get("/answer-types", response_model=AnswerTypePage)
+@conditional_route(answer_types_validator, vary=["Accept-Language"])
+@cached_route("answer_type:list", tags=[ANSWER_TYPE_LIST_TAG])
+async def list_answer_types(
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Page size"),
+    page_cursor: Optional[str] = Query(None, alias="cursor", description="next_cursor of the previous page"),
+    is_valid: Optional[bool] = Query(None, description="Only valid (true) or disabled (false) answer types"),
+    updated_from: Optional[datetime] = Query(None, description="update_date >= this value"),
+    updated_to: Optional[datetime] = Query(None, description="update_date < this value"),
+    title_prefix: Optional[str] = Query(None, min_length=1, description="Title starts with"),
+    *,
+    request: Request,
+    db=Depends(get_db_connection)
+):
     """
-    Retrieve all answer types with their French translations.
-    
+    Retrieve a page of answer types with their French translations, plus the
+    translations of the locale negotiated from Accept-Language.
+
+    Pages are ordered by (sort, id) and use keyset pagination, so each page
+    costs the same whatever its position in the catalog.
+
+    Example:
+        GET /answer-types?limit=2&is_valid=true
+        -> {"items": [...], "next_cursor": "WzEsMTJd"}
+        GET /answer-types?limit=2&is_valid=true&cursor=WzEsMTJd
+
     Returns:
-        List[AnswerType]: List of all answer types with translations
+        AnswerTypePage: The page of answer types and the cursor of the next page
     """
-    async with db.cursor() as cursor:
-        # First get all answer types
-        await cursor.execute("""
-            SELECT
-                at.id,
-                cu.id as create_user_id, cu.firstname as create_user_firstname, cu.lastname as create_user_lastname,
-                uu.id as update_user_id, uu.firstname as update_user_firstname, uu.lastname as update_user_lastname,
-                at.title, at.description, at.keywords, at.sort, at.revision, at.create_date, at.update_date, at.is_valid, at.conditional
-            FROM answer_type at
-            LEFT JOIN fos_user cu ON at.create_user_id = cu.id
-            LEFT JOIN fos_user uu ON at.update_user_id = uu.id
-        """)
-        rows = await cursor.fetchall()
-        
-        # Get French translations separately
-        if rows:
-            answer_type_ids = [str(row[0]) for row in rows]
-            placeholders = ','.join(['%s'] * len(answer_type_ids))
-            await cursor.execute(f"""
-                SELECT foreign_key, content 
-                FROM ext_translations 
-                WHERE object_class LIKE %s
-                AND field = %s
-                AND locale = %s
-                AND foreign_key IN ({placeholders})
-            """, ('%AnswerType%', 'title', 'fr', *answer_type_ids))
-            translations = {str(row[0]): row[1] for row in await cursor.fetchall()}
+    items, next_cursor = await answer_types.list(
+        db,
+        AnswerTypeFilter(is_valid, updated_from, updated_to, title_prefix),
+        page_cursor=page_cursor,
+        limit=limit,
+        locale=request_locale(request)
+    )
+    return json_response({"items": items, "next_cursor": next_cursor}, AnswerTypeRecordPage)
+
+@router.get("/answer-types/search", response_model=AnswerTypePage)
+async def search_answer_types(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for; accents are ignored and words match as prefixes"),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Page size"),
+    page_cursor: Optional[str] = Query(None, alias="cursor", description="next_cursor of the previous page"),
+    is_valid: Optional[bool] = Query(None, description="Only valid (true) or disabled (false) answer types"),
+    *,
+    request: Request,
+    db=Depends(get_db_connection)
+):
+    """
+    Search answer types by title (and its translations), keywords and description,
+    most relevant first. Every word of `q` must match.
+
+    Example:
+        GET /answer-types/search?q=choix%20mult&limit=10
+        -> {"items": [...], "next_cursor": "WzEuMjUsMTJd"}
+
+    Returns:
+        AnswerTypePage: The page of matching answer types and the cursor of the next page
+    """
+    items, next_cursor = await answer_type_search.search(
+        db, q, is_valid=is_valid, page_cursor=page_cursor, limit=limit, locale=request_locale(request)
+    )
+    return json_response({"items": items, "next_cursor": next_cursor}, AnswerTypeRecordPage)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8"
+}
+
+def _encode_records(export_format: str, records: List[dict]) -> str:
+    if export_format == "ndjson":
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS).writerows(records)
+    return buffer.getvalue()
+
+async def _stream_answer_types(export_format: str, filters: AnswerTypeFilter):
+    """
+    Yield the export chunk by chunk. The first chunk (the CSV header, or an
+    empty string) is produced once the query is running, so the caller can
+    surface connection errors before the response starts.
+    """
+    # The unbuffered result set keeps its connection busy until fully read:
+    # translations are looked up on a second connection
+    async with (
+        acquire_connection() as db,
+        acquire_connection() as lookup_db,
+        aclosing(answer_types.stream(db, lookup_db, filters)) as records
+    ):
+        first_records = await anext(records, None)
+        if export_format == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue()
         else:
-            translations = {}
-    
-    return [
-        AnswerType(
-            id=row[0],
-            create_user=UserShort(
-                user_id=row[1], firstname=row[2], lastname=row[3]
-            ) if row[1] else None,
-            update_user=UserShort(
-                user_id=row[4], firstname=row[5], lastname=row[6]
-            ) if row[4] else None,
-            title=row[7],
-            title_fr=translations.get(str(row[0])),
-            description=row[8],
-            keywords=row[9],
-            sort=row[10],
-            revision=row[11],
-            create_date=row[12],
-            update_date=row[13],
-            is_valid=bool(row[14]),
-            conditional=row[15]
+            yield ""
+        if first_records is not None:
+            yield _encode_records(export_format, first_records)
+            async for chunk in records:
+                yield _encode_records(export_format, chunk)
+
+@router.get("/answer-types/export")
+async def export_answer_types(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson or csv"),
+    is_valid: Optional[bool] = Query(None, description="Only valid (true) or disabled (false) answer types"),
+    updated_from: Optional[datetime] = Query(None, description="update_date >= this value"),
+    updated_to: Optional[datetime] = Query(None, description="update_date < this value")
+):
+    """
+    Stream every answer type (with its French title) as NDJSON or CSV, ordered by id.
+
+    Rows are read through a server-side cursor EXPORT_CHUNK_SIZE at a time, so
+    memory stays flat whatever the size of the catalog.
+
+    Example:
+        GET /answer-types/export?format=csv&updated_from=2024-01-01T00:00:00
+    """
+    chunks = _stream_answer_types(export_format, AnswerTypeFilter(is_valid, updated_from, updated_to))
+    first_chunk = await anext(chunks)
+
+    async def body():
+        try:
+            yield first_chunk
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="answer_types.{export_format}"'}
+    )
+
+ImportBatch = List[Tuple[int, object]]  # (row number, raw row)
+
+async def _json_batches(body: bytes) -> AsyncIterator[ImportBatch]:
+    try:
+        items = json.loads(body)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ValidationError("Invalid JSON body", details={"error": str(e)})
+    if not isinstance(items, list):
+        raise ValidationError("Expected a JSON array of answer types")
+    numbered = list(enumerate(items, start=1))
+    for start in range(0, len(numbered), settings.IMPORT_BATCH_SIZE):
+        yield numbered[start:start + settings.IMPORT_BATCH_SIZE]
+
+async def _csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[str]]:
+    """Parse CSV records as the body arrives (quoted fields may span lines and chunks)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    record = ""
+
+    def complete(line: str):
+        nonlocal record
+        record += line
+        # Quotes are escaped by doubling them: an odd count means a quoted newline
+        if record.count('"') % 2:
+            return None
+        text, record = record, ""
+        return next(csv.reader([text])) if text.strip() else None
+
+    try:
+        async for chunk in chunks:
+            *lines, tail = (tail + decoder.decode(chunk)).split("\n")
+            for line in lines:
+                values = complete(line + "\n")
+                if values is not None:
+                    yield values
+        values = complete(tail + decoder.decode(b"", final=True))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ValidationError("Invalid CSV body", details={"error": str(e)})
+    if record:
+        raise ValidationError("Invalid CSV body", details={"error": "unterminated quoted field"})
+    if values is not None:
+        yield values
+
+def _body_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Import bodies are limited to {settings.IMPORT_MAX_BYTES} bytes"
+    )
+
+async def _limited_stream(request: Request) -> AsyncIterator[bytes]:
+    """The request body, failing with 413 as soon as it exceeds IMPORT_MAX_BYTES"""
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.IMPORT_MAX_BYTES:
+        raise _body_too_large()
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > settings.IMPORT_MAX_BYTES:
+            raise _body_too_large()
+        yield chunk
+
+async def _read_limited(request: Request) -> bytes:
+    return b"".join([chunk async for chunk in _limited_stream(request)])
+
+async def _csv_batches(chunks: AsyncIterator[bytes]) -> AsyncIterator[ImportBatch]:
+    """Rows of a CSV with a header line; columns other than AnswerTypeImport fields (e.g. from an export) are ignored"""
+    header = None
+    batch: ImportBatch = []
+    row_number = 0
+    async for values in _csv_records(chunks):
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+        row_number += 1
+        batch.append((row_number, {column: value or None for column, value in zip(header, values)}))
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+IMPORT_CONTENT_TYPES = {"application/json", "text/csv"}
+
+@router.post(
+    "/answer-types/import",
+    response_model=AnswerTypeImportReport,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": AnswerTypeImport.model_json_schema()}},
+                "text/csv": {"schema": {"type": "string"}}
+            }
+        }
+    }
+)
+async def import_answer_types(request: Request, db=Depends(get_db_connection), current_user=Depends(get_current_user)):
+    """
+    Create or update many answer types in one transaction, from a JSON array or a
+    CSV upload (header line with id, title, title_fr, description, keywords, sort;
+    an export can be re-imported as is).
+
+    Rows with an id update that answer type; the others update the answer type
+    with the same slug (conditional) or create one. Rows are validated in batches
+    of IMPORT_BATCH_SIZE as the body arrives; invalid rows are reported and
+    skipped, the valid ones are written with a few multi-row statements. Bodies
+    larger than IMPORT_MAX_BYTES are rejected (413) before they are parsed.
+
+    Example:
+        POST /answer-types/import  (Content-Type: text/csv)
+        id,title,title_fr
+        ,Échelle de Likert,Échelle de Likert
+        12,Choix multiple,
+        -> {"total": 2, "created": 1, "updated": 1, "failed": 0, "rows_per_second": ..., "rows": [...]}
+
+    Returns:
+        AnswerTypeImportReport: One result per row, plus the throughput of the import
+    """
+    started = time.perf_counter()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "application/json":
+        batches = _json_batches(await _read_limited(request))
+    elif content_type == "text/csv":
+        batches = _csv_batches(_limited_stream(request))
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Expected one of {sorted(IMPORT_CONTENT_TYPES)}"
         )
-        for row in rows
-    ]
+
+    report = []
+    valid: List[Tuple[int, AnswerTypeImport]] = []
+    async for batch in batches:
+        if len(report) + len(valid) + len(batch) > settings.IMPORT_MAX_ROWS:
+            raise ValidationError("Too many rows", details={"max_rows": settings.IMPORT_MAX_ROWS})
+        for row_number, raw in batch:
+            try:
+                valid.append((row_number, AnswerTypeImport.model_validate(raw)))
+            except PydanticValidationError as e:
+                errors = [{"loc": list(error["loc"]), "msg": error["msg"]} for error in e.errors()]
+                report.append({"row": row_number, "status": "invalid", "errors": errors})
+        # Let other requests run between batches of a large body
+        await asyncio.sleep(0)
+
+    if valid:
+        results = await answer_types.upsert_many(db, [row for _, row in valid], current_user["id"])
+        report.extend(
+            {"row": row_number, "status": result.status, "id": result.id}
+            for (row_number, _), result in zip(valid, results)
+        )
+        await answer_types.invalidate(translations=any(row.title_fr is not None for _, row in valid))
+    report.sort(key=lambda row: row["row"])
+
+    elapsed = time.perf_counter() - started
+    counts = {status_name: sum(1 for row in report if row["status"] == status_name) for status_name in ("created", "updated")}
+    logger.info("answer_type import: %d rows in %.1f ms (%.0f rows/s)", len(report), elapsed * 1000, len(report) / elapsed)
+    return {
+        "total": len(report),
+        "created": counts["created"],
+        "updated": counts["updated"],
+        "failed": len(report) - counts["created"] - counts["updated"],
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "rows_per_second": round(len(report) / elapsed, 1) if elapsed else 0.0,
+        "rows": report
+    }
 
 @router.get("/answer-types/{answer_type_id}", response_model=AnswerType)
-async def get_answer_type(answer_type_id: int, db=Depends(get_db_connection)):
+@conditional_route(answer_type_validator, vary=["Accept-Language"])
+@cached_route("answer_type:detail", tags=[ANSWER_TYPE_ITEM_TAG])
+async def get_answer_type(answer_type_id: int, request: Request, db=Depends(get_db_connection)):
     """
-    Retrieve a specific answer type with its French translation.
+    Retrieve a specific answer type with its French translation, plus the
+    translations of the locale negotiated from Accept-Language.
     
     Args:
         answer_type_id (int): The ID of the answer type to retrieve
@@ -80,55 +386,10 @@ async def get_answer_type(answer_type_id: int, db=Depends(get_db_connection)):
     Returns:
         AnswerType: The answer type with its French translation
     """
-    async with db.cursor() as cursor:
-        # First get the answer type
-        await cursor.execute("""
-            SELECT
-                at.id,
-                cu.id as create_user_id, cu.firstname as create_user_firstname, cu.lastname as create_user_lastname,
-                uu.id as update_user_id, uu.firstname as update_user_firstname, uu.lastname as update_user_lastname,
-                at.title, at.description, at.keywords, at.sort, at.revision, at.create_date, at.update_date, at.is_valid, at.conditional
-            FROM answer_type at
-            LEFT JOIN fos_user cu ON at.create_user_id = cu.id
-            LEFT JOIN fos_user uu ON at.update_user_id = uu.id
-            WHERE at.id = %s
-        """, (answer_type_id,))
-        row = await cursor.fetchone()
-        
-        if not row:
-            raise HTTPException(status_code=404, detail="AnswerType not found")
-        
-        # Get French translation separately
-        await cursor.execute("""
-            SELECT content 
-            FROM ext_translations 
-            WHERE object_class LIKE %s
-            AND field = %s
-            AND locale = %s
-            AND foreign_key = %s
-        """, ('%AnswerType%', 'title', 'fr', str(answer_type_id)))
-        translation_row = await cursor.fetchone()
-        title_fr = translation_row[0] if translation_row else None
-        
-    return AnswerType(
-        id=row[0],
-        create_user=UserShort(
-            user_id=row[1], firstname=row[2], lastname=row[3]
-        ) if row[1] else None,
-        update_user=UserShort(
-            user_id=row[4], firstname=row[5], lastname=row[6]
-        ) if row[4] else None,
-        title=row[7],
-        title_fr=title_fr,
-        description=row[8],
-        keywords=row[9],
-        sort=row[10],
-        revision=row[11],
-        create_date=row[12],
-        update_date=row[13],
-        is_valid=bool(row[14]),
-        conditional=row[15]
-    )
+    answer_type = await answer_types.get(db, answer_type_id, request_locale(request))
+    if answer_type is None:
+        raise HTTPException(status_code=404, detail="AnswerType not found")
+    return json_response(answer_type, AnswerTypeRecord)
 
 @router.post("/answer-types", response_model=AnswerType, status_code=status.HTTP_201_CREATED)
 async def create_answer_type(
@@ -169,18 +430,10 @@ async def create_answer_type(
 
         # Insert French translation if provided
         if answer_type.title_fr:
-            await cursor.execute(
-                "INSERT INTO ext_translations (locale, object_class, field, foreign_key, content) VALUES (%s, %s, %s, %s, %s)",
-                (
-                    'fr',
-                    'App\\Entity\\LovManagement\\AnswerType',
-                    'title',
-                    str(answer_type_id),
-                    answer_type.title_fr
-                )
-            )
+            await answer_types.translations.save(cursor, answer_type_id, 'fr', {'title': answer_type.title_fr})
         
         await db.commit()
+    await answer_types.invalidate(translations=bool(answer_type.title_fr))
     
     return AnswerType(
         id=answer_type_id,
@@ -210,6 +463,7 @@ async def create_answer_type(
 async def update_answer_type(
     answer_type_id: int,
     answer_type: AnswerTypeCreate,
+    request: Request,
     db=Depends(get_db_connection),
     current_user=Depends(get_current_user)
 ):
@@ -225,94 +479,30 @@ async def update_answer_type(
     """
     now = datetime.utcnow()
     async with db.cursor() as cursor:
-        # Get original create_user_id and revision for response
-        await cursor.execute(
-            "SELECT create_user_id, revision, create_date, is_valid, conditional FROM answer_type WHERE id = %s",
-            (answer_type_id,)
-        )
-        row = await cursor.fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="AnswerType not found")
-        create_user_id, current_revision, create_date, is_valid, conditional = row
-        new_revision = (current_revision or 0) + 1
-        
-        # Fetch create_user info
-        await cursor.execute(
-            "SELECT id, firstname, lastname FROM fos_user WHERE id = %s",
-            (create_user_id,)
-        )
-        cu = await cursor.fetchone()
-        create_user = None
-        if cu:
-            create_user = UserShort(user_id=cu[0], firstname=cu[1], lastname=cu[2])
-        
         # Update main record
         await cursor.execute(
-            "UPDATE answer_type SET update_user_id=%s, title=%s, description=%s, keywords=%s, sort=%s, revision=%s, update_date=%s WHERE id=%s",
+            "UPDATE answer_type SET update_user_id=%s, title=%s, description=%s, keywords=%s, sort=%s, revision=COALESCE(revision, 0) + 1, update_date=%s WHERE id=%s",
             (
                 current_user["id"],
                 answer_type.title,
                 answer_type.description,
                 answer_type.keywords,
                 answer_type.sort,
-                new_revision,
                 now,
                 answer_type_id
             )
         )
+        if cursor.rowcount == 0:
+            raise HTTPException(status_code=404, detail="AnswerType not found")
 
-        # Update or insert French translation
+        # Update or insert French translation, otherwise keep the current one
         if answer_type.title_fr is not None:
-            await cursor.execute(
-                """
-                INSERT INTO ext_translations (locale, object_class, field, foreign_key, content)
-                VALUES (%s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE content = VALUES(content)
-                """,
-                (
-                    'fr',
-                    'App\\Entity\\LovManagement\\AnswerType',
-                    'title',
-                    str(answer_type_id),
-                    answer_type.title_fr
-                )
-            )
-
-        # Get current French translation
-        await cursor.execute(
-            """
-            SELECT content FROM ext_translations 
-            WHERE object_class LIKE %s
-            AND foreign_key = %s
-            AND field = %s
-            AND locale = %s
-            """,
-            ('%AnswerType%', str(answer_type_id), 'title', 'fr')
-        )
-        title_fr_row = await cursor.fetchone()
-        title_fr = title_fr_row[0] if title_fr_row else None
+            await answer_types.translations.save(cursor, answer_type_id, 'fr', {'title': answer_type.title_fr})
 
         await db.commit()
-        
-    return AnswerType(
-        id=answer_type_id,
-        create_user=create_user,
-        update_user=UserShort(
-            user_id=current_user["id"],
-            firstname=current_user["firstname"],
-            lastname=current_user["lastname"]
-        ),
-        title=answer_type.title,
-        title_fr=title_fr,
-        description=answer_type.description,
-        keywords=answer_type.keywords,
-        sort=answer_type.sort,
-        revision=new_revision,
-        create_date=create_date,
-        update_date=now,
-        is_valid=is_valid,
-        conditional=conditional
-    )
+    await answer_types.invalidate(answer_type_id, translations=answer_type.title_fr is not None)
+
+    return await answer_types.get(db, answer_type_id, request_locale(request))
 
 @router.post("/answer-types/{answer_type_id}/disable", status_code=status.HTTP_204_NO_CONTENT)
 async def disable_answer_type(answer_type_id: int, db=Depends(get_db_connection), current_user=Depends(get_current_user)):
@@ -335,6 +525,7 @@ async def disable_answer_type(answer_type_id: int, db=Depends(get_db_connection)
         await db.commit()
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="AnswerType not found or already disabled")
+    await answer_types.invalidate(answer_type_id)
     return None
 
 @router.post("/answer-types/{answer_type_id}/enable", status_code=status.HTTP_204_NO_CONTENT)
@@ -357,4 +548,5 @@ async def enable_answer_type(answer_type_id: int, db=Depends(get_db_connection),
         await db.commit()
         if cursor.rowcount == 0:
             raise HTTPException(status_code=404, detail="AnswerType not found or already enabled")
+    await answer_types.invalidate(answer_type_id)
     return None
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, status
+from app.api.v1.deps.auth import require_roles
+from app.core.principal import invalidate_principal
+from app.models.user.user import PrincipalInvalidation
+
+router = APIRouter()
+
+@router.post("/principals/invalidate", status_code=status.HTTP_204_NO_CONTENT)
+async def invalidate_principals(
+    body: PrincipalInvalidation,
+    current_user=Depends(require_roles("ROLE_ADMIN", "ROLE_SUPER_ADMIN"))
+):
+    """
+    Drop cached principals on every worker. fos_user is edited outside this
+    API: whatever disables, invalidates or edits a user must call this, or the
+    change only applies after PRINCIPAL_CACHE_TTL.
+    """
+    await invalidate_principal(*body.subjects)
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends
 from app.api.v1.deps.auth import get_current_user
+from app.models.user.user import UserProfile
 
 router = APIRouter()
 
-@router.get("/profile")
+@router.get("/profile", response_model=UserProfile)
 async def read_user_me(current_user = Depends(get_current_user)):
-    return current_user 
\ No newline at end of file
+    # The principal also carries username, roles and status flags: not part of this API
+    return {field: current_user.get(field) for field in UserProfile.model_fields}
@@ -1,27 +1,139 @@
 from redis import asyncio as aioredis
 from app.core.config import settings
+from app.core.lru import LRUCache
+from app.core.metrics import instrument_redis
+import asyncio
 import json
-from typing import Any, Optional
+import logging
+from typing import Any, Dict, Iterable, Optional
 
-redis = aioredis.from_url(
+logger = logging.getLogger(__name__)
+
+redis = instrument_redis(aioredis.from_url(
     f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
     encoding="utf-8",
     decode_responses=True
+))
+
+# Every response-cache entry lives under this prefix so it can be cleared
+# without touching other Redis state (rate-limit buckets, sessions, ...)
+CACHE_PREFIX = "cache"
+
+# L1: per-worker cache in front of Redis (L2). Kept coherent across workers by
+# broadcasting invalidated keys on CACHE_INVALIDATION_CHANNEL.
+local_cache: Optional[LRUCache] = (
+    LRUCache(max_size=settings.CACHE_L1_MAX_SIZE, ttl=settings.CACHE_L1_TTL)
+    if settings.CACHE_L1_ENABLED else None
 )
+_l2_hits = 0
+_l2_misses = 0
+_CLEAR_ALL = "*"
+
+def build_cache_key(*parts: Any) -> str:
+    """Build a namespaced cache key from its parts"""
+    return ":".join([CACHE_PREFIX, *(str(part) for part in parts)])
+
+def _tag_key(tag: str) -> str:
+    return f"{CACHE_PREFIX}:tag:{tag}"
 
 async def get_cached_data(key: str) -> Optional[Any]:
-    """Get data from cache"""
+    """Get data from cache (L1 first, then Redis)"""
+    global _l2_hits, _l2_misses
+    if local_cache is not None:
+        value = local_cache.get(key)
+        if value is not None:
+            return value
     data = await redis.get(key)
-    return json.loads(data) if data else None
+    if data is None:
+        _l2_misses += 1
+        return None
+    _l2_hits += 1
+    value = json.loads(data)
+    if local_cache is not None:
+        local_cache.set(key, value)
+    return value
 
-async def set_cached_data(key: str, value: Any, expire: int = 300) -> None:
-    """Set data in cache with expiration"""
-    await redis.set(key, json.dumps(value), ex=expire)
+async def set_cached_data(key: str, value: Any, expire: int = 300, tags: Iterable[str] = ()) -> None:
+    """Set data in cache with expiration, optionally registering it under invalidation tags"""
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.set(key, json.dumps(value), ex=expire)
+        for tag in tags:
+            pipe.sadd(_tag_key(tag), key)
+            pipe.expire(_tag_key(tag), settings.CACHE_TAG_TTL)
+        await pipe.execute()
+    if local_cache is not None:
+        local_cache.set(key, value, ttl=min(expire, settings.CACHE_L1_TTL))
+
+async def _broadcast_invalidation(keys: Iterable[str]) -> None:
+    """Evict keys locally and tell every other worker to do the same"""
+    keys = list(keys)
+    if not keys:
+        return
+    if local_cache is not None:
+        if _CLEAR_ALL in keys:
+            local_cache.clear()
+        else:
+            local_cache.delete(*keys)
+    await redis.publish(settings.CACHE_INVALIDATION_CHANNEL, json.dumps(keys))
 
 async def invalidate_cache(key: str) -> None:
     """Invalidate cache for a key"""
     await redis.delete(key)
+    await _broadcast_invalidation([key])
+
+async def invalidate_tags(*tags: str) -> None:
+    """Invalidate every cache entry registered under any of the given tags"""
+    if not tags:
+        return
+    tag_keys = [_tag_key(tag) for tag in tags]
+    async with redis.pipeline(transaction=False) as pipe:
+        for tag_key in tag_keys:
+            pipe.smembers(tag_key)
+        members = await pipe.execute()
+    keys = set().union(*members)
+    await redis.delete(*keys, *tag_keys)
+    await _broadcast_invalidation(keys)
 
 async def clear_cache() -> None:
-    """Clear all cache"""
-    await redis.flushall() 
\ No newline at end of file
+    """Clear all response-cache entries (other Redis state is kept)"""
+    keys = [key async for key in redis.scan_iter(match=f"{CACHE_PREFIX}:*", count=500)]
+    if keys:
+        await redis.delete(*keys)
+    await _broadcast_invalidation([_CLEAR_ALL])
+
+async def run_invalidation_listener() -> None:
+    """
+    Evict L1 entries invalidated by any worker.
+    Runs for the lifetime of the worker; reconnects if Redis goes away.
+    """
+    if local_cache is None:
+        return
+    while True:
+        try:
+            async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    keys = json.loads(message["data"])
+                    if _CLEAR_ALL in keys:
+                        local_cache.clear()
+                    else:
+                        local_cache.delete(*keys)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Entries written before the outage may be stale for up to CACHE_L1_TTL
+            logger.warning("Cache invalidation listener error, reconnecting: %s", e)
+            local_cache.clear()
+            await asyncio.sleep(1)
+
+def get_cache_stats() -> Dict[str, Any]:
+    """L1 and L2 hit/miss counters for this worker"""
+    l2_lookups = _l2_hits + _l2_misses
+    return {
+        "l1": local_cache.stats() if local_cache is not None else {"enabled": False},
+        "l2": {
+            "hits": _l2_hits,
+            "misses": _l2_misses,
+            "hit_ratio": round(_l2_hits / l2_lookups, 4) if l2_lookups else 0.0
+        }
+    }
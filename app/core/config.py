@@ -12,6 +12,22 @@ class Settings:
     SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    TOKEN_CACHE_MAX_SIZE: int = int(os.getenv('TOKEN_CACHE_MAX_SIZE', 10000))  # verified tokens kept per worker
+    PRINCIPAL_CACHE_TTL: int = int(os.getenv('PRINCIPAL_CACHE_TTL', 60))  # seconds a resolved user is trusted without a fos_user lookup
+    # Opt-in: embed a signed principal snapshot in access tokens so auth needs no DB/cache lookup.
+    # Trade-off: disabling a user only takes effect when their token expires.
+    JWT_EMBED_PRINCIPAL: bool = os.getenv('JWT_EMBED_PRINCIPAL', 'false').lower() == 'true'
+    
+    # Password hashing (bcrypt runs off the event loop)
+    PASSWORD_HASH_EXECUTOR: str = os.getenv('PASSWORD_HASH_EXECUTOR', 'thread')  # thread (bcrypt releases the GIL) | process
+    PASSWORD_HASH_MAX_CONCURRENCY: int = int(os.getenv('PASSWORD_HASH_MAX_CONCURRENCY', 4))  # per worker
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 5))  # seconds waiting for a free slot
+    
+    # Logging (app.core.logging): records are written by a background thread
+    LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT: str = os.getenv('LOG_FORMAT', 'json')  # json (one object per line) | text
+    LOG_SAMPLING: str = os.getenv('LOG_SAMPLING', '')  # INFO sampling per logger prefix, e.g. app.access=0.1,app.api.v1.endpoints.auth=0.5
+    LOG_QUEUE_SIZE: int = int(os.getenv('LOG_QUEUE_SIZE', 10000))  # records waiting for the writer thread; more are dropped
     
     # Database settings
     MYSQL_HOST: str = "127.0.0.1" #os.getenv('MYSQL_HOST', 'localhost')
@@ -19,10 +35,75 @@ class Settings:
     MYSQL_PASSWORD: str = os.getenv('MYSQL_ROOT_PASSWORD')
     MYSQL_DATABASE: str = "lms_umg" #os.getenv('MYSQL_DATABASE', 'medflixs')
     
+    # Database pool settings (one pool per worker process)
+    MYSQL_POOL_MIN_SIZE: int = int(os.getenv('MYSQL_POOL_MIN_SIZE', 1))
+    MYSQL_POOL_MAX_SIZE: int = int(os.getenv('MYSQL_POOL_MAX_SIZE', 10))
+    MYSQL_POOL_RECYCLE: int = int(os.getenv('MYSQL_POOL_RECYCLE', 3600))  # seconds, -1 disables recycling
+    MYSQL_POOL_ACQUIRE_TIMEOUT: float = float(os.getenv('MYSQL_POOL_ACQUIRE_TIMEOUT', 5))  # seconds
+    
+    # SQL instrumentation (app.db.instrumentation)
+    SQL_SLOW_QUERY_MS: float = float(os.getenv('SQL_SLOW_QUERY_MS', 200))  # statements at least this slow are logged with redacted params
+    SQL_EXPLAIN_SLOW: bool = os.getenv('SQL_EXPLAIN_SLOW', 'false').lower() == 'true'  # log the plan of slow SELECTs, once per fingerprint and hour
+    SQL_N_PLUS_ONE_THRESHOLD: int = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', 5))  # runs of one fingerprint in a request flagged as N+1
+    SQL_DEBUG_HEADERS: bool = os.getenv('SQL_DEBUG_HEADERS', 'false').lower() == 'true'  # send X-DB-Query-Count/-Time-Ms/-N-Plus-One headers
+    
     # Redis settings
     REDIS_HOST: str = "127.0.0.1" #os.getenv('REDIS_HOST', 'localhost')
     REDIS_PORT: int = int(os.getenv('REDIS_PORT', 6379))
     
+    # Pagination settings
+    PAGE_SIZE_DEFAULT: int = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX: int = int(os.getenv('PAGE_SIZE_MAX', 500))
+    IMPORT_BATCH_SIZE: int = int(os.getenv('IMPORT_BATCH_SIZE', 500))  # rows validated per event-loop turn and per IN (...) lookup during bulk imports
+    IMPORT_MAX_ROWS: int = int(os.getenv('IMPORT_MAX_ROWS', 10000))  # rows accepted by one bulk import (one transaction)
+    IMPORT_MAX_BYTES: int = int(os.getenv('IMPORT_MAX_BYTES', 10 * 1024 * 1024))  # body size accepted by one bulk import (checked before parsing)
+    EXPORT_CHUNK_SIZE: int = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))  # rows fetched (and translated) per round trip when streaming exports
+    
+    # Response cache settings
+    CACHE_DEFAULT_EXPIRE: int = int(os.getenv('CACHE_DEFAULT_EXPIRE', 300))  # seconds
+    CACHE_TAG_TTL: int = int(os.getenv('CACHE_TAG_TTL', 86400))  # must outlive every tagged entry
+    CACHE_L1_ENABLED: bool = os.getenv('CACHE_L1_ENABLED', 'true').lower() == 'true'  # in-process cache in front of Redis
+    CACHE_L1_MAX_SIZE: int = int(os.getenv('CACHE_L1_MAX_SIZE', 1024))  # entries per worker
+    CACHE_L1_TTL: int = int(os.getenv('CACHE_L1_TTL', 30))  # seconds, bounds staleness if an invalidation is missed
+    CACHE_INVALIDATION_CHANNEL: str = os.getenv('CACHE_INVALIDATION_CHANNEL', 'cache:invalidate')
+    
+    # Translations (Gedmo ext_translations)
+    TRANSLATION_LOCALES: list = os.getenv('TRANSLATION_LOCALES', 'fr,en').split(',')  # locales negotiated from Accept-Language
+    TRANSLATION_DEFAULT_LOCALE: str = os.getenv('TRANSLATION_DEFAULT_LOCALE', 'fr')  # when no accepted locale is supported
+    TRANSLATION_CACHE_TTL: int = int(os.getenv('TRANSLATION_CACHE_TTL', 3600))  # seconds, writes invalidate earlier
+    
+    # Search settings
+    SEARCH_BACKEND: str = os.getenv('SEARCH_BACKEND', 'memory')  # memory (in-process index) | fulltext (MySQL FULLTEXT index)
+    SEARCH_INDEX_CHECK_INTERVAL: float = float(os.getenv('SEARCH_INDEX_CHECK_INTERVAL', 5))  # seconds between checks for writes made by other workers
+    
+    # LDAP authentication settings
+    LDAP_DEFAULT_SERVER_ID: int = int(os.getenv('LDAP_DEFAULT_SERVER_ID', 1))  # used when fos_user.ldap_server_id is NULL
+    LDAP_CONFIG_TTL: int = int(os.getenv('LDAP_CONFIG_TTL', 300))  # seconds between ldap_servers reloads (edits to the table take up to this long to apply)
+    LDAP_MAX_CONCURRENCY: int = int(os.getenv('LDAP_MAX_CONCURRENCY', 8))  # binds in flight per worker
+    LDAP_CONNECT_TIMEOUT: float = float(os.getenv('LDAP_CONNECT_TIMEOUT', 3))  # seconds
+    LDAP_RECEIVE_TIMEOUT: float = float(os.getenv('LDAP_RECEIVE_TIMEOUT', 5))  # seconds
+    
+    # Rate limiting settings
+    RATE_LIMIT_ALGORITHM: str = os.getenv('RATE_LIMIT_ALGORITHM', 'sliding_window_counter')  # sliding_window_log | sliding_window_counter | gcra
+    RATE_LIMIT_REQUESTS_PER_MINUTE: int = int(os.getenv('RATE_LIMIT_REQUESTS_PER_MINUTE', 60))  # tokens per client; a request costs its route's weight
+    RATE_LIMIT_BURST_SIZE: int = int(os.getenv('RATE_LIMIT_BURST_SIZE', 10))  # GCRA only
+    RATE_LIMIT_MODE: str = os.getenv('RATE_LIMIT_MODE', 'approximate')  # exact | approximate (general routes; local sliding window counters synced in batches, RATE_LIMIT_ALGORITHM applies to exact only)
+    RATE_LIMIT_SYNC_INTERVAL_MS: int = int(os.getenv('RATE_LIMIT_SYNC_INTERVAL_MS', 100))  # approximate mode batch sync period
+    RATE_LIMIT_ERROR_BOUND: float = float(os.getenv('RATE_LIMIT_ERROR_BOUND', 0.1))  # share of the limit a worker may admit between syncs
+    RATE_LIMIT_AUTH_REQUESTS_PER_MINUTE: int = int(os.getenv('RATE_LIMIT_AUTH_REQUESTS_PER_MINUTE', 10))  # /auth/token, always exact
+    RATE_LIMIT_LIST_COST: int = int(os.getenv('RATE_LIMIT_LIST_COST', 5))  # weight of join-heavy list endpoints
+    RATE_LIMIT_EXPORT_COST: int = int(os.getenv('RATE_LIMIT_EXPORT_COST', 30))  # weight of full-catalog streaming exports
+    RATE_LIMIT_IMPORT_COST: int = int(os.getenv('RATE_LIMIT_IMPORT_COST', 30))  # weight of bulk imports
+    
+    # MCP server settings
+    MCP_MAX_CONCURRENT_TOOLS: int = int(os.getenv('MCP_MAX_CONCURRENT_TOOLS', 8))  # tool calls running at once (each holds a pooled connection)
+    MCP_TOOL_QUEUE_TIMEOUT: float = float(os.getenv('MCP_TOOL_QUEUE_TIMEOUT', 10))  # seconds a tool call waits for a free slot
+    MCP_PAGE_SIZE_DEFAULT: int = int(os.getenv('MCP_PAGE_SIZE_DEFAULT', 20))  # items per tool result when no limit is given
+    MCP_RESPONSE_MAX_BYTES: int = int(os.getenv('MCP_RESPONSE_MAX_BYTES', 32768))  # JSON size budget of a tool result
+    MCP_FIELD_MAX_CHARS: int = int(os.getenv('MCP_FIELD_MAX_CHARS', 1000))  # longer text values are cut, with a marker
+    MCP_RESULT_CACHE_TTL: int = int(os.getenv('MCP_RESULT_CACHE_TTL', 30))  # seconds identical tool calls reuse a result (0 disables)
+    MCP_RESULT_CACHE_SIZE: int = int(os.getenv('MCP_RESULT_CACHE_SIZE', 128))  # results kept per session
+    
     # Admin credentials
     ADMIN_EMAIL: str = os.getenv("ADMIN_EMAIL", "admin@example.com")
     ADMIN_PASSWORD: str = os.getenv("ADMIN_PASSWORD", "change-this-password")
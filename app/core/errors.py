@@ -30,6 +30,11 @@ class NotFoundError(AppError):
     def __init__(self, message: str, details: Dict[str, Any] | None = None):
         super().__init__(status_code=status.HTTP_404_NOT_FOUND, message=message, details=details)
 
+class ServiceUnavailableError(AppError):
+    """Temporary overload errors"""
+    def __init__(self, message: str, details: Dict[str, Any] | None = None):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, message=message, details=details)
+
 class ValidationError(AppError):
     """Validation errors"""
     def __init__(self, message: str, details: Dict[str, Any] | None = None):
@@ -60,7 +65,7 @@ async def error_handler(request: Request, exc: Exception) -> JSONResponse:
         )
     
     # Log unexpected errors
-    logger.error(f"Unexpected error: {exc}", exc_info=True)
+    logger.error("Unexpected error: %s", exc, exc_info=exc)
     
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
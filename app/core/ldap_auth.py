@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+from ldap3 import Server, Connection, NONE
+from ldap3.core.exceptions import LDAPException
+from app.core.config import settings
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class LdapServerConfig(NamedTuple):
+    id: int
+    url: str
+    bind_dn: Optional[str]
+    bind_password: Optional[str]
+    user_base_dn: Optional[str]
+
+# ldap_servers rows and their ldap3 Server objects, reloaded every LDAP_CONFIG_TTL
+# seconds (edits to the table take up to that long to apply, unless
+# invalidate_ldap_servers is called); Server objects are only rebuilt for rows
+# that changed. An unknown server id triggers one early reload (the row may be
+# new), then is remembered as missing until the next reload.
+_configs: Dict[int, LdapServerConfig] = {}
+_servers: Dict[int, Server] = {}
+_missing: Set[int] = set()
+_loaded_at = 0.0
+_reload_lock = asyncio.Lock()
+
+# ldap3 binds are blocking socket calls: run them on a bounded pool of threads
+_bind_executor = ThreadPoolExecutor(max_workers=settings.LDAP_MAX_CONCURRENCY, thread_name_prefix="ldap-bind")
+
+async def _reload_servers(db) -> None:
+    global _loaded_at
+    async with db.cursor() as cursor:
+        await cursor.execute("SELECT id, url, bind_dn, password, user_base_dn FROM ldap_servers")
+        rows = await cursor.fetchall()
+    configs = {row[0]: LdapServerConfig(*row) for row in rows}
+    for server_id, config in configs.items():
+        if _configs.get(server_id) != config:
+            # No schema/DSA info fetch: a simple bind does not need it
+            _servers[server_id] = Server(config.url, get_info=NONE, connect_timeout=settings.LDAP_CONNECT_TIMEOUT)
+    for server_id in set(_servers) - set(configs):
+        del _servers[server_id]
+    _configs.clear()
+    _configs.update(configs)
+    _missing.clear()
+    _loaded_at = time.monotonic()
+
+def _needs_reload(server_id: int) -> bool:
+    if time.monotonic() - _loaded_at > settings.LDAP_CONFIG_TTL:
+        return True
+    return server_id not in _configs and server_id not in _missing
+
+async def get_ldap_server(db, server_id: int) -> Optional[Tuple[LdapServerConfig, Server]]:
+    """Cached config and Server object for an ldap_servers row, reloading when stale"""
+    if _needs_reload(server_id):
+        async with _reload_lock:
+            if _needs_reload(server_id):
+                await _reload_servers(db)
+    if server_id not in _configs:
+        _missing.add(server_id)
+        return None
+    return _configs[server_id], _servers[server_id]
+
+def invalidate_ldap_servers() -> None:
+    """Force a reload of ldap_servers on the next authentication (call after editing the table)"""
+    global _loaded_at
+    _loaded_at = 0.0
+
+def _bind(server: Server, user: str, password: str) -> bool:
+    try:
+        conn = Connection(
+            server,
+            user=user,
+            password=password,
+            auto_bind=True,
+            receive_timeout=settings.LDAP_RECEIVE_TIMEOUT
+        )
+        conn.unbind()
+        return True
+    except LDAPException as e:
+        logger.error("LDAP authentication failed: %s", e)
+        return False
+
+async def ldap_authenticate(db, server_id: Optional[int], password: str) -> bool:
+    """
+    Authenticate against the user's LDAP server with a direct bind (like the PHP version).
+
+    Args:
+        db: Database connection used to (re)load ldap_servers
+        server_id: fos_user.ldap_server_id (LDAP_DEFAULT_SERVER_ID when NULL)
+        password: Password to bind with
+
+    Returns:
+        bool: True if the bind succeeded
+    """
+    # An empty password would be an unauthenticated (anonymous) bind
+    if not password:
+        return False
+    server_id = server_id or settings.LDAP_DEFAULT_SERVER_ID
+    ldap_server = await get_ldap_server(db, server_id)
+    if ldap_server is None:
+        logger.error("LDAP server %s is not configured", server_id)
+        return False
+    config, server = ldap_server
+    return await asyncio.get_running_loop().run_in_executor(
+        _bind_executor, _bind, server, config.user_base_dn, password
+    )
@@ -0,0 +1,221 @@
+import atexit
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.metrics import CallbackMetric, registry
+
+# Logging off the event loop: application threads only put records on a
+# bounded queue (QueueHandler); a listener thread formats them (JSON or text)
+# and does the blocking writes. A full queue drops records instead of stalling
+# requests. Log with %-style arguments, not f-strings: disabled or sampled-out
+# records are then never formatted.
+
+# Correlation id of the request being handled, set by RequestIdMiddleware
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = "x-request-id"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+# LogRecord attributes that are not `extra` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id", "sample_rate"}
+
+_dropped = 0
+_listener: Optional[QueueListener] = None
+_setup_lock = threading.Lock()
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """LOG_SAMPLING value, e.g. "app.access=0.1,app.api.v1.endpoints.auth=0.5", to {logger prefix: rate}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request id, in the thread that logs (the listener thread has no request context)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep 1 in round(1 / rate) INFO-and-below records of the loggers under each
+    configured prefix (the longest matching prefix wins). Warnings and errors
+    are always kept. Kept records carry sample_rate, so counts can be scaled back.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._every: Dict[str, int] = {}  # logger name -> keep 1 in N (0: drop all)
+        self._counters: Dict[str, int] = {}
+
+    def _interval(self, name: str) -> int:
+        matches = [prefix for prefix in self.rates if name == prefix or name.startswith(prefix + ".")]
+        if not matches:
+            return 1
+        rate = self.rates[max(matches, key=len)]
+        return round(1 / rate) if rate > 0 else 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        every = self._every.get(record.name)
+        if every is None:
+            every = self._every[record.name] = self._interval(record.name)
+        if every == 1:
+            return True
+        if every == 0:
+            return False
+        count = self._counters.get(record.name, 0)
+        self._counters[record.name] = count + 1
+        if count % every:
+            return False
+        record.sample_rate = 1 / every
+        return True
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that drops records when the queue is full. prepare() merges
+    the arguments into the message (records must not change once queued) but
+    leaves exception formatting to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        global _dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped += 1
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, request_id, extra fields, exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if getattr(record, "sample_rate", None) is not None:
+            entry["sample_rate"] = record.sample_rate
+        entry.update((key, value) for key, value in record.__dict__.items() if key not in _RECORD_FIELDS)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines for local development, with the request id when there is one"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s%(request)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        request = getattr(record, "request_id", None)
+        record.request = f" [{request}]" if request else ""
+        return super().format(record)
+
+def setup_logging(
+    level: str = settings.LOG_LEVEL,
+    log_format: str = settings.LOG_FORMAT,
+    sampling: str = settings.LOG_SAMPLING,
+    queue_size: int = settings.LOG_QUEUE_SIZE
+) -> QueueListener:
+    """
+    Route every record through a bounded queue to a stderr handler on a
+    background thread (idempotent). uvicorn's loggers are routed there too.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+        if log_format not in ("json", "text"):
+            raise ValueError(f"Unknown log format: {log_format}")
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter())
+
+        records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+        handler = NonBlockingQueueHandler(records)
+        handler.addFilter(SamplingFilter(parse_sampling(sampling)))
+        handler.addFilter(RequestIdFilter())
+
+        root = logging.getLogger()
+        for existing in root.handlers[:]:
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level.upper())
+        for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers.clear()
+            uvicorn_logger.propagate = True
+
+        _listener = QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+def get_logging_stats() -> Dict[str, int]:
+    """Records waiting for the writer thread and records dropped so far"""
+    return {"queued": _listener.queue.qsize() if _listener is not None else 0, "dropped": _dropped}
+
+registry.register(CallbackMetric(
+    "log_records_dropped_total", "Log records dropped because the logging queue was full", lambda: _dropped, "counter"
+))
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware giving each request a correlation id: the client's
+    X-Request-ID when it is well-formed, otherwise a new one. It is set in the
+    request_id context variable (stamped on every log record of the request)
+    and echoed in the X-Request-ID response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = dict(scope["headers"]).get(REQUEST_ID_HEADER.encode(), b"").decode("latin-1")
+        current = incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id.set(current)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), (REQUEST_ID_HEADER.encode(), current.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id.reset(token)
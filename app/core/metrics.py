@@ -0,0 +1,255 @@
+import bisect
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# In-process metrics in the Prometheus text format (version 0.0.4), without
+# the client library. Recording is a dict lookup plus an addition (a bisect for
+# histograms): well under a microsecond, and safe without locks because
+# everything is recorded from the event loop. Each worker exposes its own
+# values; Prometheus aggregates across workers.
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)  # Redis round trips
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Metric:
+    """Base of the metric types: a name, a help text and label names"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """(suffix, formatted labels, value) triples"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape(self.help)}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{self.name}{suffix}{labels} {_format_value(value)}" for suffix, labels, value in self.samples())
+        return lines
+
+class Counter(Metric):
+    """Monotonic count, e.g. http_requests_total"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        for labels, value in self._values.items():
+            yield "", _format_labels(self.labelnames, labels), value
+
+class Gauge(Counter):
+    """Value that goes up and down, e.g. requests in flight"""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+class Histogram(Metric):
+    """Distribution of observed values (seconds) in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket (+Inf last)..., sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * (len(self.buckets) + 2)
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return sum(state[:-1]) if state else 0
+
+    def samples(self):
+        for labels, state in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), state[:-1]):
+                cumulative += count
+                yield "_bucket", _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"'), cumulative
+            yield "_sum", _format_labels(self.labelnames, labels), state[-1]
+            yield "_count", _format_labels(self.labelnames, labels), cumulative
+
+class CallbackMetric(Metric):
+    """
+    Value read at scrape time from existing stats (pool, caches...). The callback
+    returns a number, or a {label values: number} dict when labelnames are given.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        callback: Callable[[], Union[float, Dict[LabelValues, float]]],
+        kind: str = "gauge",
+        labelnames: Sequence[str] = ()
+    ):
+        super().__init__(name, help, labelnames)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self):
+        values = self.callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in values.items():
+            yield "", _format_labels(self.labelnames, labels), value
+
+class MetricsRegistry:
+    """Metrics of this worker, rendered in registration order"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition; a failing callback drops only its own metric"""
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# {metric.name} unavailable: {_escape(str(e))}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter("http_requests_total", "HTTP responses by route template and status", ("method", "route", "status"))
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time until the last byte of the response was sent", ("method", "route")
+)
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being processed")
+redis_command_duration = registry.histogram(
+    "redis_command_duration_seconds", "Redis round trips by command (PIPELINE for pipelines)", ("command",), FAST_BUCKETS
+)
+rate_limit_rejections = registry.counter("rate_limit_rejections_total", "Requests answered 429, by rate limit policy", ("policy",))
+
+UNMATCHED_ROUTE = "unmatched"  # 404s, mounts: raw paths would make unbounded label values
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency, status and in-flight count per
+    route template (e.g. /api/v1/answer-type/answer-types/{answer_type_id}).
+    Add it last so it is the outermost layer and sees rate-limited requests too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            route = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            http_request_duration.observe(time.perf_counter() - started, method, route)
+            http_requests.inc(method, route, str(status_code))
+
+def instrument_redis(client: Any) -> Any:
+    """Time every command (and pipeline) of a redis.asyncio client in redis_command_duration"""
+    execute_command = client.execute_command
+    pipeline = client.pipeline
+
+    async def timed_execute_command(*args, **options):
+        started = time.perf_counter()
+        try:
+            return await execute_command(*args, **options)
+        finally:
+            redis_command_duration.observe(time.perf_counter() - started, str(args[0]).upper())
+
+    def timed_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def timed_execute(*execute_args, **execute_kwargs):
+            started = time.perf_counter()
+            try:
+                return await execute(*execute_args, **execute_kwargs)
+            finally:
+                redis_command_duration.observe(time.perf_counter() - started, "PIPELINE")
+
+        pipe.execute = timed_execute
+        return pipe
+
+    client.execute_command = timed_execute_command
+    client.pipeline = timed_pipeline
+    return client
+
+def stats_metric(
+    name: str, help: str, stats: Callable[[], Dict[str, Any]], *path: str, kind: str = "gauge", default: float = 0
+) -> CallbackMetric:
+    """Register a metric reading stats()[path[0]][path[1]]... (e.g. get_pool_stats, "freesize")"""
+    def read():
+        value: Optional[Any] = stats()
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        return default if value is None else float(value)
+
+    return registry.register(CallbackMetric(name, help, read, kind))
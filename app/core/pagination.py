@@ -0,0 +1,32 @@
+import base64
+import binascii
+import json
+from typing import Any, List
+from app.core.errors import ValidationError
+
+# Opaque keyset cursors: the sort key of the last row of a page, JSON-encoded
+# and base64url'd so clients treat it as a token rather than build it themselves.
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the keyset values of the last returned row"""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValidationError: If the cursor is malformed or has the wrong number of values
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValidationError("Invalid pagination cursor", details={"cursor": cursor})
+    if not isinstance(values, list) or len(values) != size:
+        raise ValidationError("Invalid pagination cursor", details={"cursor": cursor})
+    return values
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,85 @@
+from typing import Any, Dict, List, Optional
+from app.core.cache import build_cache_key, get_cached_data, set_cached_data, invalidate_cache
+from app.core.config import settings
+from app.db.session import acquire_connection
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# The authenticated user as seen by the API. Cached per JWT subject in the
+# two-tier cache (worker LRU + Redis) for PRINCIPAL_CACHE_TTL seconds.
+
+_PHP_STRING = re.compile(r's:\d+:"([^"]*)"')
+
+def parse_roles(raw: Optional[str]) -> List[str]:
+    """Decode fos_user.roles, stored as a PHP serialized array or as JSON"""
+    if not raw:
+        return []
+    if raw.lstrip().startswith("["):
+        return json.loads(raw)
+    return _PHP_STRING.findall(raw)
+
+def is_active(principal: Dict[str, Any]) -> bool:
+    return bool(principal["enabled"] and principal["is_valid"])
+
+def _principal_key(subject: str) -> str:
+    return build_cache_key("principal", subject)
+
+async def fetch_principal(subject: str) -> Optional[Dict[str, Any]]:
+    """Load the principal from fos_user (by email or username)"""
+    async with acquire_connection() as db, db.cursor() as cursor:
+        await cursor.execute(
+            "SELECT id, email, username, firstname, lastname, roles, enabled, is_valid FROM fos_user WHERE email = %s OR username = %s",
+            (subject, subject)
+        )
+        user = await cursor.fetchone()
+    if user is None:
+        return None
+    return {
+        "id": user[0],
+        "email": user[1],
+        "username": user[2],
+        "firstname": user[3],
+        "lastname": user[4],
+        "roles": parse_roles(user[5]),
+        "enabled": bool(user[6]),
+        "is_valid": bool(user[7])
+    }
+
+async def get_principal(subject: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve a JWT subject to its principal, from cache when possible.
+    The returned dict may be shared with other requests: do not mutate it.
+    """
+    key = _principal_key(subject)
+    try:
+        principal = await get_cached_data(key)
+        if principal is not None:
+            return principal
+    except Exception as e:
+        logger.warning("Principal cache read failed: %s", e)
+
+    principal = await fetch_principal(subject)
+    if principal is not None:
+        try:
+            await set_cached_data(key, principal, expire=settings.PRINCIPAL_CACHE_TTL)
+        except Exception as e:
+            logger.warning("Principal cache write failed: %s", e)
+    return principal
+
+async def invalidate_principal(*subjects: str) -> None:
+    """
+    Drop cached principals on every worker. Call whenever a user is disabled,
+    invalidated or edited (pass both email and username if they differ);
+    fos_user is edited outside this API, which exposes this as
+    POST /users/principals/invalidate. Tokens with an embedded principal
+    (JWT_EMBED_PRINCIPAL) are not affected: they stay valid until they expire.
+    """
+    for subject in subjects:
+        await invalidate_cache(_principal_key(subject))
+
+def principal_claims(principal: Dict[str, Any]) -> Dict[str, Any]:
+    """Snapshot embedded in access tokens when JWT_EMBED_PRINCIPAL is enabled"""
+    return {"principal": principal}
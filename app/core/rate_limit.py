@@ -1,83 +1,433 @@
-from fastapi import Request, HTTPException
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from jose import JWTError
 from app.core.cache import redis
+from app.core.config import settings
+from app.core.metrics import rate_limit_rejections
+from app.core.security import decode_access_token
+import asyncio
+import math
+import re
 import time
-from typing import Optional
+import uuid
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Each script checks and consumes `cost` tokens in a single EVALSHA, using the
+# Redis clock so every worker agrees on time. They all return
+# {allowed (0/1), remaining, retry_after_ms, reset_after_ms}.
+
+SLIDING_WINDOW_LOG_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local member = ARGV[3]
+local cost = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+if count + cost > limit then
+    -- wait until enough of the oldest entries have left the window
+    local index = math.min(count + cost - limit, count) - 1
+    local retry = window
+    if index >= 0 then
+        local entry = redis.call('ZRANGE', key, index, index, 'WITHSCORES')
+        retry = tonumber(entry[2]) + window - now
+    end
+    return {0, limit - count, retry, retry}
+end
+for i = 1, cost do
+    redis.call('ZADD', key, now, member .. ':' .. i)
+end
+redis.call('PEXPIRE', key, window)
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return {1, limit - count - cost, 0, tonumber(oldest[2]) + window - now}
+"""
+
+SLIDING_WINDOW_COUNTER_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local window_start = now - (now % window)
+
+local state = redis.call('HMGET', key, 'start', 'cur', 'prev')
+local start = tonumber(state[1]) or window_start
+local cur = tonumber(state[2]) or 0
+local prev = tonumber(state[3]) or 0
+if start ~= window_start then
+    if start == window_start - window then prev = cur else prev = 0 end
+    cur = 0
+end
+
+local elapsed = now - window_start
+local weighted = prev * (window - elapsed) / window + cur
+if weighted + cost > limit then
+    local retry = window - elapsed
+    if cur + cost <= limit and prev > 0 then
+        -- wait until enough of the previous window has slid out
+        retry = math.ceil(window * (1 - (limit - cur - cost) / prev)) - elapsed
+    end
+    return {0, math.max(math.floor(limit - weighted), 0), retry, window - elapsed}
+end
+cur = cur + cost
+redis.call('HSET', key, 'start', window_start, 'cur', cur, 'prev', prev)
+redis.call('PEXPIRE', key, window * 2)
+return {1, math.floor(limit - weighted - cost), 0, window - elapsed}
+"""
+
+GCRA_SCRIPT = """
+local key = KEYS[1]
+local emission = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local tolerance = emission * burst
+
+local tat = tonumber(redis.call('GET', key) or now)
+if tat < now then tat = now end
+local new_tat = tat + emission * cost
+local allow_at = new_tat - tolerance
+if now < allow_at then
+    return {0, math.max(math.floor((tolerance - (tat - now)) / emission), 0), allow_at - now, tat - now}
+end
+redis.call('SET', key, new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((tolerance - (new_tat - now)) / emission), 0, new_tat - now}
+"""
+
+ALGORITHMS = {
+    "sliding_window_log": SLIDING_WINDOW_LOG_SCRIPT,
+    "sliding_window_counter": SLIDING_WINDOW_COUNTER_SCRIPT,
+    "gcra": GCRA_SCRIPT,
+}
+
+MODES = ("exact", "approximate")
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds
+    reset_after: float  # seconds
+
+    def headers(self) -> Dict[str, str]:
+        """X-RateLimit-* headers (plus Retry-After when rejected)"""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(self.remaining, 0)),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(math.ceil(self.retry_after), 1))
+        return headers
+
+def get_client_identity(request: Request) -> str:
+    """
+    Rate-limit identity: the JWT subject when a valid bearer token is sent,
+    otherwise the client IP (so users behind one NAT get separate buckets).
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = decode_access_token(token).get("sub")
+            if subject:
+                return f"user:{subject}"
+        except JWTError:
+            pass
+    return f"ip:{request.client.host}"
+
+class _LocalBucket:
+    """Per-client sliding window counter in approximate mode"""
+    __slots__ = ("window_start", "previous", "synced", "pending")
+
+    def __init__(self, window_start: float, previous: int = 0):
+        self.window_start = window_start
+        self.previous = previous  # total of the previous window (all workers), as last known
+        self.synced = 0  # window total in Redis (all workers) at the last sync
+        self.pending = 0  # admitted locally, not yet pushed to Redis
+
 class RateLimiter:
+    """
+    Distributed rate limiter with a budget of requests_per_minute tokens per
+    client; each request consumes its route's cost.
+
+    mode="exact" checks and consumes atomically in Redis on every request.
+    mode="approximate" admits requests against local per-client sliding
+    window counters and pushes consumed counts to Redis in batches every
+    sync_interval_ms. Each worker may admit at most error_bound * limit tokens
+    per client between syncs, so the overshoot per window is bounded by
+    workers * that budget. It always approximates sliding_window_counter;
+    the other algorithms need the exact mode.
+    """
+
     def __init__(
         self,
-        requests_per_minute: int = 60,
-        burst_size: int = 10,
-        key_prefix: str = "rate_limit"
+        requests_per_minute: int = settings.RATE_LIMIT_REQUESTS_PER_MINUTE,
+        burst_size: int = settings.RATE_LIMIT_BURST_SIZE,
+        key_prefix: str = "rate_limit",
+        algorithm: str = settings.RATE_LIMIT_ALGORITHM,
+        mode: str = "exact",
+        sync_interval_ms: int = settings.RATE_LIMIT_SYNC_INTERVAL_MS,
+        error_bound: float = settings.RATE_LIMIT_ERROR_BOUND
     ):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown rate limiting algorithm: {algorithm}")
+        if mode not in MODES:
+            raise ValueError(f"Unknown rate limiting mode: {mode}")
+        if mode == "approximate" and algorithm != "sliding_window_counter":
+            logger.warning(
+                "Rate limiter %s: approximate mode counts with a sliding window counter, algorithm %s is not used",
+                key_prefix, algorithm
+            )
         self.requests_per_minute = requests_per_minute
         self.burst_size = burst_size
         self.key_prefix = key_prefix
+        self.algorithm = algorithm
+        self.mode = mode
         self.window_size = 60  # 1 minute window
+        self._script = redis.register_script(ALGORITHMS[algorithm])
+        # Approximate mode state
+        self.sync_interval = sync_interval_ms / 1000
+        self.local_budget = max(1, int(requests_per_minute * error_bound))
+        self._buckets: Dict[str, _LocalBucket] = {}
+        self._retired: List[Tuple[str, _LocalBucket]] = []  # buckets of past windows with counts still to push
+        self._sync_retry_at = 0.0  # after a failed sync, requests do not wait on Redis again before this
+        self._sync_lock = asyncio.Lock()
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def _script_args(self, cost: int) -> list:
+        window_ms = self.window_size * 1000
+        if self.algorithm == "gcra":
+            return [window_ms / self.requests_per_minute, self.burst_size, cost]
+        if self.algorithm == "sliding_window_log":
+            return [self.requests_per_minute, window_ms, uuid.uuid4().hex, cost]
+        return [self.requests_per_minute, window_ms, cost]
+
+    @property
+    def limit(self) -> int:
+        if self.mode == "exact" and self.algorithm == "gcra":
+            return self.burst_size
+        return self.requests_per_minute
 
-    async def is_rate_limited(self, request: Request) -> bool:
+    async def check(self, request: Request, cost: int = 1, identity: Optional[str] = None) -> Optional[RateLimitResult]:
         """
-        Check if the request should be rate limited.
-        Uses Redis for distributed rate limiting.
+        Check and consume cost tokens for the client (identity defaults to
+        get_client_identity). Returns None when Redis is unavailable (fail open).
         """
-        # Get client IP
-        client_ip = request.client.host
-        key = f"{self.key_prefix}:{client_ip}"
-        
+        identity = identity or get_client_identity(request)
+        if self.mode == "approximate":
+            return await self._check_local(f"{self.key_prefix}:approx:{identity}", cost)
+        key = f"{self.key_prefix}:{self.algorithm}:{identity}"
+
         try:
-            # Get current window data
-            current = await redis.get(key)
-            if not current:
-                # First request in window
-                await redis.setex(
-                    key,
-                    self.window_size,
-                    f"{time.time()}:{self.burst_size}"
-                )
-                return False
-                
-            # Parse window data
-            window_start, tokens = current.split(":")
-            tokens = int(tokens)
-            window_start = float(window_start)
-            
-            # Check if window has expired
-            if time.time() - window_start > self.window_size:
-                await redis.setex(
-                    key,
-                    self.window_size,
-                    f"{time.time()}:{self.burst_size}"
-                )
-                return False
-                
-            # Check if we have tokens
-            if tokens <= 0:
-                return True
-                
-            # Consume a token
-            await redis.setex(
-                key,
-                self.window_size,
-                f"{window_start}:{tokens - 1}"
+            allowed, remaining, retry_after_ms, reset_after_ms = await self._script(
+                keys=[key], args=self._script_args(cost)
             )
-            return False
-            
         except Exception as e:
-            logger.error(f"Rate limiting error: {e}")
-            # Fail open on Redis errors
-            return False
+            logger.error("Rate limiting error: %s", e)
+            return None
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=self.limit,
+            remaining=int(remaining),
+            retry_after=int(retry_after_ms) / 1000,
+            reset_after=int(reset_after_ms) / 1000
+        )
+
+    async def is_rate_limited(self, request: Request, cost: int = 1) -> bool:
+        """
+        Check if the request should be rate limited.
+        Uses Redis for distributed rate limiting.
+        """
+        result = await self.check(request, cost)
+        return result is not None and not result.allowed
+
+    async def _check_local(self, key: str, cost: int) -> Optional[RateLimitResult]:
+        """
+        Sliding window counter check against the local bucket (the same
+        weighting as SLIDING_WINDOW_COUNTER_SCRIPT), syncing first if the
+        local budget is spent. While Redis is unavailable, requests over the
+        limit fail open like in exact mode (None); they are still counted.
+        """
+        self._ensure_sync_task()
+        now = time.time()
+        window_start = now - (now % self.window_size)
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.window_start != window_start:
+            previous = 0
+            if bucket is not None:
+                if bucket.pending:
+                    self._retired.append((key, bucket))
+                if bucket.window_start == window_start - self.window_size:
+                    previous = bucket.synced + bucket.pending
+            bucket = self._buckets[key] = _LocalBucket(window_start, previous)
+        if bucket.pending + cost > self.local_budget and time.monotonic() >= self._sync_retry_at:
+            await self._sync([(key, bucket)])
+
+        limit = self.requests_per_minute
+        elapsed = now - window_start
+        current = bucket.synced + bucket.pending
+        weighted = bucket.previous * (self.window_size - elapsed) / self.window_size + current
+        reset_after = self.window_size - elapsed
+        if weighted + cost > limit:
+            if time.monotonic() < self._sync_retry_at:
+                bucket.pending += cost
+                return None
+            retry_after = reset_after
+            if current + cost <= limit and bucket.previous > 0:
+                # wait until enough of the previous window has slid out
+                retry_after = self.window_size * (1 - (limit - current - cost) / bucket.previous) - elapsed
+            return RateLimitResult(False, self.limit, max(math.floor(limit - weighted), 0), retry_after, reset_after)
+        bucket.pending += cost
+        return RateLimitResult(True, self.limit, math.floor(limit - weighted - cost), 0, reset_after)
+
+    async def _sync(self, buckets: List[Tuple[str, _LocalBucket]]) -> None:
+        """Push pending counts to Redis in one pipeline and pull back the global totals"""
+        async with self._sync_lock:
+            batch = [(key, bucket, bucket.pending) for key, bucket in buckets if bucket.pending]
+            if not batch:
+                return
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    for key, bucket, count in batch:
+                        window_key = f"{key}:{int(bucket.window_start)}"
+                        pipe.incrby(window_key, count)
+                        pipe.expire(window_key, self.window_size * 2)
+                    results = await pipe.execute()
+            except Exception as e:
+                # Keep the counts for the next sync; meanwhile requests are only
+                # checked locally instead of waiting on Redis each time
+                logger.error("Rate limit sync error: %s", e)
+                self._sync_retry_at = time.monotonic() + max(self.sync_interval, 1)
+                return
+            for (key, bucket, count), total in zip(batch, results[::2]):
+                bucket.pending -= count
+                bucket.synced = int(total)
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            await self._sync(self._retired + list(self._buckets.items()))
+            self._forget_flushed()
+
+    def _forget_flushed(self) -> None:
+        """Drop buckets that are flushed and no longer weigh on the current window"""
+        now = time.time()
+        self._retired = [
+            (key, bucket) for key, bucket in self._retired
+            if bucket.pending and bucket.window_start + self.window_size * 2 > now
+        ]
+        for key, bucket in list(self._buckets.items()):
+            if bucket.window_start + self.window_size * 2 <= now and not bucket.pending:
+                del self._buckets[key]
+
+    def _ensure_sync_task(self) -> None:
+        task = self._sync_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def close(self) -> None:
+        """Stop background syncing and flush what is still pending"""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+        await self._sync(self._retired + list(self._buckets.items()))
+        self._forget_flushed()
+
+class RateLimitPolicy(NamedTuple):
+    """Limit applied to one route: which limiter (bucket) it draws from and at what cost"""
+    name: str
+    path: str  # route template, e.g. "/api/v1/answer-type/answer-types/{answer_type_id}"
+    limiter: RateLimiter
+    cost: int = 1
+    methods: Tuple[str, ...] = ()  # empty matches every method
+
+def _compile_path(path: str) -> Pattern:
+    return re.compile("^" + re.sub(r"\\\{[^/]+?\\\}", "[^/]+", re.escape(path)) + "$")
+
+# General traffic draws from one approximate budget; strict limits stay exact
+rate_limiter = RateLimiter(mode=settings.RATE_LIMIT_MODE)
+auth_rate_limiter = RateLimiter(
+    requests_per_minute=settings.RATE_LIMIT_AUTH_REQUESTS_PER_MINUTE,
+    key_prefix="rate_limit:auth",
+    mode="exact"
+)
+
+rate_limit_policies: List[RateLimitPolicy] = [
+    # bcrypt/LDAP verification: separate, exact bucket keyed by IP (no token yet at login)
+    RateLimitPolicy("login", f"{settings.API_V1_STR}/auth/token", auth_rate_limiter, methods=("POST",)),
+    # join + translation lookups over the whole catalog
+    RateLimitPolicy(
+        "answer_type_list", f"{settings.API_V1_STR}/answer-type/answer-types", rate_limiter,
+        cost=settings.RATE_LIMIT_LIST_COST, methods=("GET",)
+    ),
+    # ranked search, then the same join as the list for the matching page
+    RateLimitPolicy(
+        "answer_type_search", f"{settings.API_V1_STR}/answer-type/answer-types/search", rate_limiter,
+        cost=settings.RATE_LIMIT_LIST_COST, methods=("GET",)
+    ),
+    # streams the whole table, holding a pooled connection until the client has read it
+    RateLimitPolicy(
+        "answer_type_export", f"{settings.API_V1_STR}/answer-type/answer-types/export", rate_limiter,
+        cost=settings.RATE_LIMIT_EXPORT_COST, methods=("GET",)
+    ),
+    # up to IMPORT_MAX_ROWS rows written in one transaction
+    RateLimitPolicy(
+        "answer_type_import", f"{settings.API_V1_STR}/answer-type/answer-types/import", rate_limiter,
+        cost=settings.RATE_LIMIT_IMPORT_COST, methods=("POST",)
+    ),
+]
+default_rate_limit_policy = RateLimitPolicy("default", "", rate_limiter)
+
+def _fit_cost(policy: RateLimitPolicy) -> RateLimitPolicy:
+    """
+    Cap the cost at the limiter's limit: a request costing more than the whole
+    budget (e.g. an export under exact GCRA, whose limit is the burst size)
+    would otherwise be rejected forever.
+    """
+    if policy.cost <= policy.limiter.limit:
+        return policy
+    logger.warning(
+        "Rate limit policy %s: cost %d exceeds the limit of %d, capped",
+        policy.name, policy.cost, policy.limiter.limit
+    )
+    return policy._replace(cost=policy.limiter.limit)
+
+rate_limit_policies = [_fit_cost(policy) for policy in rate_limit_policies]
+_compiled_policies = [(_compile_path(policy.path), policy) for policy in rate_limit_policies]
+
+def get_rate_limit_policy(method: str, path: str) -> RateLimitPolicy:
+    """First declared policy matching the request, or the default one"""
+    for pattern, policy in _compiled_policies:
+        if (not policy.methods or method in policy.methods) and pattern.match(path):
+            return policy
+    return default_rate_limit_policy
 
-# Create rate limiter instance
-rate_limiter = RateLimiter()
+async def close_rate_limiters() -> None:
+    """Flush approximate-mode counters on shutdown"""
+    limiters = {id(policy.limiter): policy.limiter for policy in [*rate_limit_policies, default_rate_limit_policy]}
+    for limiter in limiters.values():
+        await limiter.close()
 
 async def rate_limit_middleware(request: Request, call_next):
     """Rate limiting middleware"""
-    if await rate_limiter.is_rate_limited(request):
-        raise HTTPException(
-            status_code=429,
-            detail="Too many requests. Please try again later."
+    policy = get_rate_limit_policy(request.method, request.url.path)
+    result = await policy.limiter.check(request, policy.cost)
+    if result is not None and not result.allowed:
+        rate_limit_rejections.inc(policy.name)
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Too many requests. Please try again later."},
+            headers=result.headers()
         )
-    return await call_next(request) 
\ No newline at end of file
+    response = await call_next(request)
+    if result is not None:
+        response.headers.update(result.headers())
+    return response
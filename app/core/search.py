@@ -0,0 +1,187 @@
+import bisect
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Tuple
+from app.core.errors import ValidationError
+from app.core.pagination import decode_cursor, encode_cursor
+
+# In-process full-text search: accent-insensitive tokens, prefix matching and
+# BM25 ranking with per-field weights. Meant for reference data that fits in
+# memory (a few thousand documents per worker); the index is rebuilt or patched
+# by its owner, see app.db.repositories.lov.answer_type_search.
+
+_TOKEN = re.compile(r"\w+")
+# Ligatures NFKD leaves alone (French: cœur, ex æquo)
+_LIGATURES = str.maketrans({"œ": "oe", "Œ": "oe", "æ": "ae", "Æ": "ae", "ß": "ss"})
+
+MAX_QUERY_TERMS = 8
+PREFIX_WEIGHT = 0.5  # share of the score a prefix match earns compared to the exact term
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SearchHit = Tuple[Any, float]  # (document id, score)
+
+def fold(text: str) -> str:
+    """Lowercase text without accents: "Évaluation Cœur" -> "evaluation coeur" """
+    decomposed = unicodedata.normalize("NFKD", text.translate(_LIGATURES))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Folded word tokens of a text"""
+    return _TOKEN.findall(fold(text)) if text else []
+
+def query_terms(query: str) -> List[str]:
+    """Distinct tokens of a search query, at most MAX_QUERY_TERMS"""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+class InvertedIndex:
+    """
+    Inverted index over documents made of weighted text fields.
+
+    A document matches when every query term is one of its tokens or the prefix
+    of one (prefix matches score PREFIX_WEIGHT of an exact match). Term frequencies
+    are summed across fields after weighting, then ranked with BM25. Documents also
+    carry attributes (e.g. is_valid) that searches can filter on.
+
+    Not thread-safe: meant to be used from a single event loop.
+
+    Example:
+        index = InvertedIndex({"title": 3.0, "description": 1.0})
+        index.add(12, {"title": "Question à choix multiple", "description": None}, is_valid=True)
+        index.search("choi mult")  # -> [(12, score)]: prefixes of "choix" and "multiple"
+    """
+
+    def __init__(self, fields: Mapping[str, float]):
+        self.fields = dict(fields)
+        self._postings: Dict[str, Dict[Hashable, float]] = defaultdict(dict)
+        self._documents: Dict[Hashable, Tuple[float, List[str], Dict[str, Any]]] = {}
+        self._total_length = 0.0
+        self._sorted_terms: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._documents
+
+    def add(self, doc_id: Hashable, document: Mapping[str, Optional[str]], **attributes: Any) -> None:
+        """Index a document, replacing any previous version with the same id"""
+        self.remove(doc_id)
+        frequencies: Dict[str, float] = defaultdict(float)
+        for field, weight in self.fields.items():
+            for token in tokenize(document.get(field)):
+                frequencies[token] += weight
+        length = sum(frequencies.values())
+        for term, frequency in frequencies.items():
+            self._postings[term][doc_id] = frequency
+        self._documents[doc_id] = (length, list(frequencies), attributes)
+        self._total_length += length
+        self._sorted_terms = None
+
+    def remove(self, doc_id: Hashable) -> None:
+        """Drop a document if it is indexed"""
+        entry = self._documents.pop(doc_id, None)
+        if entry is None:
+            return
+        length, terms, _ = entry
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= length
+        self._sorted_terms = None
+
+    def clear(self) -> None:
+        """Remove every document"""
+        self._postings.clear()
+        self._documents.clear()
+        self._total_length = 0.0
+        self._sorted_terms = None
+
+    def _expand(self, term: str) -> List[str]:
+        """Indexed terms starting with term (term itself first when indexed)"""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        start = bisect.bisect_left(self._sorted_terms, term)
+        end = bisect.bisect_left(self._sorted_terms, term + "\U0010ffff", lo=start)
+        return self._sorted_terms[start:end]
+
+    def _term_scores(self, term: str) -> Dict[Hashable, float]:
+        """Best BM25 score per document among the terms term matches"""
+        count = len(self._documents)
+        average_length = self._total_length / count
+        scores: Dict[Hashable, float] = {}
+        for indexed_term in self._expand(term):
+            postings = self._postings[indexed_term]
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            boost = 1.0 if indexed_term == term else PREFIX_WEIGHT
+            for doc_id, frequency in postings.items():
+                length = self._documents[doc_id][0]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                score = boost * idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+
+    def search(self, query: str, where: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[SearchHit]:
+        """
+        Every matching document, best first (ties by id).
+
+        Args:
+            query: Free text; only its first MAX_QUERY_TERMS distinct tokens are used
+            where: Predicate on the document attributes
+
+        Returns:
+            (document id, score) pairs, scores rounded to 6 decimals
+        """
+        terms = query_terms(query)
+        if not terms or not self._documents:
+            return []
+        totals: Optional[Dict[Hashable, float]] = None
+        # Rarest terms first: the candidate set only shrinks
+        for scores in sorted((self._term_scores(term) for term in terms), key=len):
+            if totals is None:
+                totals = dict(scores)
+            else:
+                totals = {doc_id: total + scores[doc_id] for doc_id, total in totals.items() if doc_id in scores}
+            if not totals:
+                return []
+        hits = [
+            (doc_id, round(score, 6)) for doc_id, score in totals.items()
+            if where is None or where(self._documents[doc_id][2])
+        ]
+        hits.sort(key=lambda hit: (-hit[1], hit[0]))
+        return hits
+
+def decode_hit_cursor(page_cursor: str) -> Tuple[float, int]:
+    """
+    (score, id) of the last hit of the previous page.
+
+    Raises:
+        ValidationError: If page_cursor was tampered with
+    """
+    last_score, last_id = decode_cursor(page_cursor, 2)
+    if not isinstance(last_score, (int, float)) or not isinstance(last_id, int):
+        raise ValidationError("Invalid pagination cursor", details={"cursor": page_cursor})
+    return last_score, last_id
+
+def hit_cursor(hit: SearchHit) -> str:
+    """Cursor of the page that starts after this hit"""
+    return encode_cursor([hit[1], hit[0]])
+
+def paginate_hits(hits: List[SearchHit], page_cursor: Optional[str], limit: int) -> Tuple[List[SearchHit], Optional[str]]:
+    """
+    Keyset page of ranked hits, ordered by (score desc, id).
+
+    Raises:
+        ValidationError: If page_cursor was tampered with
+    """
+    if page_cursor is not None:
+        last_score, last_id = decode_hit_cursor(page_cursor)
+        hits = [hit for hit in hits if hit[1] < last_score or (hit[1] == last_score and hit[0] > last_id)]
+    page = hits[:limit]
+    next_cursor = hit_cursor(page[-1]) if len(hits) > limit else None
+    return page, next_cursor
@@ -1,20 +1,97 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from jose import jwt, JWTError
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
+from app.core.errors import ServiceUnavailableError
+from app.core.lru import LRUCache
+import asyncio
+import bcrypt
+import hashlib
+import time
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    # Symfony uses bcrypt with the format "$2y$" while Python's bcrypt uses "$2b$"
+    # We need to replace the prefix to make it compatible
+    if hashed_password.startswith('$2y$'):
+        hashed_password = '$2b$' + hashed_password[4:]
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+# bcrypt costs ~100-300 ms of CPU: run it on a dedicated executor, with at most
+# PASSWORD_HASH_MAX_CONCURRENCY jobs in flight and a bounded wait for a slot
+_hash_executor: Optional[Executor] = None
+_hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+_hash_stats = {"queued": 0, "in_flight": 0, "completed": 0, "timeouts": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+    if _hash_executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_MAX_CONCURRENCY)
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_MAX_CONCURRENCY, thread_name_prefix="password-hash"
+            )
+    return _hash_executor
+
+async def _run_password_job(func: Callable, *args: Any) -> Any:
+    """Run a hashing function on the executor once a concurrency slot is free"""
+    _hash_stats["queued"] += 1
+    try:
+        await asyncio.wait_for(_hash_slots.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _hash_stats["timeouts"] += 1
+        raise ServiceUnavailableError(
+            "Authentication service is busy, please retry",
+            details={"queue_timeout": settings.PASSWORD_HASH_QUEUE_TIMEOUT}
+        )
+    finally:
+        _hash_stats["queued"] -= 1
+    _hash_stats["in_flight"] += 1
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        elapsed = time.perf_counter() - start
+        _hash_stats["in_flight"] -= 1
+        _hash_stats["completed"] += 1
+        _hash_stats["total_seconds"] += elapsed
+        _hash_stats["max_seconds"] = max(_hash_stats["max_seconds"], elapsed)
+        _hash_slots.release()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password without blocking the event loop"""
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash without blocking the event loop"""
+    return await _run_password_job(get_password_hash, password)
+
+def get_password_hash_stats() -> Dict[str, Any]:
+    """Queue depth, concurrency and latency of password hashing on this worker"""
+    completed = _hash_stats["completed"]
+    return {
+        **_hash_stats,
+        "max_concurrency": settings.PASSWORD_HASH_MAX_CONCURRENCY,
+        "executor": settings.PASSWORD_HASH_EXECUTOR,
+        "avg_seconds": round(_hash_stats["total_seconds"] / completed, 6) if completed else 0.0
+    }
+
+def shutdown_password_executor() -> None:
+    """Release executor threads/processes on shutdown"""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -25,17 +102,64 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    return email 
\ No newline at end of file
+# Verified-token cache: clients reuse one bearer token for its whole lifetime,
+# so signature and claim checks are done once per token and worker. Entries
+# are keyed by a digest of the token and live until the token's exp.
+_token_cache = LRUCache(max_size=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+_revoked_tokens = LRUCache(max_size=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+_revocation_hooks: List[Callable[[Dict[str, Any]], bool]] = []
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a JWT and return its claims, from the verified-token cache when possible.
+    The returned dict may be shared: do not mutate it.
+
+    Raises:
+        JWTError: If the token is invalid, expired or revoked
+    """
+    digest = _token_digest(token)
+    claims = _token_cache.get(digest)
+    if claims is None:
+        if digest in _revoked_tokens:
+            raise JWTError("Token has been revoked.")
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        ttl = claims.get("exp", 0) - time.time()
+        if ttl > 0:
+            _token_cache.set(digest, claims, ttl=ttl)
+    elif claims["exp"] <= time.time():
+        _token_cache.delete(digest)
+        raise JWTError("Signature has expired.")
+
+    # Hooks also run for cached tokens, so they take effect immediately
+    if any(hook(claims) for hook in _revocation_hooks):
+        raise JWTError("Token has been revoked.")
+    return claims
+
+def register_revocation_hook(hook: Callable[[Dict[str, Any]], bool]) -> None:
+    """
+    Add a check run on every token verification, cached or not; returning True
+    rejects the token. Hooks run on every authenticated request: keep them cheap
+    (no I/O).
+    """
+    _revocation_hooks.append(hook)
+
+def revoke_token(token: str) -> None:
+    """
+    Reject a token on this worker until it expires. Other workers keep
+    accepting it: to revoke everywhere, register a revocation hook backed by
+    shared state instead.
+    """
+    digest = _token_digest(token)
+    _token_cache.delete(digest)
+    _revoked_tokens.set(digest, True)
+
+def forget_tokens() -> None:
+    """Drop every cached verification, e.g. after rotating SECRET_KEY"""
+    _token_cache.clear()
+
+def get_token_cache_stats() -> Dict[str, Any]:
+    """Hit rate of the verified-token cache on this worker"""
+    return {**_token_cache.stats(), "revoked": len(_revoked_tokens)}
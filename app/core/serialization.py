@@ -0,0 +1,35 @@
+from functools import lru_cache
+from typing import Any, Optional
+from fastapi import Response
+from pydantic import TypeAdapter
+
+# Fast JSON path for large responses.
+#
+# Rows coming from MySQL already have the types of the response models, so
+# loaders return plain dicts typed with a TypedDict mirror of the model (no
+# model instances, no validation) and handlers return the bytes produced by
+# pydantic-core's serializer for that TypedDict. Returning a Response also
+# skips FastAPI's response_model re-validation and the stdlib json encoder;
+# response_model is still declared for the OpenAPI schema. The serializer warns
+# on values that do not fit the schema, and the tests check that the output is
+# byte-for-byte what the validated model produces.
+#
+# model_construct() is not used: with pydantic-core, validating constructors
+# are as fast as it is, and both cost several times more than building a dict.
+
+@lru_cache(maxsize=None)
+def get_type_adapter(tp: Any) -> TypeAdapter:
+    """TypeAdapter per type, built once (building one compiles its serializer)"""
+    return TypeAdapter(tp)
+
+def dump_json(value: Any, tp: Optional[Any] = None) -> bytes:
+    """Serialize a model (or any value of type `tp`) to compact JSON bytes"""
+    return get_type_adapter(tp if tp is not None else type(value)).dump_json(value)
+
+class RawJSONResponse(Response):
+    """JSON response whose content is already encoded"""
+    media_type = "application/json"
+
+def json_response(value: Any, tp: Optional[Any] = None, **kwargs) -> RawJSONResponse:
+    """Response serializing `value` through its TypeAdapter, without validation"""
+    return RawJSONResponse(content=dump_json(value, tp), **kwargs)
@@ -0,0 +1,207 @@
+import logging
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from aiomysql import Cursor, SSCursor
+from app.core.config import settings
+from app.core.lru import LRUCache
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Every statement sent through the pool's cursors is timed, reduced to a
+# fingerprint (literals and placeholders replaced by ?) and counted against the
+# current request, so slow statements and N+1 loops show up without a profiler.
+
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "MySQL statement latency by statement type", ("statement",)
+)
+db_slow_queries = registry.counter("db_slow_queries_total", "Statements slower than SQL_SLOW_QUERY_MS", ("statement",))
+
+_STATEMENTS = {"select", "insert", "update", "delete", "replace"}
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql: str) -> str:
+    """
+    Normalised form of a statement: lower case, single spaces, literals and
+    placeholders as ?, value lists as (...). `IN (%s, %s)` and `IN (%s)` share
+    a fingerprint, so a loop of lookups is recognised whatever its batch size.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _VALUE_LIST.sub("(...)", sql)
+    return " ".join(sql.split()).lower()
+
+def statement_type(fingerprint: str) -> str:
+    """First keyword of a fingerprint (select, insert...), "other" for the rest: a bounded metric label"""
+    keyword = fingerprint.split(" ", 1)[0]
+    return keyword if keyword in _STATEMENTS else "other"
+
+def _redact(value: Any) -> Any:
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (list, tuple, set)):
+        return [_redact(item) for item in value]
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+def redact_params(args: Any, many: bool = False) -> Any:
+    """Describe statement parameters by type and length only: logs never carry user data"""
+    if args is None:
+        return None
+    if many:
+        args = list(args)
+        return {"rows": len(args), "first": redact_params(args[0]) if args else None}
+    if isinstance(args, dict):
+        return {key: _redact(value) for key, value in args.items()}
+    return _redact(args)
+
+class RequestQueries:
+    """Statements executed while handling one request"""
+
+    __slots__ = ("count", "total_time", "fingerprints")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.fingerprints: Dict[str, int] = {}
+
+    def record(self, fingerprint: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.fingerprints[fingerprint] = self.fingerprints.get(fingerprint, 0) + 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Fingerprints executed at least threshold times (N+1 suspects), most frequent first"""
+        return sorted(
+            ((sql, count) for sql, count in self.fingerprints.items() if count >= threshold),
+            key=lambda item: -item[1]
+        )
+
+# Set by QueryStatsMiddleware for the duration of a request; None elsewhere
+# (lifespan, MCP tools, background tasks), where only metrics and the slow log apply
+request_queries: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+# Fingerprints already explained, so a slow statement is EXPLAINed once an hour, not on every run
+_explained = LRUCache(max_size=256, ttl=3600)
+
+def record_query(sql: str, args: Any, elapsed: float, many: bool = False) -> bool:
+    """Account one statement; returns whether it was slow (and logged)"""
+    query_fingerprint = fingerprint(sql)
+    statement = statement_type(query_fingerprint)
+    db_query_duration.observe(elapsed, statement)
+    queries = request_queries.get()
+    if queries is not None:
+        queries.record(query_fingerprint, elapsed)
+    if elapsed * 1000 < settings.SQL_SLOW_QUERY_MS:
+        return False
+    db_slow_queries.inc(statement)
+    logger.warning(
+        "Slow query (%.1f ms): %s params=%s", elapsed * 1000, query_fingerprint, redact_params(args, many),
+        extra={"duration_ms": round(elapsed * 1000, 2), "fingerprint": query_fingerprint}
+    )
+    return True
+
+class InstrumentedCursorMixin:
+    """
+    Times execute()/executemany() through record_query. executemany() runs
+    execute() per chunk or row internally; those inner calls are not counted
+    again, so a bulk statement is one entry with its total time.
+    """
+
+    _in_executemany = False
+
+    async def execute(self, query, args=None):
+        if self._in_executemany:
+            return await super().execute(query, args)
+        started = time.perf_counter()
+        try:
+            result = await super().execute(query, args)
+        except BaseException:
+            record_query(query, args, time.perf_counter() - started)
+            raise
+        if record_query(query, args, time.perf_counter() - started):
+            await self._explain(query, args)
+        return result
+
+    async def executemany(self, query, args):
+        started = time.perf_counter()
+        self._in_executemany = True
+        try:
+            return await super().executemany(query, args)
+        finally:
+            self._in_executemany = False
+            record_query(query, args, time.perf_counter() - started, many=True)
+
+    async def _explain(self, query, args) -> None:
+        """Log the plan of a slow SELECT (SQL_EXPLAIN_SLOW), once per fingerprint and hour"""
+        if not settings.SQL_EXPLAIN_SLOW or isinstance(self, SSCursor):
+            return  # an unbuffered result set still occupies the connection
+        query_fingerprint = fingerprint(query)
+        if statement_type(query_fingerprint) != "select" or query_fingerprint in _explained:
+            return
+        _explained.set(query_fingerprint, True)
+        try:
+            # A plain cursor: the EXPLAIN itself is neither timed nor counted
+            async with self.connection.cursor(Cursor) as cursor:
+                await cursor.execute(f"EXPLAIN {query}", args)
+                columns = [column[0] for column in cursor.description or ()]
+                plan = [dict(zip(columns, row)) for row in await cursor.fetchall()]
+            logger.warning("Plan of slow query %s: %s", query_fingerprint, plan)
+        except Exception as e:
+            logger.warning("EXPLAIN failed for %s: %s", query_fingerprint, e)
+
+class InstrumentedCursor(InstrumentedCursorMixin, Cursor):
+    """Default cursor of the pool (see app.db.session)"""
+
+class InstrumentedSSCursor(InstrumentedCursorMixin, SSCursor):
+    """Unbuffered cursor for streaming exports; execute() times the query until its first row"""
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware counting the statements of each request. Fingerprints run at
+    least SQL_N_PLUS_ONE_THRESHOLD times are logged at debug level as N+1
+    suspects; with SQL_DEBUG_HEADERS the counts are also sent as X-DB-* headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        queries = RequestQueries()
+        token = request_queries.set(queries)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.SQL_DEBUG_HEADERS:
+                message["headers"] = [*message.get("headers", ()), *self._headers(queries)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_queries.reset(token)
+            for sql, count in queries.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD):
+                logger.debug("Possible N+1 on %s %s: %d x %s", scope["method"], scope["path"], count, sql)
+
+    @staticmethod
+    def _headers(queries: RequestQueries) -> List[Tuple[bytes, bytes]]:
+        headers = [
+            (b"x-db-query-count", str(queries.count).encode()),
+            (b"x-db-query-time-ms", f"{queries.total_time * 1000:.1f}".encode()),
+        ]
+        repeated = queries.repeated(settings.SQL_N_PLUS_ONE_THRESHOLD)
+        if repeated:
+            sql, count = repeated[0]
+            headers.append((b"x-db-n-plus-one", f"{count} x {sql[:200]}".encode("latin-1", "replace")))
+        return headers
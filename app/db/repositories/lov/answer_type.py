@@ -0,0 +1,411 @@
+import logging
+import time
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from slugify import slugify
+from app.core.cache import invalidate_tags
+from app.core.config import settings
+from app.core.errors import ValidationError
+from app.core.pagination import decode_cursor, encode_cursor, escape_like
+from app.db.instrumentation import InstrumentedSSCursor
+from app.db.repositories.translation import TranslationMap, TranslationRepository
+from app.models.lov.answer_type import AnswerTypeCreate, AnswerTypeRecord
+from app.models.shared import UserShortRecord
+
+logger = logging.getLogger(__name__)
+
+ANSWER_TYPE_CLASS = "App\\Entity\\LovManagement\\AnswerType"
+
+# Cache tags: the list tag covers every collection response, the item tag a single answer type
+ANSWER_TYPE_LIST_TAG = "answer_type:list"
+ANSWER_TYPE_ITEM_TAG = "answer_type:{answer_type_id}"
+
+answer_type_translations = TranslationRepository(ANSWER_TYPE_CLASS, fields=("title",))
+
+_SELECT = """
+    SELECT
+        at.id,
+        cu.id as create_user_id, cu.firstname as create_user_firstname, cu.lastname as create_user_lastname,
+        uu.id as update_user_id, uu.firstname as update_user_firstname, uu.lastname as update_user_lastname,
+        at.title, at.description, at.keywords, at.sort, at.revision, at.create_date, at.update_date, at.is_valid, at.conditional
+    FROM answer_type at
+    LEFT JOIN fos_user cu ON at.create_user_id = cu.id
+    LEFT JOIN fos_user uu ON at.update_user_id = uu.id
+"""
+
+# Flat export: no user join, foreign keys only
+_EXPORT_SELECT = """
+    SELECT
+        at.id, at.title, at.description, at.keywords, at.sort, at.revision,
+        at.create_date, at.update_date, at.is_valid, at.conditional,
+        at.create_user_id, at.update_user_id
+    FROM answer_type at
+"""
+
+EXPORT_COLUMNS = [
+    "id", "title", "title_fr", "description", "keywords", "sort", "revision",
+    "create_date", "update_date", "is_valid", "conditional", "create_user_id", "update_user_id"
+]
+
+# Bulk upsert: rows with a known id go through ON DUPLICATE KEY UPDATE (one
+# multi-row statement), updating the same columns as PUT /answer-types/{id}
+_UPSERT = """
+    INSERT INTO answer_type
+        (id, create_user_id, update_user_id, title, description, keywords, sort, revision, create_date, update_date, is_valid, conditional)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        update_user_id = VALUES(update_user_id), title = VALUES(title), description = VALUES(description),
+        keywords = VALUES(keywords), sort = VALUES(sort), revision = COALESCE(revision, 0) + 1, update_date = VALUES(update_date)
+"""
+
+_INSERT = """
+    INSERT INTO answer_type
+        (create_user_id, update_user_id, title, description, keywords, sort, revision, create_date, update_date, is_valid, conditional)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+class UpsertResult(NamedTuple):
+    id: Optional[int]
+    status: str  # created | updated | not_found (unknown id) | duplicate (same id, slug or target answer type earlier in the batch)
+
+class AnswerTypeFilter(NamedTuple):
+    is_valid: Optional[bool] = None
+    updated_from: Optional[datetime] = None  # update_date >= updated_from
+    updated_to: Optional[datetime] = None  # update_date < updated_to
+    title_prefix: Optional[str] = None
+    keyword: Optional[str] = None  # substring of title, description or keywords
+
+    def conditions(self) -> Tuple[List[str], list]:
+        """SQL conditions (on alias `at`) and their parameters"""
+        conditions = []
+        params = []
+        if self.is_valid is not None:
+            conditions.append("at.is_valid = %s")
+            params.append(self.is_valid)
+        if self.updated_from is not None:
+            conditions.append("at.update_date >= %s")
+            params.append(self.updated_from)
+        if self.updated_to is not None:
+            conditions.append("at.update_date < %s")
+            params.append(self.updated_to)
+        if self.title_prefix:
+            conditions.append("at.title LIKE %s")
+            params.append(escape_like(self.title_prefix) + "%")
+        if self.keyword:
+            conditions.append("(at.title LIKE %s OR at.description LIKE %s OR at.keywords LIKE %s)")
+            params.extend([f"%{escape_like(self.keyword)}%"] * 3)
+        return conditions, params
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _keyset_condition(page_cursor: str) -> Tuple[str, list]:
+    """Rows after the cursor in (sort, id) order"""
+    # MySQL sorts NULL first: after a NULL sort value come the remaining NULLs, then every non-NULL
+    last_sort, last_id = decode_cursor(page_cursor, 2)
+    if not _is_int(last_id) or not (last_sort is None or _is_int(last_sort)):
+        raise ValidationError("Invalid pagination cursor", details={"cursor": page_cursor})
+    if last_sort is None:
+        return "((at.sort IS NULL AND at.id > %s) OR at.sort IS NOT NULL)", [last_id]
+    return "(at.sort > %s OR (at.sort = %s AND at.id > %s))", [last_sort, last_sort, last_id]
+
+def _chunks(values: Sequence, size: int) -> Iterable[Sequence]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def _where(conditions: Sequence[str]) -> str:
+    return ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+def _user(user_id, firstname, lastname) -> Optional[UserShortRecord]:
+    if not user_id:
+        return None
+    return {"user_id": user_id, "firstname": firstname, "lastname": lastname}
+
+def _to_record(row, translations: Dict[str, TranslationMap], locale: str) -> AnswerTypeRecord:
+    key = str(row[0])
+    return {
+        "id": row[0],
+        "create_user": _user(row[1], row[2], row[3]),
+        "update_user": _user(row[4], row[5], row[6]),
+        "title": row[7],
+        "title_fr": translations["fr"].get(key, {}).get("title"),
+        "description": row[8],
+        "keywords": row[9],
+        "sort": row[10],
+        "revision": row[11],
+        "create_date": row[12],
+        "update_date": row[13],
+        "is_valid": bool(row[14]),
+        "conditional": row[15],
+        "translations": {locale: translations[locale].get(key, {})}
+    }
+
+def _export_record(row, title_fr: Optional[str]) -> dict:
+    return {
+        "id": row[0],
+        "title": row[1],
+        "title_fr": title_fr,
+        "description": row[2],
+        "keywords": row[3],
+        "sort": row[4],
+        "revision": row[5],
+        "create_date": row[6].isoformat() if row[6] else None,
+        "update_date": row[7].isoformat() if row[7] else None,
+        "is_valid": bool(row[8]),
+        "conditional": row[9],
+        "create_user_id": row[10],
+        "update_user_id": row[11]
+    }
+
+class AnswerTypeRepository:
+    """
+    Answer type reads shared by the REST endpoints and the MCP tools.
+
+    Every loader runs the same join and maps rows the same way, to plain
+    AnswerTypeRecord dicts (serialize them with app.core.serialization); French
+    titles (title_fr) and the requested locale are looked up for the loaded rows only.
+    """
+
+    translations = answer_type_translations
+
+    def __init__(self):
+        self._write_hooks: List[Callable[[Optional[int]], None]] = []
+
+    def on_write(self, hook: Callable[[Optional[int]], None]) -> None:
+        """Call hook(answer_type_id) after every write, with None when any row may have changed"""
+        self._write_hooks.append(hook)
+
+    async def _select(self, db, where: str = "", params: Sequence = (), suffix: str = "") -> list:
+        started = time.perf_counter()
+        async with db.cursor() as cursor:
+            await cursor.execute(f"{_SELECT} {where} {suffix}", params)
+            rows = await cursor.fetchall()
+        logger.debug("answer_type select: %d rows in %.1f ms", len(rows), (time.perf_counter() - started) * 1000)
+        return rows
+
+    async def _to_records(self, db, rows, locale: str) -> List[AnswerTypeRecord]:
+        if not rows:
+            return []
+        # Only the page's ids: cost and memory stay bounded by the page size
+        translations = await self.translations.fetch(db, ["fr", locale], foreign_keys=[row[0] for row in rows])
+        return [_to_record(row, translations, locale) for row in rows]
+
+    async def get(self, db, answer_type_id: int, locale: str = settings.TRANSLATION_DEFAULT_LOCALE) -> Optional[AnswerTypeRecord]:
+        """One answer type, or None"""
+        items = await self.get_many(db, [answer_type_id], locale)
+        return items[0] if items else None
+
+    async def get_many(
+        self, db, answer_type_ids: Iterable[int], locale: str = settings.TRANSLATION_DEFAULT_LOCALE
+    ) -> List[AnswerTypeRecord]:
+        """Answer types by id in one query, in the order of the ids (unknown ids are skipped)"""
+        answer_type_ids = list(dict.fromkeys(answer_type_ids))
+        if not answer_type_ids:
+            return []
+        placeholders = ','.join(['%s'] * len(answer_type_ids))
+        rows = await self._select(db, f"WHERE at.id IN ({placeholders})", answer_type_ids)
+        items = {item["id"]: item for item in await self._to_records(db, rows, locale)}
+        return [items[answer_type_id] for answer_type_id in answer_type_ids if answer_type_id in items]
+
+    async def list(
+        self,
+        db,
+        filters: AnswerTypeFilter = AnswerTypeFilter(),
+        page_cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        locale: str = settings.TRANSLATION_DEFAULT_LOCALE
+    ) -> Tuple[List[AnswerTypeRecord], Optional[str]]:
+        """
+        Answer types ordered by (sort, id), with keyset pagination.
+
+        Args:
+            filters: Conditions on the answer types
+            page_cursor: next_cursor of the previous page (ValidationError if tampered)
+            limit: Page size, None for every matching row
+            locale: Translation locale, in addition to French
+
+        Returns:
+            The items and the cursor of the next page (None on the last page)
+        """
+        conditions, params = [], []
+        if page_cursor is not None:
+            condition, cursor_params = _keyset_condition(page_cursor)
+            conditions.append(condition)
+            params.extend(cursor_params)
+        filter_conditions, filter_params = filters.conditions()
+        conditions.extend(filter_conditions)
+        params.extend(filter_params)
+
+        suffix = "ORDER BY at.sort, at.id"
+        if limit is not None:
+            # One extra row tells whether there is a next page
+            suffix += " LIMIT %s"
+            params.append(limit + 1)
+        rows = await self._select(db, _where(conditions), tuple(params), suffix)
+        has_next = limit is not None and len(rows) > limit
+        items = await self._to_records(db, rows[:limit], locale)
+        return items, self.cursor_after(items[-1]) if has_next else None
+
+    @staticmethod
+    def cursor_after(record: AnswerTypeRecord) -> str:
+        """list() cursor of the page that starts after this record"""
+        return encode_cursor([record["sort"], record["id"]])
+
+    async def stream(
+        self, db, lookup_db, filters: AnswerTypeFilter = AnswerTypeFilter(), chunk_size: int = settings.EXPORT_CHUNK_SIZE
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Flat export records (EXPORT_COLUMNS) in chunks, read through a server-side cursor.
+
+        The unbuffered result set keeps `db` busy until it is fully read, so the
+        French titles of each chunk are looked up on `lookup_db`; memory stays
+        bounded by the chunk size. The generator closes `db` if it is abandoned
+        early: wrap it in contextlib.aclosing() inside the block that owns the
+        connections.
+        """
+        conditions, params = filters.conditions()
+        cursor = db.cursor(InstrumentedSSCursor)
+        try:
+            # ORDER BY the primary key streams straight from the index, with no
+            # filesort holding back the first row
+            await cursor.execute(f"{_EXPORT_SELECT} {_where(conditions)} ORDER BY at.id", params)
+            while True:
+                rows = await cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                translations = (await self.translations.fetch(lookup_db, ["fr"], foreign_keys=[row[0] for row in rows]))["fr"]
+                yield [_export_record(row, translations.get(str(row[0]), {}).get("title")) for row in rows]
+            await cursor.close()
+        except BaseException:
+            # Closing the cursor would read the rest of the result set: drop the
+            # connection instead (the pool does not reuse closed connections)
+            db.close()
+            raise
+
+    async def _ids_by(self, cursor, column: str, values: Sequence, batch_size: int) -> Dict:
+        """column value -> id of the answer types having it (lowest id first wins), IN lists of batch_size"""
+        ids: Dict = {}
+        for chunk in _chunks(list(dict.fromkeys(values)), batch_size):
+            await cursor.execute(
+                f"SELECT id, {column} FROM answer_type WHERE {column} IN ({','.join(['%s'] * len(chunk))}) ORDER BY id",
+                chunk
+            )
+            for answer_type_id, value in await cursor.fetchall():
+                ids.setdefault(value, answer_type_id)
+        return ids
+
+    async def upsert_many(
+        self, db, rows: Sequence[AnswerTypeCreate], user_id: int, batch_size: int = settings.IMPORT_BATCH_SIZE
+    ) -> List[UpsertResult]:
+        """
+        Create or update answer types in a single transaction, one result per row.
+
+        Rows with an `id` attribute update that answer type (not_found if it does not
+        exist); the others update the answer type whose slug (conditional) is the slug
+        of their title, or create one. French titles (title_fr) are upserted as well.
+        Writes are batched with executemany: a handful of statements whatever the
+        number of rows. Call invalidate() afterwards.
+
+        Raises:
+            aiomysql.Error: The transaction is rolled back
+        """
+        now = datetime.utcnow()
+        slugs = [slugify(row.title) for row in rows]
+        results: List[Optional[UpsertResult]] = [None] * len(rows)
+        seen = set()
+        for position, row in enumerate(rows):
+            key = ("id", row.id) if getattr(row, "id", None) is not None else ("slug", slugs[position])
+            if key in seen:
+                results[position] = UpsertResult(None, "duplicate")
+            seen.add(key)
+
+        started = time.perf_counter()
+        await db.begin()
+        try:
+            async with db.cursor() as cursor:
+                pending = [position for position, result in enumerate(results) if result is None]
+                by_id = [position for position in pending if getattr(rows[position], "id", None) is not None]
+                by_slug = [position for position in pending if getattr(rows[position], "id", None) is None]
+                existing_ids = await self._ids_by(cursor, "id", [rows[position].id for position in by_id], batch_size)
+                slug_ids = await self._ids_by(cursor, "conditional", [slugs[position] for position in by_slug], batch_size)
+
+                targets: Dict[int, int] = {}  # position -> id of the answer type it updates
+                inserts = []
+                claimed = set()  # answer types already updated by an earlier row
+                for position in pending:
+                    answer_type_id = getattr(rows[position], "id", None)
+                    if answer_type_id is not None:
+                        if answer_type_id not in existing_ids:
+                            results[position] = UpsertResult(answer_type_id, "not_found")
+                            continue
+                    elif slugs[position] in slug_ids:
+                        answer_type_id = slug_ids[slugs[position]]
+                    else:
+                        inserts.append(position)
+                        continue
+                    # An id row and a slug row may resolve to the same answer type
+                    if answer_type_id in claimed:
+                        results[position] = UpsertResult(None, "duplicate")
+                    else:
+                        claimed.add(answer_type_id)
+                        targets[position] = answer_type_id
+
+                if targets:
+                    await cursor.executemany(_UPSERT, [
+                        (
+                            answer_type_id, user_id, user_id, rows[position].title, rows[position].description,
+                            rows[position].keywords, rows[position].sort, 0, now, now, True, slugs[position]
+                        )
+                        for position, answer_type_id in targets.items()
+                    ])
+                    for position, answer_type_id in targets.items():
+                        results[position] = UpsertResult(answer_type_id, "updated")
+                if inserts:
+                    await cursor.executemany(_INSERT, [
+                        (
+                            user_id, user_id, rows[position].title, rows[position].description,
+                            rows[position].keywords, rows[position].sort, 0, now, now, True, slugs[position]
+                        )
+                        for position in inserts
+                    ])
+                    # Auto-increment ids of a multi-row insert are not guaranteed to be
+                    # consecutive: read them back through the slugs, unique among these rows
+                    inserted_ids = await self._ids_by(cursor, "conditional", [slugs[position] for position in inserts], batch_size)
+                    for position in inserts:
+                        results[position] = UpsertResult(inserted_ids[slugs[position]], "created")
+
+                await self.translations.save_many(cursor, "fr", [
+                    (result.id, {"title": rows[position].title_fr})
+                    for position, result in enumerate(results) if result.status in ("created", "updated")
+                ])
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+        logger.debug(
+            "answer_type upsert: %d updated, %d created in %.1f ms", len(targets), len(inserts), (time.perf_counter() - started) * 1000
+        )
+        return results
+
+    async def invalidate(self, answer_type_id: Optional[int] = None, translations: bool = False) -> None:
+        """
+        Drop cached list responses and, if given, the cached detail of one answer type,
+        then run the write hooks. Pass translations=True when ext_translations rows
+        were written. Never raises.
+        """
+        tags = [ANSWER_TYPE_LIST_TAG]
+        if answer_type_id is not None:
+            tags.append(ANSWER_TYPE_ITEM_TAG.format(answer_type_id=answer_type_id))
+        if translations:
+            tags.append(self.translations.tag)
+        try:
+            await invalidate_tags(*tags)
+        except Exception as e:
+            logger.error("Cache invalidation failed for %s: %s", tags, e)
+        for hook in self._write_hooks:
+            try:
+                hook(answer_type_id)
+            except Exception as e:
+                logger.error("Answer type write hook %r failed: %s", hook, e)
+
+answer_types = AnswerTypeRepository()
@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional, Tuple
+from app.core.config import settings
+from app.core.search import InvertedIndex, SearchHit, decode_hit_cursor, paginate_hits, query_terms
+from app.db.repositories.lov.answer_type import answer_types
+from app.models.lov.answer_type import AnswerTypeRecord
+
+logger = logging.getLogger(__name__)
+
+# Relevance weight of each indexed field; translated titles are indexed as title_<locale>
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    **{f"title_{locale}": 3.0 for locale in settings.TRANSLATION_LOCALES},
+    "keywords": 2.0,
+    "description": 1.0
+}
+
+class AnswerTypeSearch:
+    """
+    Ranked answer type search shared by the REST endpoint and the MCP tool.
+    Backends return (id, score) hits; records are then loaded with answer_types.get_many.
+    """
+
+    name = ""
+
+    def mark_stale(self, answer_type_id: Optional[int] = None) -> None:
+        """Write hook (see AnswerTypeRepository.on_write)"""
+
+    async def hits(
+        self, db, query: str, is_valid: Optional[bool], page_cursor: Optional[str], limit: int
+    ) -> Tuple[List[SearchHit], Optional[str]]:
+        raise NotImplementedError
+
+    async def search(
+        self,
+        db,
+        query: str,
+        is_valid: Optional[bool] = None,
+        page_cursor: Optional[str] = None,
+        limit: int = settings.PAGE_SIZE_DEFAULT,
+        locale: str = settings.TRANSLATION_DEFAULT_LOCALE
+    ) -> Tuple[List[AnswerTypeRecord], Optional[str]]:
+        """
+        Answer types matching every term of `query` (accents and case ignored,
+        terms also match as word prefixes), most relevant first.
+
+        Args:
+            query: Free text, e.g. "choix mult"
+            is_valid: Only valid (True) or disabled (False) answer types
+            page_cursor: next_cursor of the previous page (ValidationError if tampered)
+            limit: Page size
+            locale: Translation locale of the records, in addition to French
+
+        Returns:
+            The items and the cursor of the next page (None on the last page)
+        """
+        ranked, next_cursor = await self.ranked(db, query, is_valid, page_cursor, limit, locale)
+        return [item for item, _ in ranked], next_cursor
+
+    async def ranked(
+        self,
+        db,
+        query: str,
+        is_valid: Optional[bool] = None,
+        page_cursor: Optional[str] = None,
+        limit: int = settings.PAGE_SIZE_DEFAULT,
+        locale: str = settings.TRANSLATION_DEFAULT_LOCALE
+    ) -> Tuple[List[Tuple[AnswerTypeRecord, SearchHit]], Optional[str]]:
+        """Like search(), with the hit of every item (hit_cursor(hit) resumes after it)"""
+        started = time.perf_counter()
+        hits, next_cursor = await self.hits(db, query, is_valid, page_cursor, limit)
+        items = {
+            item["id"]: item
+            for item in await answer_types.get_many(db, [answer_type_id for answer_type_id, _ in hits], locale)
+        }
+        # Answer types deleted since the index was built are skipped
+        ranked = [(items[hit[0]], hit) for hit in hits if hit[0] in items]
+        logger.debug(
+            "answer_type search (%s): %d hits in %.1f ms", self.name, len(ranked), (time.perf_counter() - started) * 1000
+        )
+        return ranked, next_cursor
+
+class MemoryAnswerTypeSearch(AnswerTypeSearch):
+    """
+    In-process inverted index over titles (with their translations), keywords and descriptions.
+
+    Built on the first search from one scan of answer_type plus the cached
+    translation maps. Writes made through this worker mark it stale (write hook);
+    writes made by other workers are noticed through a table fingerprint
+    (MAX(update_date), COUNT(*)) checked at most every SEARCH_INDEX_CHECK_INTERVAL
+    seconds. A stale index is rebuilt in full, which is cheap for a reference table.
+    """
+
+    name = "memory"
+
+    def __init__(self, check_interval: float = settings.SEARCH_INDEX_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self.index = InvertedIndex(FIELD_WEIGHTS)
+        self._lock = asyncio.Lock()
+        self._generation = 0  # bumped by every write hook
+        self._built_generation: Optional[int] = None
+        self._fingerprint: Optional[tuple] = None
+        self._checked_at = float("-inf")
+
+    def mark_stale(self, answer_type_id: Optional[int] = None) -> None:
+        self._generation += 1
+
+    async def _fetch_fingerprint(self, db) -> tuple:
+        async with db.cursor() as cursor:
+            await cursor.execute("SELECT MAX(update_date), COUNT(*) FROM answer_type")
+            return tuple(await cursor.fetchone())
+
+    async def _build(self, db) -> InvertedIndex:
+        started = time.perf_counter()
+        async with db.cursor() as cursor:
+            await cursor.execute("SELECT id, title, description, keywords, is_valid FROM answer_type")
+            rows = await cursor.fetchall()
+        translations = await answer_types.translations.get_maps(db, settings.TRANSLATION_LOCALES)
+        index = InvertedIndex(FIELD_WEIGHTS)
+        for answer_type_id, title, description, keywords, is_valid in rows:
+            key = str(answer_type_id)
+            document = {"title": title, "description": description, "keywords": keywords}
+            for locale, translation_map in translations.items():
+                document[f"title_{locale}"] = translation_map.get(key, {}).get("title")
+            index.add(answer_type_id, document, is_valid=bool(is_valid))
+        logger.info("answer_type search index built: %d documents in %.1f ms", len(index), (time.perf_counter() - started) * 1000)
+        return index
+
+    async def refresh(self, db) -> None:
+        """Rebuild the index if a write happened since it was built"""
+        if self._built_generation == self._generation and time.monotonic() - self._checked_at < self.check_interval:
+            return
+        async with self._lock:
+            # Another search may have refreshed it while this one waited
+            if self._built_generation == self._generation and time.monotonic() - self._checked_at < self.check_interval:
+                return
+            generation = self._generation
+            fingerprint = await self._fetch_fingerprint(db)
+            if generation != self._built_generation or fingerprint != self._fingerprint:
+                self.index = await self._build(db)
+                self._fingerprint = fingerprint
+            self._built_generation = generation
+            self._checked_at = time.monotonic()
+
+    async def hits(self, db, query, is_valid, page_cursor, limit):
+        await self.refresh(db)
+        where = None if is_valid is None else (lambda attributes: attributes["is_valid"] == is_valid)
+        return paginate_hits(self.index.search(query, where), page_cursor, limit)
+
+class FulltextAnswerTypeSearch(AnswerTypeSearch):
+    """
+    MySQL FULLTEXT search (boolean mode, every term required, as a prefix), for
+    catalogs too large to index in memory. Needs:
+
+        ALTER TABLE answer_type ADD FULLTEXT INDEX ft_answer_type_search (title, description, keywords);
+
+    Accent folding comes from the columns' collation (utf8mb4_unicode_ci ignores
+    accents). Translated titles live in ext_translations and are not searched;
+    terms shorter than innodb_ft_min_token_size or in the stopword list are ignored by MySQL.
+    """
+
+    name = "fulltext"
+
+    async def hits(self, db, query, is_valid, page_cursor, limit):
+        terms = query_terms(query)
+        if not terms:
+            return [], None
+        # Tokens are \w+ runs, so they never carry boolean operators of their own
+        against = " ".join(f"+{term}*" for term in terms)
+        inner_conditions = ["MATCH(at.title, at.description, at.keywords) AGAINST (%s IN BOOLEAN MODE)"]
+        params: list = [against, against]
+        if is_valid is not None:
+            inner_conditions.append("at.is_valid = %s")
+            params.append(is_valid)
+        outer = ""
+        if page_cursor is not None:
+            # Same keyset as paginate_hits: (score desc, id)
+            last_score, last_id = decode_hit_cursor(page_cursor)
+            outer = "WHERE ranked.score < %s OR (ranked.score = %s AND ranked.id > %s)"
+            params.extend([last_score, last_score, last_id])
+        params.append(limit + 1)
+        async with db.cursor() as cursor:
+            await cursor.execute(
+                f"""
+                SELECT ranked.id, ranked.score FROM (
+                    SELECT at.id, ROUND(MATCH(at.title, at.description, at.keywords) AGAINST (%s IN BOOLEAN MODE), 6) AS score
+                    FROM answer_type at
+                    WHERE {' AND '.join(inner_conditions)}
+                ) ranked
+                {outer}
+                ORDER BY ranked.score DESC, ranked.id
+                LIMIT %s
+                """,
+                params
+            )
+            rows = await cursor.fetchall()
+        # limit + 1 rows: paginate_hits trims the extra one and builds the cursor
+        return paginate_hits([(answer_type_id, float(score)) for answer_type_id, score in rows], None, limit)
+
+_BACKENDS = {backend.name: backend for backend in (MemoryAnswerTypeSearch, FulltextAnswerTypeSearch)}
+if settings.SEARCH_BACKEND not in _BACKENDS:
+    raise ValueError(f"Unknown SEARCH_BACKEND {settings.SEARCH_BACKEND!r}, expected one of {sorted(_BACKENDS)}")
+
+answer_type_search: AnswerTypeSearch = _BACKENDS[settings.SEARCH_BACKEND]()
+answer_types.on_write(answer_type_search.mark_stale)
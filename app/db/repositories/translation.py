@@ -0,0 +1,149 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from app.core.cache import build_cache_key, get_cached_data, set_cached_data, invalidate_tags
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# foreign_key -> field -> content, for one locale
+TranslationMap = Dict[str, Dict[str, str]]
+
+def parse_accept_language(header: Optional[str]) -> List[str]:
+    """Primary language subtags of an Accept-Language header, by decreasing quality"""
+    languages = []
+    for position, entry in enumerate((header or "").split(",")):
+        language, _, params = entry.strip().partition(";")
+        language = language.strip().split("-", 1)[0].lower()[:8]
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if language and language != "*" and quality > 0:
+            languages.append((-quality, position, language))
+    return [language for _, _, language in sorted(languages)]
+
+def negotiate_locale(
+    header: Optional[str],
+    supported: Sequence[str] = settings.TRANSLATION_LOCALES,
+    default: str = settings.TRANSLATION_DEFAULT_LOCALE
+) -> str:
+    """Best supported translation locale for an Accept-Language header"""
+    for language in parse_accept_language(header):
+        if language in supported:
+            return language
+    return default
+
+class TranslationRepository:
+    """
+    Gedmo (ext_translations) translations of one entity class.
+
+    Queries always filter on locale, the exact object_class and field, which is
+    the prefix of Gedmo's lookup index, so they never scan the table. Per-request
+    lookups use fetch() with the foreign keys of the rows being returned, so their
+    cost does not grow with the catalog. Whole-class maps (get_maps) are cached per
+    locale and registered under `tag`, for jobs that need every row such as
+    building a search index; call invalidate() after writing translations.
+
+    Example:
+        answer_type_translations = TranslationRepository("App\\\\Entity\\\\LovManagement\\\\AnswerType", fields=("title",))
+        maps = await answer_type_translations.fetch(db, ["fr", "en"], foreign_keys=[12])
+        title_fr = maps["fr"].get("12", {}).get("title")
+    """
+
+    def __init__(self, object_class: str, fields: Sequence[str]):
+        self.object_class = object_class
+        self.fields = tuple(fields)
+        self.tag = f"translation:{object_class}"
+
+    def _cache_key(self, locale: str) -> str:
+        return build_cache_key("translation", self.object_class, locale)
+
+    async def fetch(
+        self,
+        db,
+        locales: Iterable[str],
+        foreign_keys: Optional[Iterable] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Dict[str, TranslationMap]:
+        """Load the translations of every requested locale and field in one query"""
+        locales = list(dict.fromkeys(locales))
+        fields = list(fields or self.fields)
+        maps: Dict[str, TranslationMap] = {locale: {} for locale in locales}
+        if not locales or not fields:
+            return maps
+        conditions = [
+            f"locale IN ({','.join(['%s'] * len(locales))})",
+            "object_class = %s",
+            f"field IN ({','.join(['%s'] * len(fields))})"
+        ]
+        params = [*locales, self.object_class, *fields]
+        if foreign_keys is not None:
+            foreign_keys = [str(foreign_key) for foreign_key in foreign_keys]
+            if not foreign_keys:
+                return maps
+            conditions.append(f"foreign_key IN ({','.join(['%s'] * len(foreign_keys))})")
+            params.extend(foreign_keys)
+        async with db.cursor() as cursor:
+            await cursor.execute(
+                f"SELECT locale, foreign_key, field, content FROM ext_translations WHERE {' AND '.join(conditions)}",
+                params
+            )
+            for locale, foreign_key, field, content in await cursor.fetchall():
+                maps[locale].setdefault(str(foreign_key), {})[field] = content
+        return maps
+
+    async def get_maps(self, db, locales: Iterable[str]) -> Dict[str, TranslationMap]:
+        """Whole-class translation maps by locale, from cache; missing locales are loaded in one query"""
+        maps: Dict[str, TranslationMap] = {}
+        for locale in dict.fromkeys(locales):
+            try:
+                cached = await get_cached_data(self._cache_key(locale))
+            except Exception as e:
+                logger.warning("Translation cache read failed for %s: %s", self.object_class, e)
+                cached = None
+            if cached is not None:
+                maps[locale] = cached
+        missing = [locale for locale in dict.fromkeys(locales) if locale not in maps]
+        if missing:
+            loaded = await self.fetch(db, missing)
+            for locale, translations in loaded.items():
+                try:
+                    await set_cached_data(
+                        self._cache_key(locale), translations,
+                        expire=settings.TRANSLATION_CACHE_TTL, tags=[self.tag]
+                    )
+                except Exception as e:
+                    logger.warning("Translation cache write failed for %s: %s", self.object_class, e)
+            maps.update(loaded)
+        return maps
+
+    async def save(self, cursor, foreign_key, locale: str, values: Dict[str, Optional[str]]) -> None:
+        """Insert or update translations of one entity (None values are skipped)"""
+        await self.save_many(cursor, locale, [(foreign_key, values)])
+
+    async def save_many(
+        self, cursor, locale: str, entities: Iterable[Tuple[Any, Dict[str, Optional[str]]]]
+    ) -> None:
+        """Insert or update translations of many entities, as (foreign_key, values) pairs, in one statement"""
+        rows = [
+            (locale, self.object_class, field, str(foreign_key), content)
+            for foreign_key, values in entities
+            for field, content in values.items() if content is not None
+        ]
+        if rows:
+            await cursor.executemany(
+                """
+                INSERT INTO ext_translations (locale, object_class, field, foreign_key, content)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE content = VALUES(content)
+                """,
+                rows
+            )
+
+    async def invalidate(self) -> None:
+        """Drop the cached maps of this class on every worker"""
+        await invalidate_tags(self.tag)
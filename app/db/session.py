@@ -1,24 +1,105 @@
-from aiomysql import create_pool
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from aiomysql import Connection, Pool, create_pool
 from app.core.config import settings
+from app.core.errors import DatabaseError
+from app.db.instrumentation import InstrumentedCursor
 
-async def get_db_pool():
-    # Debug print
-    print("Database Settings:")
-    print(f"MYSQL_HOST: {settings.MYSQL_HOST}")
-    print(f"MYSQL_USER: {settings.MYSQL_USER}")
-    print(f"MYSQL_PASSWORD: {settings.MYSQL_PASSWORD}")
-    print(f"MYSQL_DATABASE: {settings.MYSQL_DATABASE}")
-    
-    return await create_pool(
-        host=settings.MYSQL_HOST,
-        user=settings.MYSQL_USER,
-        password=settings.MYSQL_PASSWORD,
-        db=settings.MYSQL_DATABASE,
-        minsize=1,
-        maxsize=10,
-        autocommit=True
-    )
-
-async def get_db_connection():
-    pool = await get_db_pool()
-    return await pool.acquire() 
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+# One pool per worker process, created lazily on first use or by the lifespan
+_pool: Optional[Pool] = None
+_pool_lock = asyncio.Lock()
+_waiters = 0
+_acquire_timeouts = 0
+
+async def init_db_pool() -> Pool:
+    """Create the process-wide connection pool (idempotent)."""
+    global _pool
+    async with _pool_lock:
+        if _pool is None or _pool.closed:
+            logger.info(
+                "Creating MySQL pool for %s@%s/%s (min=%d, max=%d)", settings.MYSQL_USER, settings.MYSQL_HOST,
+                settings.MYSQL_DATABASE, settings.MYSQL_POOL_MIN_SIZE, settings.MYSQL_POOL_MAX_SIZE
+            )
+            _pool = await create_pool(
+                host=settings.MYSQL_HOST,
+                user=settings.MYSQL_USER,
+                password=settings.MYSQL_PASSWORD,
+                db=settings.MYSQL_DATABASE,
+                minsize=settings.MYSQL_POOL_MIN_SIZE,
+                maxsize=settings.MYSQL_POOL_MAX_SIZE,
+                pool_recycle=settings.MYSQL_POOL_RECYCLE,
+                autocommit=True,
+                cursorclass=InstrumentedCursor  # times every statement, see app.db.instrumentation
+            )
+    return _pool
+
+async def close_db_pool() -> None:
+    """Close the process-wide pool and wait for borrowed connections to come back."""
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            await _pool.wait_closed()
+            _pool = None
+
+async def get_db_pool() -> Pool:
+    """Return the shared pool, creating it if the lifespan has not done so yet."""
+    if _pool is not None and not _pool.closed:
+        return _pool
+    return await init_db_pool()
+
+@asynccontextmanager
+async def acquire_connection(pool: Optional[Pool] = None) -> AsyncIterator[Connection]:
+    """
+    Borrow a connection from `pool` (default: the shared pool) and always return it.
+
+    Raises:
+        DatabaseError: If no connection becomes free within MYSQL_POOL_ACQUIRE_TIMEOUT
+    """
+    global _waiters, _acquire_timeouts
+    if pool is None:
+        pool = await get_db_pool()
+    _waiters += 1
+    try:
+        conn = await asyncio.wait_for(pool.acquire(), timeout=settings.MYSQL_POOL_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        _acquire_timeouts += 1
+        raise DatabaseError(
+            "Database connection pool exhausted",
+            details={"acquire_timeout": settings.MYSQL_POOL_ACQUIRE_TIMEOUT}
+        )
+    finally:
+        _waiters -= 1
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+async def get_db_connection() -> AsyncIterator[Connection]:
+    """
+    Database connection dependency.
+    Yields a pooled connection and returns it to the pool after the request.
+    """
+    async with acquire_connection() as conn:
+        yield conn
+
+def get_pool_stats() -> Dict[str, int | float | bool]:
+    """Live statistics of the shared pool for health checks and metrics."""
+    if _pool is None:
+        return {"initialized": False, "waiters": _waiters, "acquire_timeouts": _acquire_timeouts}
+    return {
+        "initialized": True,
+        "minsize": _pool.minsize,
+        "maxsize": _pool.maxsize,
+        "size": _pool.size,
+        "freesize": _pool.freesize,
+        "used": _pool.size - _pool.freesize,
+        "waiters": _waiters,
+        "acquire_timeouts": _acquire_timeouts,
+        "acquire_timeout": settings.MYSQL_POOL_ACQUIRE_TIMEOUT,
+        "recycle": settings.MYSQL_POOL_RECYCLE
+    }
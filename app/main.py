@@ -1,42 +1,54 @@
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 # from fastapi_mcp import FastApiMCP  # Install with: pip install fastapi-mcp
+import asyncio
 import time
 import logging
 from app.core.config import settings
 from app.api.v1.endpoints import auth
-from app.api.v1.endpoints.user import profile
+from app.api.v1.endpoints.user import principal, profile
 from app.api.v1.endpoints.lov import answer_type
-from app.db.session import get_db_pool
-from app.core.cache import redis
-from app.core.errors import error_handler
-from app.core.rate_limit import rate_limit_middleware
+from app.db.session import init_db_pool, close_db_pool, get_pool_stats
+from app.db.instrumentation import QueryStatsMiddleware
+from app.core.cache import redis, run_invalidation_listener, get_cache_stats
+from app.core.errors import AppError, error_handler
+from app.core.security import shutdown_password_executor, get_password_hash_stats, get_token_cache_stats
+from app.core.rate_limit import rate_limit_middleware, close_rate_limiters
+from app.core.metrics import CallbackMetric, MetricsMiddleware, registry as metrics_registry, stats_metric
+from app.core.logging import setup_logging, get_logging_stats, RequestIdMiddleware
 from fastapi_mcp import FastApiMCP
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (JSON lines written by a background thread, see app.core.logging)
+setup_logging()
 logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("app.access")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting up application...")
-    app.state.db_pool = await get_db_pool()
-    # Test Redis connection and clear cache
+    app.state.db_pool = await init_db_pool()
+    # Test Redis connection; cached responses are invalidated by tag on writes,
+    # so nothing is flushed here (that would also reset every worker's rate limits)
     try:
         await redis.ping()
-        await redis.flushall()  # Clear all cache on startup
-        logger.info("Redis connection successful and cache cleared")
+        logger.info("Redis connection successful")
     except Exception as e:
-        logger.error(f"Redis connection failed: {e}")
+        logger.error("Redis connection failed: %s", e)
+    # Keep this worker's in-process cache coherent with the others
+    cache_listener = asyncio.create_task(run_invalidation_listener())
     yield
     # Shutdown
     logger.info("Shutting down application...")
-    app.state.db_pool.close()
-    await app.state.db_pool.wait_closed()
+    cache_listener.cancel()
+    with suppress(asyncio.CancelledError):
+        await cache_listener  # closes its pub/sub connection before Redis is closed
+    await close_rate_limiters()
+    shutdown_password_executor()
+    await close_db_pool()
     await redis.close()
 
 app = FastAPI(
@@ -55,25 +67,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add rate limiting middleware (exclude MCP endpoints)
+# Add rate limiting middleware (exclude MCP endpoints and the metrics scrape); per-route policies live in app.core.rate_limit
 @app.middleware("http")
 async def conditional_rate_limit(request: Request, call_next):
-    if request.url.path.startswith("/mcp"):
+    if request.url.path.startswith("/mcp") or request.url.path == "/metrics":
         return await call_next(request)
     return await rate_limit_middleware(request, call_next)
 
-# Add error handler last
+# Add error handler last (AppError is registered explicitly so expected errors
+# are answered by the exception middleware instead of surfacing as server errors)
+app.add_exception_handler(AppError, error_handler)
 app.add_exception_handler(Exception, error_handler)
 
 # Add request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
+    start_time = time.perf_counter()
     response = await call_next(request)
-    process_time = time.time() - start_time
-    logger.info(f"{request.method} {request.url.path} completed in {process_time:.3f}s")
+    process_time = time.perf_counter() - start_time
+    access_logger.info(
+        "%s %s %d in %.3fs", request.method, request.url.path, response.status_code, process_time,
+        extra={"method": request.method, "path": request.url.path, "status": response.status_code, "duration_ms": round(process_time * 1000, 2)}
+    )
     return response
 
+# Count the SQL statements of each request (N+1 detection, X-DB-* debug headers)
+app.add_middleware(QueryStatsMiddleware)
+
+# Give each request a correlation id (X-Request-ID), stamped on its log records
+app.add_middleware(RequestIdMiddleware)
+
+# Record latency/status per route template; added last so it wraps every other layer
+app.add_middleware(MetricsMiddleware)
+
+# Scrape-time metrics, read from the stats the /health endpoints expose
+stats_metric("db_pool_size", "Open connections in this worker's MySQL pool", get_pool_stats, "size")
+stats_metric("db_pool_free", "Idle connections in this worker's MySQL pool", get_pool_stats, "freesize")
+stats_metric("db_pool_max_size", "Maximum size of this worker's MySQL pool", get_pool_stats, "maxsize")
+stats_metric("db_pool_waiters", "Requests waiting for a pooled connection", get_pool_stats, "waiters")
+stats_metric(
+    "db_pool_acquire_timeouts_total", "Connection requests that gave up waiting", get_pool_stats, "acquire_timeouts",
+    kind="counter"
+)
+
+def _cache_stat(field: str):
+    def read():
+        stats = get_cache_stats()
+        return {(tier,): stats[tier].get(field, 0) for tier in ("l1", "l2")}
+    return read
+
+metrics_registry.register(CallbackMetric("cache_hits_total", "Response cache hits", _cache_stat("hits"), "counter", ("tier",)))
+metrics_registry.register(CallbackMetric("cache_misses_total", "Response cache misses", _cache_stat("misses"), "counter", ("tier",)))
+metrics_registry.register(CallbackMetric("cache_hit_ratio", "Response cache hit ratio since start", _cache_stat("hit_ratio"), "gauge", ("tier",)))
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -85,9 +131,40 @@ async def get_favicon():
 async def root():
     return {"message": "Hello World"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this worker (text exposition format)."""
+    return Response(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/health/db-pool")
+async def db_pool_health():
+    """Live statistics of this worker's MySQL connection pool."""
+    return get_pool_stats()
+
+@app.get("/health/cache")
+async def cache_health():
+    """L1 (in-process) and L2 (Redis) cache hit/miss counters of this worker."""
+    return get_cache_stats()
+
+@app.get("/health/password-hashing")
+async def password_hashing_health():
+    """Queue depth and latency of the password hashing executor of this worker."""
+    return get_password_hash_stats()
+
+@app.get("/health/logging")
+async def logging_health():
+    """Records waiting in, and dropped from, the logging queue of this worker."""
+    return get_logging_stats()
+
+@app.get("/health/token-cache")
+async def token_cache_health():
+    """Hit rate of the verified-token cache of this worker."""
+    return get_token_cache_stats()
+
 # Include routers
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(profile.router, prefix=f"{settings.API_V1_STR}/profile", tags=["profile"])
+app.include_router(principal.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
 app.include_router(answer_type.router, prefix=f"{settings.API_V1_STR}/answer-type", tags=["answer-type"])
 
 # Setup MCP server after all endpoints are defined
@@ -11,91 +11,187 @@ Supports multiple transport options:
 
 import asyncio
 import json
+import logging
 import os
 import sys
-from typing import List, Dict, Any, Optional, Literal
-from fastmcp import FastMCP
+import weakref
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator, Awaitable, Callable, List, Dict, Any, NamedTuple, Optional, Literal
+from aiomysql import Connection, Pool
+from fastmcp import Context, FastMCP
+from pydantic import Field
+from pydantic_core import to_json
+from redis.asyncio import Redis
+from app.core.cache import redis
 from app.core.config import settings
-from app.db.session import get_db_connection
+from app.core.errors import NotFoundError, ServiceUnavailableError
+from app.core.lru import LRUCache
+from app.core.search import hit_cursor
+from app.db.repositories.lov.answer_type import AnswerTypeFilter, answer_types
+from app.db.repositories.lov.answer_type_search import answer_type_search
+from app.db.session import acquire_connection, close_db_pool, init_db_pool
 from app.models.lov.answer_type import AnswerType, AnswerTypeCreate
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+class MCPResources(NamedTuple):
+    """What the lifespan hands to every request (ctx.request_context.lifespan_context)"""
+    pool: Pool
+    redis: Redis
+    tool_slots: asyncio.Semaphore  # caps concurrent tool executions
+
+@asynccontextmanager
+async def mcp_lifespan(server: FastMCP) -> AsyncIterator[MCPResources]:
+    """Own the MySQL pool and the Redis client for as long as the server runs (STDIO or SSE)"""
+    pool = await init_db_pool()
+    try:
+        await redis.ping()
+    except Exception as e:
+        # Caches fail open: tools still work, only slower
+        logger.error("Redis connection failed: %s", e)
+    try:
+        yield MCPResources(pool, redis, asyncio.Semaphore(settings.MCP_MAX_CONCURRENT_TOOLS))
+    finally:
+        await close_db_pool()
+        await redis.close()
+
+@asynccontextmanager
+async def tool_connection(ctx: Context) -> AsyncIterator[Connection]:
+    """
+    Run a tool body in one of MCP_MAX_CONCURRENT_TOOLS slots, with a connection
+    borrowed from the lifespan pool and returned when the block exits.
+
+    Raises:
+        ServiceUnavailableError: If no slot frees up within MCP_TOOL_QUEUE_TIMEOUT
+    """
+    resources: MCPResources = ctx.request_context.lifespan_context
+    try:
+        await asyncio.wait_for(resources.tool_slots.acquire(), timeout=settings.MCP_TOOL_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise ServiceUnavailableError(
+            "Too many concurrent tool calls",
+            details={"max_concurrent_tools": settings.MCP_MAX_CONCURRENT_TOOLS}
+        )
+    try:
+        async with acquire_connection(resources.pool) as db:
+            yield db
+    finally:
+        resources.tool_slots.release()
+
 # Initialize MCP server
-mcp = FastMCP("LMS API Server 🎓")
+mcp = FastMCP("LMS API Server 🎓", lifespan=mcp_lifespan)
+
+# Tool results: pages bounded in rows (limit) and in bytes (MCP_RESPONSE_MAX_BYTES),
+# so a catalog never floods the model's context; identical calls within a
+# session are answered from a short-lived per-session cache.
+
+COMPACT_FIELDS = ("id", "title", "title_fr")
+_TRUNCATION_MARKER = "… [truncated]"
+_PAGE_OVERHEAD = 256  # bytes of the page envelope (next_cursor, truncation marker)
+
+PageLimit = Annotated[int, Field(ge=1, le=settings.PAGE_SIZE_MAX, description="Maximum number of items")]
+
+# Per-session result caches, dropped with their session
+_result_caches: "weakref.WeakKeyDictionary[Any, LRUCache]" = weakref.WeakKeyDictionary()
+
+def _clear_result_caches(answer_type_id: Optional[int] = None) -> None:
+    for cache in list(_result_caches.values()):
+        cache.clear()
+
+# Writes made by this process must not be hidden by cached results
+answer_types.on_write(_clear_result_caches)
+
+async def cached_tool_result(ctx: Context, tool: str, arguments: Dict[str, Any], load: Callable[[], Awaitable[Any]]) -> Any:
+    """Result of load(), reused for identical calls in the same session for MCP_RESULT_CACHE_TTL seconds"""
+    if settings.MCP_RESULT_CACHE_TTL <= 0:
+        return await load()
+    cache = _result_caches.get(ctx.session)
+    if cache is None:
+        cache = _result_caches[ctx.session] = LRUCache(
+            max_size=settings.MCP_RESULT_CACHE_SIZE, ttl=settings.MCP_RESULT_CACHE_TTL
+        )
+    key = (tool, json.dumps(arguments, sort_keys=True, default=str))
+    result = cache.get(key)
+    if result is None:
+        result = await load()
+        cache.set(key, result)
+    return result
+
+def _project(item: Dict[str, Any], compact: bool) -> Dict[str, Any]:
+    """Compact projection, or the full item with long text values cut at MCP_FIELD_MAX_CHARS"""
+    if compact:
+        return {field: item[field] for field in COMPACT_FIELDS}
+    max_chars = settings.MCP_FIELD_MAX_CHARS
+    return {
+        field: value[:max_chars] + _TRUNCATION_MARKER if isinstance(value, str) and len(value) > max_chars else value
+        for field, value in item.items()
+    }
+
+def bounded_page(
+    items: List[Dict[str, Any]],
+    resume_cursors: List[str],
+    next_cursor: Optional[str],
+    compact: bool = False,
+    max_bytes: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Page of (projected) items whose JSON fits in max_bytes (default: MCP_RESPONSE_MAX_BYTES).
+
+    Items that do not fit are left out: the page then carries a `truncated` marker
+    and a next_cursor resuming right after the last item kept (resume_cursors[i]
+    resumes after items[i]). The first item is always kept so paging progresses.
+    """
+    max_bytes = settings.MCP_RESPONSE_MAX_BYTES if max_bytes is None else max_bytes
+    page_items = []
+    size = _PAGE_OVERHEAD
+    for position, item in enumerate(items):
+        projected = _project(item, compact)
+        size += len(to_json(projected)) + 1
+        if size > max_bytes and page_items:
+            return {
+                "items": page_items,
+                "next_cursor": resume_cursors[position - 1],
+                "truncated": {
+                    "omitted_items": len(items) - position,
+                    "reason": f"response limited to {max_bytes} bytes: call again with next_cursor, or use compact=true"
+                }
+            }
+        page_items.append(projected)
+    return {"items": page_items, "next_cursor": next_cursor}
 
 @mcp.tool()
-async def list_answer_types() -> List[Dict[str, Any]]:
+async def list_answer_types(
+    ctx: Context,
+    limit: PageLimit = settings.MCP_PAGE_SIZE_DEFAULT,
+    cursor: Optional[str] = None,
+    compact: bool = False
+) -> Dict[str, Any]:
     """
-    List all answer types available in the LMS system.
+    List the answer types available in the LMS system, a page at a time.
     
+    Args:
+        limit: Maximum number of answer types to return
+        cursor: next_cursor of the previous page
+        compact: Only return id, title and title_fr
+        
     Returns:
-        List of answer types with their details including translations.
+        {"items": [...], "next_cursor": ...}; next_cursor is null on the last page.
+        Pages too large for the response size budget also carry a "truncated" marker.
     """
+    async def load():
+        async with tool_connection(ctx) as db:
+            items, next_cursor = await answer_types.list(db, page_cursor=cursor, limit=limit)
+        return bounded_page(items, [answer_types.cursor_after(item) for item in items], next_cursor, compact)
+
     try:
-        db = await get_db_connection()
-        async with db.cursor() as cursor:
-            # Get all answer types
-            await cursor.execute("""
-                SELECT
-                    at.id,
-                    cu.id as create_user_id, cu.firstname as create_user_firstname, cu.lastname as create_user_lastname,
-                    uu.id as update_user_id, uu.firstname as update_user_firstname, uu.lastname as update_user_lastname,
-                    at.title, at.description, at.keywords, at.sort, at.revision, at.create_date, at.update_date, at.is_valid, at.conditional
-                FROM answer_type at
-                LEFT JOIN fos_user cu ON at.create_user_id = cu.id
-                LEFT JOIN fos_user uu ON at.update_user_id = uu.id
-            """)
-            rows = await cursor.fetchall()
-            
-            # Get French translations separately
-            if rows:
-                answer_type_ids = [str(row[0]) for row in rows]
-                placeholders = ','.join(['%s'] * len(answer_type_ids))
-                await cursor.execute(f"""
-                    SELECT foreign_key, content 
-                    FROM ext_translations 
-                    WHERE object_class LIKE %s
-                    AND field = %s
-                    AND locale = %s
-                    AND foreign_key IN ({placeholders})
-                """, ('%AnswerType%', 'title', 'fr', *answer_type_ids))
-                translations = {str(row[0]): row[1] for row in await cursor.fetchall()}
-            else:
-                translations = {}
-        
-        result = []
-        for row in rows:
-            result.append({
-                "id": row[0],
-                "create_user": {
-                    "user_id": row[1],
-                    "firstname": row[2],
-                    "lastname": row[3]
-                } if row[1] else None,
-                "update_user": {
-                    "user_id": row[4],
-                    "firstname": row[5],
-                    "lastname": row[6]
-                } if row[4] else None,
-                "title": row[7],
-                "title_fr": translations.get(str(row[0])),
-                "description": row[8],
-                "keywords": row[9],
-                "sort": row[10],
-                "revision": row[11],
-                "create_date": row[12].isoformat() if row[12] else None,
-                "update_date": row[13].isoformat() if row[13] else None,
-                "is_valid": bool(row[14]),
-                "conditional": row[15]
-            })
-        
-        return result
+        return await cached_tool_result(ctx, "list_answer_types", {"limit": limit, "cursor": cursor, "compact": compact}, load)
         
     except Exception as e:
-        return [{"error": f"Failed to retrieve answer types: {str(e)}"}]
+        return {"error": f"Failed to retrieve answer types: {str(e)}"}
 
 @mcp.tool()
-async def get_answer_type(answer_type_id: int) -> Dict[str, Any]:
+async def get_answer_type(answer_type_id: int, ctx: Context) -> Dict[str, Any]:
     """
     Get a specific answer type by ID.
     
@@ -105,159 +201,63 @@ async def get_answer_type(answer_type_id: int) -> Dict[str, Any]:
     Returns:
         Dictionary containing the answer type details.
     """
+    async def load():
+        async with tool_connection(ctx) as db:
+            answer_type = await answer_types.get(db, answer_type_id)
+        if answer_type is None:
+            raise NotFoundError("Answer type not found")
+        return answer_type
+
     try:
-        db = await get_db_connection()
-        async with db.cursor() as cursor:
-            # Get the answer type
-            await cursor.execute("""
-                SELECT
-                    at.id,
-                    cu.id as create_user_id, cu.firstname as create_user_firstname, cu.lastname as create_user_lastname,
-                    uu.id as update_user_id, uu.firstname as update_user_firstname, uu.lastname as update_user_lastname,
-                    at.title, at.description, at.keywords, at.sort, at.revision, at.create_date, at.update_date, at.is_valid, at.conditional
-                FROM answer_type at
-                LEFT JOIN fos_user cu ON at.create_user_id = cu.id
-                LEFT JOIN fos_user uu ON at.update_user_id = uu.id
-                WHERE at.id = %s
-            """, (answer_type_id,))
-            row = await cursor.fetchone()
-            
-            if not row:
-                return {"error": "Answer type not found"}
-            
-            # Get French translation separately
-            await cursor.execute("""
-                SELECT content 
-                FROM ext_translations 
-                WHERE object_class LIKE %s
-                AND field = %s
-                AND locale = %s
-                AND foreign_key = %s
-            """, ('%AnswerType%', 'title', 'fr', str(answer_type_id)))
-            translation_row = await cursor.fetchone()
-            title_fr = translation_row[0] if translation_row else None
-            
-        return {
-            "id": row[0],
-            "create_user": {
-                "user_id": row[1],
-                "firstname": row[2],
-                "lastname": row[3]
-            } if row[1] else None,
-            "update_user": {
-                "user_id": row[4],
-                "firstname": row[5],
-                "lastname": row[6]
-            } if row[4] else None,
-            "title": row[7],
-            "title_fr": title_fr,
-            "description": row[8],
-            "keywords": row[9],
-            "sort": row[10],
-            "revision": row[11],
-            "create_date": row[12].isoformat() if row[12] else None,
-            "update_date": row[13].isoformat() if row[13] else None,
-            "is_valid": bool(row[14]),
-            "conditional": row[15]
-        }
+        return await cached_tool_result(ctx, "get_answer_type", {"answer_type_id": answer_type_id}, load)
         
+    except NotFoundError as e:
+        return {"error": e.message}
     except Exception as e:
         return {"error": f"Failed to retrieve answer type: {str(e)}"}
 
 @mcp.tool()
-async def search_answer_types(keyword: Optional[str] = None, is_valid: Optional[bool] = None) -> List[Dict[str, Any]]:
+async def search_answer_types(
+    ctx: Context,
+    keyword: Optional[str] = None,
+    is_valid: Optional[bool] = None,
+    limit: PageLimit = settings.MCP_PAGE_SIZE_DEFAULT,
+    cursor: Optional[str] = None,
+    compact: bool = False
+) -> Dict[str, Any]:
     """
     Search answer types based on criteria.
     
     Args:
-        keyword: Optional keyword to search in title, description, or keywords
+        keyword: Optional words to search in title (and its translations), keywords or description;
+            accents are ignored and words match as prefixes
         is_valid: Optional filter for valid/invalid answer types
+        limit: Maximum number of answer types to return
+        cursor: next_cursor of the previous page (with the same keyword and is_valid)
+        compact: Only return id, title and title_fr
         
     Returns:
-        List of matching answer types.
+        {"items": [...], "next_cursor": ...}, most relevant first; next_cursor is null on the last page.
+        Pages too large for the response size budget also carry a "truncated" marker.
     """
+    async def load():
+        async with tool_connection(ctx) as db:
+            if keyword and keyword.strip():
+                ranked, next_cursor = await answer_type_search.ranked(
+                    db, keyword, is_valid=is_valid, page_cursor=cursor, limit=limit
+                )
+                return bounded_page([item for item, _ in ranked], [hit_cursor(hit) for _, hit in ranked], next_cursor, compact)
+            items, next_cursor = await answer_types.list(
+                db, AnswerTypeFilter(is_valid=is_valid), page_cursor=cursor, limit=limit
+            )
+        return bounded_page(items, [answer_types.cursor_after(item) for item in items], next_cursor, compact)
+
+    arguments = {"keyword": keyword, "is_valid": is_valid, "limit": limit, "cursor": cursor, "compact": compact}
     try:
-        db = await get_db_connection()
-        async with db.cursor() as cursor:
-            # Build dynamic query
-            where_conditions = []
-            params = []
-            
-            if keyword:
-                where_conditions.append("(at.title LIKE %s OR at.description LIKE %s OR at.keywords LIKE %s)")
-                keyword_param = f"%{keyword}%"
-                params.extend([keyword_param, keyword_param, keyword_param])
-                
-            if is_valid is not None:
-                where_conditions.append("at.is_valid = %s")
-                params.append(str(1 if is_valid else 0))  # Convert bool to string for MySQL
-            
-            where_clause = ""
-            if where_conditions:
-                where_clause = "WHERE " + " AND ".join(where_conditions)
-            
-            query = f"""
-                SELECT
-                    at.id,
-                    cu.id as create_user_id, cu.firstname as create_user_firstname, cu.lastname as create_user_lastname,
-                    uu.id as update_user_id, uu.firstname as update_user_firstname, uu.lastname as update_user_lastname,
-                    at.title, at.description, at.keywords, at.sort, at.revision, at.create_date, at.update_date, at.is_valid, at.conditional
-                FROM answer_type at
-                LEFT JOIN fos_user cu ON at.create_user_id = cu.id
-                LEFT JOIN fos_user uu ON at.update_user_id = uu.id
-                {where_clause}
-                ORDER BY at.sort, at.title
-            """
-            
-            await cursor.execute(query, params)
-            rows = await cursor.fetchall()
-            
-            # Get French translations
-            if rows:
-                answer_type_ids = [str(row[0]) for row in rows]
-                placeholders = ','.join(['%s'] * len(answer_type_ids))
-                await cursor.execute(f"""
-                    SELECT foreign_key, content 
-                    FROM ext_translations 
-                    WHERE object_class LIKE %s
-                    AND field = %s
-                    AND locale = %s
-                    AND foreign_key IN ({placeholders})
-                """, ('%AnswerType%', 'title', 'fr', *answer_type_ids))
-                translations = {str(row[0]): row[1] for row in await cursor.fetchall()}
-            else:
-                translations = {}
-        
-        result = []
-        for row in rows:
-            result.append({
-                "id": row[0],
-                "create_user": {
-                    "user_id": row[1],
-                    "firstname": row[2],
-                    "lastname": row[3]
-                } if row[1] else None,
-                "update_user": {
-                    "user_id": row[4],
-                    "firstname": row[5],
-                    "lastname": row[6]
-                } if row[4] else None,
-                "title": row[7],
-                "title_fr": translations.get(str(row[0])),
-                "description": row[8],
-                "keywords": row[9],
-                "sort": row[10],
-                "revision": row[11],
-                "create_date": row[12].isoformat() if row[12] else None,
-                "update_date": row[13].isoformat() if row[13] else None,
-                "is_valid": bool(row[14]),
-                "conditional": row[15]
-            })
-        
-        return result
+        return await cached_tool_result(ctx, "search_answer_types", arguments, load)
         
     except Exception as e:
-        return [{"error": f"Failed to search answer types: {str(e)}"}]
+        return {"error": f"Failed to search answer types: {str(e)}"}
 
 @mcp.resource(uri="lms://database/schema")
 async def lms_database_schema() -> str:
@@ -311,7 +311,8 @@ async def explain_answer_type(answer_type_id: int) -> str:
     Args:
         answer_type_id: The ID of the answer type to explain
     """
-    answer_type = await get_answer_type(answer_type_id)
+    # Prompts get no Context argument: use the one of the current request
+    answer_type = await get_answer_type(answer_type_id, mcp.get_context())
     
     if "error" in answer_type:
         return f"Could not find answer type with ID {answer_type_id}"
@@ -1,8 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
 from slugify import slugify  # pip install python-slugify
-from app.models.shared import UserShort
+from typing_extensions import TypedDict
+from app.models.shared import UserShort, UserShortRecord
 
 class AnswerType(BaseModel):
     id: int
@@ -18,6 +19,7 @@ class AnswerType(BaseModel):
     update_date: Optional[datetime]
     is_valid: bool
     conditional: Optional[str]
+    translations: Dict[str, Dict[str, str]] = Field(default_factory=dict)  # locale -> field -> content, for the negotiated locale
 
 class AnswerTypeCreate(BaseModel):
     title: str
@@ -25,3 +27,49 @@ class AnswerTypeCreate(BaseModel):
     description: Optional[str] = None
     keywords: Optional[str] = None
     sort: Optional[int] = None
+
+class AnswerTypeImport(AnswerTypeCreate):
+    id: Optional[int] = None  # update this answer type; rows without id are matched on the slug of their title
+
+class AnswerTypeImportRow(BaseModel):
+    row: int  # 1-based position in the JSON array or among the CSV data rows
+    status: Literal["created", "updated", "invalid", "not_found", "duplicate"]
+    id: Optional[int] = None
+    errors: List[Dict[str, Any]] = Field(default_factory=list)
+
+class AnswerTypeImportReport(BaseModel):
+    total: int
+    created: int
+    updated: int
+    failed: int
+    elapsed_ms: float
+    rows_per_second: float
+    rows: List[AnswerTypeImportRow]
+
+class AnswerTypePage(BaseModel):
+    items: List[AnswerType]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= to get the next page; None on the last page
+
+# Plain-dict mirrors of AnswerType / AnswerTypePage, returned by the repository
+# and serialized without building models (see app.core.serialization).
+# Keep the fields in sync with the models above.
+
+class AnswerTypeRecord(TypedDict):
+    id: int
+    create_user: Optional[UserShortRecord]
+    update_user: Optional[UserShortRecord]
+    title: str
+    title_fr: Optional[str]
+    description: Optional[str]
+    keywords: Optional[str]
+    sort: Optional[int]
+    revision: Optional[int]
+    create_date: Optional[datetime]
+    update_date: Optional[datetime]
+    is_valid: bool
+    conditional: Optional[str]
+    translations: Dict[str, Dict[str, str]]
+
+class AnswerTypeRecordPage(TypedDict):
+    items: List[AnswerTypeRecord]
+    next_cursor: Optional[str]
@@ -1,6 +1,13 @@
 from pydantic import BaseModel
+from typing_extensions import TypedDict
 
 class UserShort(BaseModel):
     user_id: int
     firstname: str
-    lastname: str 
\ No newline at end of file
+    lastname: str
+
+class UserShortRecord(TypedDict):
+    """UserShort as a plain dict (fast serialization path)"""
+    user_id: int
+    firstname: str
+    lastname: str
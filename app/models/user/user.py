@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 from uuid import UUID
@@ -32,3 +32,14 @@ class User(BaseModel):
     last_change_password: Optional[datetime] = None
     laboratory_id: Optional[int] = None
     ldap_server_id: Optional[int] = None
+
+class UserProfile(BaseModel):
+    """What /profile returns about the current user"""
+    id: int
+    email: str
+    firstname: Optional[str] = None
+    lastname: Optional[str] = None
+
+class PrincipalInvalidation(BaseModel):
+    """Users whose cached principal must be dropped: email and/or username"""
+    subjects: List[str] = Field(min_length=1, max_length=100)
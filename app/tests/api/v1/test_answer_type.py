@@ -0,0 +1,278 @@
+import csv
+import io
+import json
+import pytest
+from contextlib import asynccontextmanager
+from datetime import datetime
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+from app.main import app
+from app.api.v1.deps import cache as cache_deps
+from app.api.v1.deps import conditional as conditional_deps
+from app.db.repositories import translation as translation_repository
+from app.api.v1.endpoints.lov import answer_type as answer_type_endpoints
+from app.core.pagination import encode_cursor
+from app.db.repositories.lov.answer_type_search import MemoryAnswerTypeSearch
+from app.db.session import get_db_connection
+from app.db.instrumentation import InstrumentedSSCursor
+from app.api.v1.deps.auth import get_current_user
+from app.db.repositories.lov import answer_type as answer_type_repository
+
+client = TestClient(app)
+
+def answer_type_row(answer_type_id, sort):
+    return (
+        answer_type_id, None, None, None, None, None, None,
+        f"Type {answer_type_id}", None, None, sort, 0,
+        datetime(2024, 1, 1), datetime(2024, 1, 1), 1, f"type-{answer_type_id}"
+    )
+
+@pytest.fixture(autouse=True)
+def no_cache(monkeypatch):
+    monkeypatch.setattr(cache_deps, "get_cached_data", AsyncMock(return_value=None))
+    monkeypatch.setattr(cache_deps, "set_cached_data", AsyncMock())
+    monkeypatch.setattr(translation_repository, "get_cached_data", AsyncMock(return_value=None))
+    monkeypatch.setattr(translation_repository, "set_cached_data", AsyncMock())
+
+@pytest.fixture(autouse=True)
+def cached_fingerprint(monkeypatch):
+    # Collection validators come from the cache: no extra query in the list tests
+    monkeypatch.setattr(conditional_deps, "get_cached_data", AsyncMock(return_value=["2024-01-02T00:00:00", 3]))
+    monkeypatch.setattr(conditional_deps, "set_cached_data", AsyncMock())
+
+@pytest.fixture
+def mock_db_cursor():
+    cursor = AsyncMock()
+    conn = MagicMock()
+    conn.cursor.return_value.__aenter__.return_value = cursor
+    app.dependency_overrides[get_db_connection] = lambda: conn
+    yield cursor
+    app.dependency_overrides.pop(get_db_connection, None)
+
+def test_list_returns_page_and_next_cursor(mock_db_cursor):
+    mock_db_cursor.fetchall.side_effect = [
+        [answer_type_row(1, None), answer_type_row(4, 2), answer_type_row(3, 5)],
+        [("fr", "1", "title", "Un")],
+    ]
+
+    response = client.get("/api/v1/answer-type/answer-types", params={"limit": 2, "is_valid": "true"})
+
+    assert response.status_code == 200
+    page = response.json()
+    assert [item["id"] for item in page["items"]] == [1, 4]
+    assert page["items"][0]["title_fr"] == "Un"
+    assert page["next_cursor"] == encode_cursor([2, 4])
+    sql, params = mock_db_cursor.execute.await_args_list[0].args
+    assert "LIMIT %s" in sql and params == (True, 3)
+
+def test_list_continues_after_cursor(mock_db_cursor):
+    mock_db_cursor.fetchall.side_effect = [[answer_type_row(3, 5)], [], ]
+
+    response = client.get(
+        "/api/v1/answer-type/answer-types",
+        params={"limit": 2, "cursor": encode_cursor([2, 4]), "title_prefix": "50%"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] is None
+    sql, params = mock_db_cursor.execute.await_args_list[0].args
+    assert params == (2, 2, 4, "50\\%%", 3)
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor([{}, {}]), encode_cursor(["x", []]), encode_cursor([2, True])])
+def test_list_rejects_tampered_cursor(mock_db_cursor, cursor):
+    response = client.get("/api/v1/answer-type/answer-types", params={"cursor": cursor})
+
+    assert response.status_code == 422
+    mock_db_cursor.execute.assert_not_awaited()
+
+def test_search_returns_ranked_page(mock_db_cursor, monkeypatch):
+    monkeypatch.setattr(answer_type_endpoints, "answer_type_search", MemoryAnswerTypeSearch())
+    mock_db_cursor.fetchone.return_value = (datetime(2024, 1, 1), 3)
+    mock_db_cursor.fetchall.side_effect = [
+        [(1, "Choix multiple", None, None, 1), (3, "Texte", "Un seul choix", None, 1), (4, "Échelle", None, None, 1)],
+        [],
+        [answer_type_row(3, 5), answer_type_row(1, None)],
+        [],
+    ]
+
+    response = client.get("/api/v1/answer-type/answer-types/search", params={"q": "CHOI", "limit": 1})
+
+    assert response.status_code == 200
+    page = response.json()
+    assert [item["id"] for item in page["items"]] == [1]  # title beats description
+    assert page["next_cursor"] is not None
+    sql, params = mock_db_cursor.execute.await_args_list[3].args
+    assert "at.id IN (%s)" in sql and params == [1]
+
+def test_search_requires_query(mock_db_cursor):
+    assert client.get("/api/v1/answer-type/answer-types/search").status_code == 422
+
+def export_row(answer_type_id):
+    return (
+        answer_type_id, f"Type {answer_type_id}", None, None, None, 0,
+        datetime(2024, 1, 1), datetime(2024, 1, 2), 1, f"type-{answer_type_id}", 7, None
+    )
+
+@pytest.fixture
+def export_connections(monkeypatch):
+    stream_cursor = AsyncMock()
+    stream_cursor.close = AsyncMock()
+    stream_db = MagicMock()
+    stream_db.cursor.return_value = stream_cursor
+    lookup_cursor = AsyncMock()
+    lookup_db = MagicMock()
+    lookup_db.cursor.return_value.__aenter__.return_value = lookup_cursor
+    connections = iter([stream_db, lookup_db])
+
+    @asynccontextmanager
+    async def fake_acquire():
+        yield next(connections)
+
+    monkeypatch.setattr(answer_type_endpoints, "acquire_connection", fake_acquire)
+    monkeypatch.setattr(answer_type_endpoints.settings, "EXPORT_CHUNK_SIZE", 2)
+    return stream_db, stream_cursor, lookup_cursor
+
+def test_export_streams_ndjson_in_chunks(export_connections):
+    stream_db, stream_cursor, lookup_cursor = export_connections
+    stream_cursor.fetchmany.side_effect = [[export_row(1), export_row(2)], [export_row(3)], []]
+    lookup_cursor.fetchall.side_effect = [[("fr", "2", "title", "Deux")], []]
+
+    response = client.get("/api/v1/answer-type/answer-types/export", params={"is_valid": "true"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["id"] for record in records] == [1, 2, 3]
+    assert records[1]["title_fr"] == "Deux"
+    assert records[0]["update_date"] == "2024-01-02T00:00:00"
+    sql, params = stream_cursor.execute.await_args.args
+    assert "ORDER BY at.id" in sql and params == [True]
+    assert stream_db.cursor.call_args.args == (InstrumentedSSCursor,)
+    # translations are looked up per chunk, on the second connection
+    assert [call.args[1][-2:] for call in lookup_cursor.execute.await_args_list] == [["1", "2"], ["title", "3"]]
+    stream_cursor.close.assert_awaited_once()
+
+def test_export_writes_csv_header(export_connections):
+    _, stream_cursor, lookup_cursor = export_connections
+    stream_cursor.fetchmany.side_effect = [[export_row(1)], []]
+    lookup_cursor.fetchall.return_value = []
+
+    response = client.get("/api/v1/answer-type/answer-types/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    header, row = list(csv.reader(io.StringIO(response.text)))
+    assert header[:3] == ["id", "title", "title_fr"]
+    assert row[:3] == ["1", "Type 1", ""]
+
+def test_export_rejects_unknown_format():
+    response = client.get("/api/v1/answer-type/answer-types/export", params={"format": "xml"})
+
+    assert response.status_code == 422
+
+def test_list_sends_validators_and_honors_if_none_match(mock_db_cursor):
+    mock_db_cursor.fetchall.side_effect = [[answer_type_row(1, None)], []]
+
+    first = client.get("/api/v1/answer-type/answer-types", params={"limit": 2})
+    second = client.get(
+        "/api/v1/answer-type/answer-types", params={"limit": 2},
+        headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert first.status_code == 200
+    assert first.headers["last-modified"] == "Tue, 02 Jan 2024 00:00:00 GMT"
+    assert second.status_code == 304
+    assert second.headers["etag"] == first.headers["etag"]
+    assert mock_db_cursor.execute.await_count == 2  # only the first request ran the queries
+
+def test_list_etag_depends_on_query(mock_db_cursor):
+    mock_db_cursor.fetchall.return_value = []
+
+    first = client.get("/api/v1/answer-type/answer-types", params={"limit": 2})
+    other = client.get(
+        "/api/v1/answer-type/answer-types", params={"limit": 3},
+        headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert other.status_code == 200
+    assert other.headers["etag"] != first.headers["etag"]
+
+def test_list_honors_if_modified_since(mock_db_cursor):
+    response = client.get(
+        "/api/v1/answer-type/answer-types",
+        headers={"If-Modified-Since": "Tue, 02 Jan 2024 00:00:00 GMT"}
+    )
+
+    assert response.status_code == 304
+    mock_db_cursor.execute.assert_not_awaited()
+
+@pytest.fixture
+def import_db(mock_db_cursor, monkeypatch):
+    conn = app.dependency_overrides[get_db_connection]()
+    conn.begin, conn.commit, conn.rollback = AsyncMock(), AsyncMock(), AsyncMock()
+    monkeypatch.setattr(answer_type_repository, "invalidate_tags", AsyncMock())
+    app.dependency_overrides[get_current_user] = lambda: {"id": 1, "firstname": "Ada", "lastname": "Lovelace"}
+    yield mock_db_cursor
+    app.dependency_overrides.pop(get_current_user, None)
+
+def test_import_json_reports_each_row(import_db):
+    import_db.fetchall.side_effect = [[(12, 12)], [(30, "choix-unique")]]
+
+    response = client.post("/api/v1/answer-type/answer-types/import", json=[
+        {"id": 12, "title": "Choix multiple"},
+        {"title": "Choix unique", "title_fr": "Choix unique"},
+        {"description": "no title"},
+    ])
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["total"], report["created"], report["updated"], report["failed"]) == (3, 0, 2, 1)
+    assert [(row["row"], row["status"], row["id"]) for row in report["rows"]] == [
+        (1, "updated", 12), (2, "updated", 30), (3, "invalid", None)
+    ]
+    assert report["rows"][2]["errors"][0]["loc"] == ["title"]
+    assert report["rows_per_second"] > 0
+
+def test_import_streams_csv_with_export_columns(import_db):
+    import_db.fetchall.side_effect = [[], [(40, "ligne-1-ligne-2")]]
+    body = 'id,title,title_fr,create_date\r\n,"Ligne 1\nLigne 2",Échelle,2024-01-01\r\n'.encode()
+
+    def chunks():
+        # Split inside the quoted field and inside a multi-byte character
+        yield body[:22]
+        yield body[22:44]
+        yield body[44:]
+
+    response = client.post(
+        "/api/v1/answer-type/answer-types/import", content=chunks(), headers={"Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["rows"] == [{"row": 1, "status": "created", "id": 40, "errors": []}]
+    insert = import_db.executemany.await_args_list[0].args
+    assert insert[1][0][2] == "Ligne 1\nLigne 2"
+    translations = import_db.executemany.await_args_list[1].args
+    assert translations[1] == [("fr", answer_type_repository.ANSWER_TYPE_CLASS, "title", "40", "Échelle")]
+
+def test_import_rejects_unsupported_media_type(import_db):
+    response = client.post(
+        "/api/v1/answer-type/answer-types/import", content=b"<xml/>", headers={"Content-Type": "application/xml"}
+    )
+    assert response.status_code == 415
+
+def test_import_rejects_oversized_bodies(import_db, monkeypatch):
+    monkeypatch.setattr(answer_type_endpoints.settings, "IMPORT_MAX_BYTES", 16)
+
+    declared = client.post("/api/v1/answer-type/answer-types/import", json=[{"title": "A" * 20}])
+    streamed = client.post(
+        "/api/v1/answer-type/answer-types/import", headers={"Content-Type": "text/csv"},
+        content=(chunk for chunk in [b"title\n", b"A" * 20 + b"\n"])  # chunked: no Content-Length
+    )
+
+    assert declared.status_code == streamed.status_code == 413
+    import_db.executemany.assert_not_awaited()
+
+def test_import_rejects_too_many_rows(import_db, monkeypatch):
+    monkeypatch.setattr(answer_type_endpoints.settings, "IMPORT_MAX_ROWS", 1)
+    response = client.post("/api/v1/answer-type/answer-types/import", json=[{"title": "A"}, {"title": "B"}])
+    assert response.status_code == 422
+    import_db.executemany.assert_not_awaited()
@@ -0,0 +1,108 @@
+import pytest
+from datetime import datetime
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+from app.main import app
+from app.api.v1.deps import cache as cache_deps
+from app.api.v1.deps import conditional as conditional_deps
+from app.db.repositories import translation as translation_repository
+from app.db.repositories.lov import answer_type as answer_type_repository
+from app.db.repositories.lov.answer_type import answer_types
+from app.api.v1.endpoints.lov import answer_type as answer_type_endpoints
+from app.db.session import get_db_connection
+
+client = TestClient(app)
+
+ROW = (
+    7, 1, "Ada", "Lovelace", None, None, None,
+    "Yes/No", "Binary answer", "bool", 1, 3,
+    datetime(2024, 1, 1), datetime(2024, 1, 2), 1, "yes-no"
+)
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    store = {}
+
+    async def get_cached_data(key):
+        return store.get(key)
+
+    async def set_cached_data(key, value, expire=300, tags=()):
+        store[key] = value
+
+    monkeypatch.setattr(cache_deps, "get_cached_data", get_cached_data)
+    monkeypatch.setattr(cache_deps, "set_cached_data", set_cached_data)
+    monkeypatch.setattr(conditional_deps, "get_cached_data", get_cached_data)
+    monkeypatch.setattr(conditional_deps, "set_cached_data", set_cached_data)
+    monkeypatch.setattr(translation_repository, "get_cached_data", get_cached_data)
+    monkeypatch.setattr(translation_repository, "set_cached_data", set_cached_data)
+    return store
+
+@pytest.fixture
+def mock_db_cursor():
+    cursor = AsyncMock()
+    cursor.fetchone.return_value = (3, datetime(2024, 1, 2))
+    cursor.fetchall.side_effect = [[ROW], [("fr", "7", "title", "Oui/Non")]]
+    conn = MagicMock()
+    conn.cursor.return_value.__aenter__.return_value = cursor
+    app.dependency_overrides[get_db_connection] = lambda: conn
+    yield cursor
+    app.dependency_overrides.pop(get_db_connection, None)
+
+def test_answer_type_detail_is_served_from_cache(memory_cache, mock_db_cursor):
+    first = client.get("/api/v1/answer-type/answer-types/7", headers={"Accept-Language": "fr-FR"})
+    second = client.get("/api/v1/answer-type/answer-types/7", headers={"Accept-Language": "fr-FR"})
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert first.json()["title_fr"] == "Oui/Non"
+    # version lookup, join and translation, only on the first call
+    assert mock_db_cursor.execute.await_count == 3
+    assert len(memory_cache) == 2  # version, response
+
+@pytest.mark.asyncio
+async def test_invalidation_targets_list_and_item_tags(monkeypatch):
+    invalidate_tags = AsyncMock()
+    monkeypatch.setattr(answer_type_repository, "invalidate_tags", invalidate_tags)
+
+    await answer_types.invalidate(7)
+    await answer_types.invalidate()
+    await answer_types.invalidate(7, translations=True)
+
+    assert invalidate_tags.await_args_list[0].args == ("answer_type:list", "answer_type:7")
+    assert invalidate_tags.await_args_list[1].args == ("answer_type:list",)
+    assert invalidate_tags.await_args_list[2].args[-1] == "translation:App\\Entity\\LovManagement\\AnswerType"
+
+def test_answer_type_detail_not_modified(memory_cache, mock_db_cursor):
+    first = client.get("/api/v1/answer-type/answer-types/7")
+    second = client.get("/api/v1/answer-type/answer-types/7", headers={"If-None-Match": f'W/{first.headers["etag"]}'})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.content == b""
+    assert mock_db_cursor.execute.await_count == 3
+
+@pytest.mark.asyncio
+async def test_answer_type_etag_changes_without_revision_bump(monkeypatch):
+    # disable/enable only move update_date
+    monkeypatch.setattr(conditional_deps, "get_cached_data", AsyncMock(side_effect=[
+        [3, "2024-01-02T00:00:00"], [3, "2024-01-03T00:00:00"]
+    ]))
+
+    request = MagicMock(headers={})
+    before = await answer_type_endpoints.answer_type_validator(request, 7, MagicMock())
+    after = await answer_type_endpoints.answer_type_validator(request, 7, MagicMock())
+
+    assert before.etag != after.etag
+    assert after.last_modified == datetime(2024, 1, 3)
+
+def test_answer_type_detail_negotiates_locale(memory_cache, mock_db_cursor):
+    mock_db_cursor.fetchall.side_effect = [[ROW], [("fr", "7", "title", "Oui/Non"), ("en", "7", "title", "Yes or no")]]
+
+    response = client.get("/api/v1/answer-type/answer-types/7", headers={"Accept-Language": "de, en-GB;q=0.8, fr;q=0.5"})
+
+    assert response.json()["translations"] == {"en": {"title": "Yes or no"}}
+    assert response.json()["title_fr"] == "Oui/Non"
+    assert response.headers["vary"] == "Accept-Language"
+    sql, params = mock_db_cursor.execute.await_args_list[-1].args
+    assert "object_class = %s" in sql and "LIKE" not in sql
+    assert params == ["fr", "en", "App\\Entity\\LovManagement\\AnswerType", "title", "7"]
@@ -0,0 +1,88 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock
+from app.api.v1.deps import auth as auth_deps
+from app.api.v1.endpoints.user import principal as principal_endpoint, profile
+from app.core import principal as principal_module
+from app.core.principal import parse_roles
+from app.core.security import create_access_token
+
+PRINCIPAL = {
+    "id": 1, "email": "ada@example.com", "username": "ada", "firstname": "Ada", "lastname": "Lovelace",
+    "roles": ["ROLE_ADMIN"], "enabled": True, "is_valid": True
+}
+
+@pytest.fixture
+def principal_store(monkeypatch):
+    store = {}
+
+    async def get_cached_data(key):
+        return store.get(key)
+
+    async def set_cached_data(key, value, expire=300, tags=()):
+        store[key] = value
+
+    async def invalidate_cache(key):
+        store.pop(key, None)
+
+    fetch_principal = AsyncMock(return_value=PRINCIPAL)
+    monkeypatch.setattr(principal_module, "get_cached_data", get_cached_data)
+    monkeypatch.setattr(principal_module, "set_cached_data", set_cached_data)
+    monkeypatch.setattr(principal_module, "invalidate_cache", invalidate_cache)
+    monkeypatch.setattr(principal_module, "fetch_principal", fetch_principal)
+    return fetch_principal
+
+@pytest.mark.asyncio
+async def test_principal_is_looked_up_once_per_subject(principal_store):
+    token = create_access_token({"sub": "ada@example.com"})
+
+    assert await auth_deps.get_current_user(token) == PRINCIPAL
+    assert await auth_deps.get_current_user(token) == PRINCIPAL
+    assert principal_store.await_count == 1
+
+@pytest.mark.asyncio
+async def test_disabled_principal_is_rejected(principal_store):
+    principal_store.return_value = {**PRINCIPAL, "enabled": False}
+
+    with pytest.raises(HTTPException) as exc:
+        await auth_deps.get_current_user(create_access_token({"sub": "ada@example.com"}))
+    assert exc.value.status_code == 401
+
+app = FastAPI()
+app.include_router(profile.router)
+app.include_router(principal_endpoint.router)
+client = TestClient(app)
+
+def test_disabled_user_is_rejected_once_invalidated(principal_store):
+    user_token = {"Authorization": f"Bearer {create_access_token({'sub': 'grace@example.com'})}"}
+    admin_token = {"Authorization": f"Bearer {create_access_token({'sub': 'ada@example.com'})}"}
+    grace = {**PRINCIPAL, "id": 2, "email": "grace@example.com", "username": "grace", "roles": ["ROLE_USER"]}
+    principal_store.side_effect = lambda subject: grace if subject == "grace@example.com" else PRINCIPAL
+
+    assert client.get("/profile", headers=user_token).status_code == 200
+    grace = {**grace, "enabled": False}  # disabled in fos_user: the cached principal still lets the user in
+    assert client.get("/profile", headers=user_token).status_code == 200
+
+    # Only admins may invalidate
+    assert client.post("/principals/invalidate", json={"subjects": ["grace@example.com"]}, headers=user_token).status_code == 403
+    assert client.post("/principals/invalidate", json={"subjects": ["grace@example.com"]}, headers=admin_token).status_code == 204
+    assert client.get("/profile", headers=user_token).status_code == 401
+
+def test_profile_only_exposes_identity_fields(principal_store):
+    response = client.get("/profile", headers={"Authorization": f"Bearer {create_access_token({'sub': 'ada@example.com'})}"})
+
+    assert response.json() == {"id": 1, "email": "ada@example.com", "firstname": "Ada", "lastname": "Lovelace"}
+
+@pytest.mark.asyncio
+async def test_embedded_principal_skips_lookup(principal_store, monkeypatch):
+    monkeypatch.setattr(auth_deps.settings, "JWT_EMBED_PRINCIPAL", True)
+    token = create_access_token({"sub": "ada@example.com", "principal": PRINCIPAL})
+
+    assert await auth_deps.get_current_user(token) == PRINCIPAL
+    assert principal_store.await_count == 0
+
+def test_parse_roles_handles_php_serialized_and_json():
+    assert parse_roles('a:2:{i:0;s:10:"ROLE_ADMIN";i:1;s:9:"ROLE_USER";}') == ["ROLE_ADMIN", "ROLE_USER"]
+    assert parse_roles('["ROLE_USER"]') == ["ROLE_USER"]
+    assert parse_roles(None) == []
@@ -0,0 +1,50 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.core import cache
+from app.core.lru import LRUCache
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(max_size=2, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1  # "b" becomes the oldest
+    lru.set("c", 3)
+
+    assert "b" not in lru
+    assert lru.get("a") == 1 and lru.get("c") == 3
+    assert lru.evictions == 1
+
+def test_lru_expires_entries():
+    lru = LRUCache(max_size=2, ttl=60)
+    lru.set("a", 1, ttl=0)
+
+    assert lru.get("a") is None
+    assert lru.stats()["misses"] == 1
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fake = MagicMock()
+    fake.get = AsyncMock(return_value=json.dumps({"id": 1}))
+    fake.delete = AsyncMock()
+    fake.publish = AsyncMock()
+    monkeypatch.setattr(cache, "redis", fake)
+    monkeypatch.setattr(cache, "local_cache", LRUCache(max_size=10, ttl=60))
+    return fake
+
+@pytest.mark.asyncio
+async def test_l1_serves_repeated_reads(fake_redis):
+    assert await cache.get_cached_data("cache:k") == {"id": 1}
+    assert await cache.get_cached_data("cache:k") == {"id": 1}
+
+    assert fake_redis.get.await_count == 1
+    assert cache.local_cache.hits == 1
+
+@pytest.mark.asyncio
+async def test_invalidation_evicts_l1_and_broadcasts(fake_redis):
+    await cache.get_cached_data("cache:k")
+    await cache.invalidate_cache("cache:k")
+
+    assert "cache:k" not in cache.local_cache
+    channel, payload = fake_redis.publish.await_args.args
+    assert json.loads(payload) == ["cache:k"]
@@ -0,0 +1,47 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.core import ldap_auth
+
+@pytest.fixture
+def ldap_cursor():
+    cursor = AsyncMock()
+    cursor.fetchall.return_value = [
+        (1, "ldap://one.example.com", None, None, "cn=one"),
+        (2, "ldap://two.example.com", None, None, "cn=two"),
+    ]
+    ldap_auth.invalidate_ldap_servers()
+    return cursor
+
+@pytest.fixture
+def ldap_db(ldap_cursor):
+    db = MagicMock()
+    db.cursor.return_value.__aenter__.return_value = ldap_cursor
+    return db
+
+@pytest.fixture
+def binds(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ldap_auth, "_bind", lambda server, user, password: calls.append((server.host, user)) or True)
+    return calls
+
+@pytest.mark.asyncio
+async def test_server_config_is_loaded_once_and_honors_user_server(ldap_db, ldap_cursor, binds):
+    assert await ldap_auth.ldap_authenticate(ldap_db, 2, "secret")
+    assert await ldap_auth.ldap_authenticate(ldap_db, None, "secret")
+
+    assert ldap_cursor.execute.await_count == 1
+    assert binds == [("two.example.com", "cn=two"), ("one.example.com", "cn=one")]
+
+@pytest.mark.asyncio
+async def test_empty_password_never_binds(ldap_db, binds):
+    assert not await ldap_auth.ldap_authenticate(ldap_db, 1, "")
+    assert binds == []
+
+@pytest.mark.asyncio
+async def test_unknown_server_reloads_once_per_ttl(ldap_db, ldap_cursor, binds):
+    assert await ldap_auth.ldap_authenticate(ldap_db, 1, "secret")
+    assert not await ldap_auth.ldap_authenticate(ldap_db, 9, "secret")
+    assert not await ldap_auth.ldap_authenticate(ldap_db, 9, "secret")
+
+    assert ldap_cursor.execute.await_count == 2  # initial load + one reload for the unknown id
+    assert binds == [("one.example.com", "cn=one")]
@@ -0,0 +1,72 @@
+import json
+import logging
+import queue
+import sys
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core import logging as app_logging
+from app.core.logging import (
+    JsonFormatter, NonBlockingQueueHandler, RequestIdFilter, RequestIdMiddleware,
+    SamplingFilter, parse_sampling, request_id
+)
+
+def make_record(name="app.access", level=logging.INFO, msg="GET %s", args=("/",), exc_info=None, **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+def test_sampling_keeps_one_in_n_per_logger_and_every_warning():
+    sampler = SamplingFilter(parse_sampling("app.access=0.25, app.api=0"))
+
+    kept = [sampler.filter(make_record()) for _ in range(8)]
+
+    assert kept == [True, False, False, False] * 2
+    assert sampler.filter(make_record("app.api.v1.endpoints.auth")) is False
+    assert sampler.filter(make_record("app.api.v1.endpoints.auth", logging.WARNING)) is True
+    assert sampler.filter(make_record("app.db")) is True
+
+def test_json_formatter_includes_request_id_extras_and_exception():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record(exc_info=sys.exc_info(), status=200, duration_ms=1.5)
+    token = request_id.set("req-1")
+    try:
+        RequestIdFilter().filter(record)
+    finally:
+        request_id.reset(token)
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "GET /" and entry["level"] == "INFO" and entry["logger"] == "app.access"
+    assert entry["request_id"] == "req-1"
+    assert entry["status"] == 200 and entry["duration_ms"] == 1.5
+    assert "ValueError: boom" in entry["exception"]
+
+def test_queue_handler_merges_arguments_and_drops_when_full(monkeypatch):
+    monkeypatch.setattr(app_logging, "_dropped", 0)
+    records = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(records)
+
+    handler.handle(make_record(args=("/first",)))
+    handler.handle(make_record(args=("/second",)))
+
+    queued = records.get_nowait()
+    assert queued.msg == "GET /first" and queued.args is None
+    assert app_logging.get_logging_stats()["dropped"] == 1
+
+def test_request_id_middleware_echoes_valid_ids_and_generates_others():
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/test-request-id")
+    async def read_request_id():
+        return {"request_id": request_id.get()}
+
+    client = TestClient(app)
+    echoed = client.get("/test-request-id", headers={"X-Request-ID": "abc-123"})
+    generated = client.get("/test-request-id", headers={"X-Request-ID": "bad id\n"})
+
+    assert echoed.headers["x-request-id"] == "abc-123" == echoed.json()["request_id"]
+    assert generated.headers["x-request-id"] == generated.json()["request_id"] != "bad id\n"
+    assert len(generated.headers["x-request-id"]) == 32
@@ -0,0 +1,80 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock
+from app import main
+from app.core.metrics import (
+    CallbackMetric, Counter, Histogram, MetricsMiddleware, MetricsRegistry,
+    http_request_duration, http_requests, instrument_redis, redis_command_duration
+)
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/items/{id}")
+
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/items/{id}",le="0.1"} 2',
+        'latency_seconds_bucket{route="/items/{id}",le="1"} 3',
+        'latency_seconds_bucket{route="/items/{id}",le="+Inf"} 4',
+        'latency_seconds_sum{route="/items/{id}"} 3.65',
+        'latency_seconds_count{route="/items/{id}"} 4',
+    ]
+
+def test_registry_escapes_labels_and_isolates_failing_callbacks():
+    registry = MetricsRegistry()
+    registry.register(Counter("errors_total", "Errors", ("message",))).inc('say "hi"\n')
+    registry.register(CallbackMetric("broken", "Broken", lambda: 1 / 0))
+
+    text = registry.render()
+
+    assert 'errors_total{message="say \\"hi\\"\\n"} 1' in text
+    assert "# broken unavailable" in text
+    with pytest.raises(ValueError):
+        registry.counter("errors_total", "Again")
+
+def test_middleware_labels_requests_with_the_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/test-metrics/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    before = http_requests.value("GET", "/test-metrics/{item_id}", "200")
+    client.get("/test-metrics/1")
+    client.get("/test-metrics/2")
+
+    assert http_requests.value("GET", "/test-metrics/{item_id}", "200") == before + 2
+    assert http_request_duration.count("GET", "/test-metrics/{item_id}") >= 2
+
+@pytest.mark.asyncio
+async def test_instrument_redis_times_commands_and_pipelines():
+    class FakePipeline:
+        execute = AsyncMock(return_value=[1])
+
+    class FakeRedis:
+        execute_command = AsyncMock(return_value="OK")
+
+        def pipeline(self, transaction=True):
+            return FakePipeline()
+
+    client = instrument_redis(FakeRedis())
+    commands, pipelines = redis_command_duration.count("SET"), redis_command_duration.count("PIPELINE")
+
+    assert await client.execute_command("set", "key", "value") == "OK"
+    assert await client.pipeline(transaction=False).execute() == [1]
+
+    assert redis_command_duration.count("SET") == commands + 1
+    assert redis_command_duration.count("PIPELINE") == pipelines + 1
+
+def test_metrics_endpoint_skips_rate_limiting(monkeypatch):
+    monkeypatch.setattr(main, "rate_limit_middleware", AsyncMock(side_effect=AssertionError("rate limited")))
+
+    response = TestClient(main.app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert "db_pool_waiters" in response.text and 'cache_hits_total{tier="l1"}' in response.text
@@ -0,0 +1,226 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import RateLimitResult, rate_limit_middleware
+from app.core.security import create_access_token
+
+app = FastAPI()
+app.middleware("http")(rate_limit_middleware)
+
+@app.get("/ping")
+async def ping():
+    return {"ok": True}
+
+client = TestClient(app)
+
+@pytest.fixture
+def limiter_check(monkeypatch):
+    check = AsyncMock()
+    monkeypatch.setattr(rate_limit.rate_limiter, "check", check)
+    return check
+
+def test_allowed_request_carries_rate_limit_headers(limiter_check):
+    limiter_check.return_value = RateLimitResult(True, limit=60, remaining=59, retry_after=0, reset_after=42.2)
+
+    response = client.get("/ping")
+
+    assert response.status_code == 200
+    assert response.headers["X-RateLimit-Remaining"] == "59"
+    assert response.headers["X-RateLimit-Reset"] == "43"
+    assert "Retry-After" not in response.headers
+
+def test_rejected_request_returns_429_with_retry_after(limiter_check):
+    limiter_check.return_value = RateLimitResult(False, limit=60, remaining=0, retry_after=1.5, reset_after=30)
+
+    response = client.get("/ping")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+    assert response.headers["X-RateLimit-Limit"] == "60"
+
+def test_fails_open_without_redis(limiter_check):
+    limiter_check.return_value = None
+
+    response = client.get("/ping")
+
+    assert response.status_code == 200
+    assert "X-RateLimit-Limit" not in response.headers
+
+def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ValueError):
+        rate_limit.RateLimiter(algorithm="leaky")
+
+class FakePipeline:
+    def __init__(self, counters):
+        self.counters = counters
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def incrby(self, key, amount):
+        self.commands.append((key, amount))
+
+    def expire(self, key, seconds):
+        self.commands.append(None)
+
+    async def execute(self):
+        results = []
+        for command in self.commands:
+            if command is None:
+                results.append(True)
+                continue
+            key, amount = command
+            self.counters[key] = self.counters.get(key, 0) + amount
+            results.append(self.counters[key])
+        return results
+
+@pytest.fixture
+def fake_counters(monkeypatch):
+    counters = {}
+    fake = MagicMock()
+    fake.pipeline = lambda transaction=False: FakePipeline(counters)
+    monkeypatch.setattr(rate_limit, "redis", fake)
+    return counters
+
+@pytest.mark.asyncio
+async def test_approximate_mode_syncs_in_batches(fake_counters):
+    limiter = rate_limit.RateLimiter(requests_per_minute=10, mode="approximate", error_bound=0.3, sync_interval_ms=60000)
+    request = type("Request", (), {"headers": {}, "client": type("Client", (), {"host": "10.0.0.1"})})()
+
+    results = [await limiter.check(request) for _ in range(3)]
+    assert all(result.allowed for result in results)
+    assert fake_counters == {}  # local budget of 3 not spent yet: no Redis traffic
+
+    # Another worker already consumed the rest of the window
+    window_key = next(iter(limiter._buckets)) + f":{int(next(iter(limiter._buckets.values())).window_start)}"
+    fake_counters[window_key] = 7
+
+    assert not (await limiter.check(request)).allowed
+    assert fake_counters[window_key] == 10
+    await limiter.close()
+
+class FailingPipeline(FakePipeline):
+    async def execute(self):
+        raise ConnectionError("Redis is down")
+
+@pytest.mark.asyncio
+async def test_approximate_mode_keeps_pending_counts_when_sync_fails(fake_counters):
+    limiter = rate_limit.RateLimiter(requests_per_minute=10, mode="approximate", error_bound=0.2, sync_interval_ms=60000)
+    request = type("Request", (), {"headers": {}, "client": type("Client", (), {"host": "10.0.0.1"})})()
+    working_pipeline = rate_limit.redis.pipeline
+    rate_limit.redis.pipeline = lambda transaction=False: FailingPipeline(fake_counters)
+
+    results = [await limiter.check(request) for _ in range(4)]
+    bucket = next(iter(limiter._buckets.values()))
+
+    assert all(result.allowed for result in results)
+    assert bucket.pending == 4  # nothing recorded, nothing lost
+    over_limit = [await limiter.check(request) for _ in range(8)]
+    assert over_limit[-1] is None  # fails open like exact mode, but still counted
+    assert bucket.pending == 12
+
+    rate_limit.redis.pipeline = working_pipeline
+    await limiter.close()
+    assert list(fake_counters.values()) == [12]
+
+@pytest.mark.asyncio
+async def test_approximate_mode_weighs_the_previous_window(monkeypatch, fake_counters):
+    limiter = rate_limit.RateLimiter(requests_per_minute=10, mode="approximate", sync_interval_ms=60000)
+    monkeypatch.setattr(rate_limit.time, "time", lambda: 1200.0 + 15)  # a quarter into the window
+    key = f"{limiter.key_prefix}:approx:user:ada"
+    limiter._buckets[key] = rate_limit._LocalBucket(1140.0)
+    limiter._buckets[key].synced = 8
+
+    admitted = await limiter._check_local(key, 4)  # 8 * 0.75 + 4 = 10
+    rejected = await limiter._check_local(key, 1)
+
+    assert limiter._buckets[key].previous == 8
+    assert admitted.allowed and admitted.remaining == 0
+    assert not rejected.allowed
+    assert rejected.retry_after == pytest.approx(60 * (1 - 5 / 8) - 15)  # until 5 of the 8 have slid out
+    limiter._sync_task.cancel()
+
+def test_identity_prefers_token_subject_over_ip():
+    token = create_access_token({"sub": "ada@example.com"})
+    with_token = type("Request", (), {"headers": {"authorization": f"Bearer {token}"}, "client": type("Client", (), {"host": "10.0.0.1"})})()
+    with_bad_token = type("Request", (), {"headers": {"authorization": "Bearer nope"}, "client": type("Client", (), {"host": "10.0.0.1"})})()
+
+    assert rate_limit.get_client_identity(with_token) == "user:ada@example.com"
+    assert rate_limit.get_client_identity(with_bad_token) == "ip:10.0.0.1"
+
+def test_policies_match_route_templates_and_methods():
+    login = rate_limit.get_rate_limit_policy("POST", f"{settings.API_V1_STR}/auth/token")
+    listing = rate_limit.get_rate_limit_policy("GET", f"{settings.API_V1_STR}/answer-type/answer-types")
+    detail = rate_limit.get_rate_limit_policy("GET", f"{settings.API_V1_STR}/answer-type/answer-types/7")
+
+    assert login.limiter is rate_limit.auth_rate_limiter and login.limiter.mode == "exact"
+    assert listing.cost == settings.RATE_LIMIT_LIST_COST
+    assert detail is rate_limit.default_rate_limit_policy
+
+@pytest.mark.asyncio
+async def test_policy_cost_above_the_limit_is_capped(lua_redis):
+    # Exact GCRA allows burst_size tokens at once: a cost of 10 could never be admitted
+    limiter = rate_limit.RateLimiter(burst_size=3, algorithm="gcra")
+    policy = rate_limit._fit_cost(rate_limit.RateLimitPolicy("export", "/export", limiter, cost=10))
+
+    assert policy.cost == 3
+    assert (await limiter.check(None, policy.cost, identity="user:ada")).allowed
+
+def test_route_template_placeholders_match_one_segment():
+    pattern = rate_limit._compile_path("/answer-types/{answer_type_id}/disable")
+
+    assert pattern.match("/answer-types/7/disable")
+    assert not pattern.match("/answer-types/7/8/disable")
+
+@pytest.fixture
+def lua_redis(monkeypatch):
+    """rate_limit.redis on fakeredis, which runs the Lua scripts"""
+    fakeredis = pytest.importorskip("fakeredis.aioredis", reason="requires fakeredis[lua] (requirements-dev.txt)")
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(rate_limit, "redis", client)
+    return client
+
+# Retry-after bounds once a budget of 5 per minute is spent: the window-based
+# algorithms wait for the window to slide, GCRA for one emission interval (12s)
+ALGORITHM_RETRY_BOUNDS = {
+    "sliding_window_log": (59, 60),
+    "sliding_window_counter": (0.001, 60),
+    "gcra": (11, 12),
+}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("algorithm", list(rate_limit.ALGORITHMS))
+async def test_scripts_admit_until_the_budget_is_spent(lua_redis, algorithm):
+    limiter = rate_limit.RateLimiter(requests_per_minute=5, burst_size=5, algorithm=algorithm)
+
+    admitted = [await limiter.check(None, identity="user:ada") for _ in range(5)]
+    rejected = await limiter.check(None, identity="user:ada")
+
+    assert all(result.allowed for result in admitted)
+    assert [result.remaining for result in admitted] == [4, 3, 2, 1, 0]
+    assert not rejected.allowed and rejected.remaining == 0
+    low, high = ALGORITHM_RETRY_BOUNDS[algorithm]
+    assert low <= rejected.retry_after <= high
+    # Other clients have their own budget
+    assert (await limiter.check(None, identity="user:grace")).allowed
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("algorithm", list(rate_limit.ALGORITHMS))
+async def test_scripts_consume_the_route_cost(lua_redis, algorithm):
+    limiter = rate_limit.RateLimiter(requests_per_minute=5, burst_size=5, algorithm=algorithm)
+
+    first = await limiter.check(None, cost=3, identity="user:ada")
+    too_costly = await limiter.check(None, cost=3, identity="user:ada")
+    fits = await limiter.check(None, cost=2, identity="user:ada")
+
+    assert first.allowed and first.remaining == 2
+    assert not too_costly.allowed and too_costly.retry_after > 0
+    assert fits.allowed and fits.remaining == 0
+    assert not (await limiter.check(None, identity="user:ada")).allowed
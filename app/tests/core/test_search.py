@@ -0,0 +1,47 @@
+import pytest
+from app.core.errors import ValidationError
+from app.core.pagination import encode_cursor
+from app.core.search import InvertedIndex, fold, paginate_hits, query_terms
+
+@pytest.fixture
+def index():
+    index = InvertedIndex({"title": 3.0, "description": 1.0})
+    index.add(1, {"title": "Question à choix multiple", "description": "Plusieurs réponses possibles"}, is_valid=True)
+    index.add(2, {"title": "Réponse libre", "description": "Texte saisi"}, is_valid=False)
+    index.add(3, {"title": "Échelle", "description": "Un choix sur une échelle"}, is_valid=True)
+    return index
+
+def test_fold_removes_accents_case_and_ligatures():
+    assert fold("Évaluation du Cœur") == "evaluation du coeur"
+    assert query_terms("Réponse, réponse LIBRE") == ["reponse", "libre"]
+
+def test_search_ignores_accents_and_ranks_title_first(index):
+    hits = index.search("REPONSE")
+    assert [doc_id for doc_id, _ in hits] == [2, 1]  # title match, then description prefix ("reponses")
+
+def test_search_requires_every_term_and_matches_prefixes(index):
+    assert [doc_id for doc_id, _ in index.search("choi mult")] == [1]
+    assert index.search("choix inconnu") == []
+
+def test_search_filters_on_attributes(index):
+    hits = index.search("reponse", lambda attributes: attributes["is_valid"])
+    assert [doc_id for doc_id, _ in hits] == [1]
+
+def test_add_replaces_and_remove_drops(index):
+    index.add(2, {"title": "Vrai ou faux"}, is_valid=True)
+    assert [doc_id for doc_id, _ in index.search("reponse")] == [1]
+    index.remove(1)
+    assert index.search("reponse") == [] and len(index) == 2
+
+def test_paginate_hits_continues_after_cursor():
+    hits = [(4, 2.5), (1, 1.0), (3, 1.0), (2, 0.5)]
+
+    page, next_cursor = paginate_hits(hits, None, 2)
+    assert page == [(4, 2.5), (1, 1.0)] and next_cursor == encode_cursor([1.0, 1])
+
+    page, next_cursor = paginate_hits(hits, next_cursor, 2)
+    assert page == [(3, 1.0), (2, 0.5)] and next_cursor is None
+
+def test_paginate_hits_rejects_tampered_cursor():
+    with pytest.raises(ValidationError):
+        paginate_hits([], encode_cursor(["a", 1]), 2)
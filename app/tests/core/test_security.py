@@ -0,0 +1,72 @@
+import asyncio
+import bcrypt
+import pytest
+from jose import JWTError
+from unittest.mock import MagicMock
+from app.core import security
+from app.core.errors import ServiceUnavailableError
+from app.core.lru import LRUCache
+
+@pytest.fixture(autouse=True)
+def fresh_token_caches(monkeypatch):
+    monkeypatch.setattr(security, "_token_cache", LRUCache(max_size=10, ttl=60))
+    monkeypatch.setattr(security, "_revoked_tokens", LRUCache(max_size=10, ttl=60))
+
+def test_verify_password_accepts_symfony_2y_hashes():
+    hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode()
+    symfony_hash = "$2y$" + hashed[4:]
+
+    assert security.verify_password("secret", symfony_hash)
+    assert not security.verify_password("wrong", symfony_hash)
+
+@pytest.mark.asyncio
+async def test_verify_password_async_runs_off_the_event_loop():
+    hashed = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode()
+
+    assert await security.verify_password_async("secret", hashed)
+    stats = security.get_password_hash_stats()
+    assert stats["in_flight"] == 0 and stats["completed"] >= 1
+
+@pytest.mark.asyncio
+async def test_password_queue_timeout_raises_service_unavailable(monkeypatch):
+    monkeypatch.setattr(security, "_hash_slots", asyncio.Semaphore(0))
+    monkeypatch.setattr(security.settings, "PASSWORD_HASH_QUEUE_TIMEOUT", 0.01)
+
+    with pytest.raises(ServiceUnavailableError):
+        await security.verify_password_async("secret", "$2b$04$invalid")
+    assert security.get_password_hash_stats()["queued"] == 0
+
+def test_decoded_tokens_are_cached_until_revoked(monkeypatch):
+    token = security.create_access_token({"sub": "ada@example.com"})
+    decode = MagicMock(wraps=security.jwt.decode)
+    monkeypatch.setattr(security.jwt, "decode", decode)
+
+    assert security.decode_access_token(token)["sub"] == "ada@example.com"
+    assert security.decode_access_token(token)["sub"] == "ada@example.com"
+    assert decode.call_count == 1
+
+    security.revoke_token(token)
+    with pytest.raises(JWTError):
+        security.decode_access_token(token)
+
+def test_cached_token_is_rejected_after_exp(monkeypatch):
+    token = security.create_access_token({"sub": "ada@example.com"})
+    claims = security.decode_access_token(token)
+    monkeypatch.setattr(security.time, "time", lambda: claims["exp"] + 1)
+
+    with pytest.raises(JWTError):
+        security.decode_access_token(token)
+
+def test_revocation_hooks_run_on_verification(monkeypatch):
+    monkeypatch.setattr(security, "_revocation_hooks", [lambda claims: claims["sub"] == "mallory@example.com"])
+
+    with pytest.raises(JWTError):
+        security.decode_access_token(security.create_access_token({"sub": "mallory@example.com"}))
+
+def test_revocation_hooks_apply_to_cached_tokens(monkeypatch):
+    token = security.create_access_token({"sub": "mallory@example.com"})
+    assert security.decode_access_token(token)["sub"] == "mallory@example.com"
+
+    monkeypatch.setattr(security, "_revocation_hooks", [lambda claims: claims["sub"] == "mallory@example.com"])
+    with pytest.raises(JWTError):
+        security.decode_access_token(token)
@@ -0,0 +1,37 @@
+import warnings
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core.serialization import dump_json, json_response
+from app.db.repositories.lov.answer_type import _to_record
+from app.models.lov.answer_type import AnswerType, AnswerTypePage, AnswerTypeRecord, AnswerTypeRecordPage
+from app.models.shared import UserShort, UserShortRecord
+
+TRANSLATIONS = {"fr": {"1": {"title": "Oui/Non é"}}, "en": {}}
+
+def rows():
+    return [
+        (1, 3, "Ada", "Lovelace", None, None, None, "Yes/No", "Binary", "bool", 2, 1,
+         datetime(2024, 1, 1, 8, 30, 0, 120000), datetime(2024, 1, 2), 1, "yes-no"),
+        (2, None, None, None, 4, "Alan", "Turing", "Scale", None, None, None, None,
+         None, None, 0, None),
+    ]
+
+def test_records_mirror_the_models():
+    assert list(AnswerTypeRecord.__annotations__) == list(AnswerType.model_fields)
+    assert list(AnswerTypeRecordPage.__annotations__) == list(AnswerTypePage.model_fields)
+    assert list(UserShortRecord.__annotations__) == list(UserShort.model_fields)
+
+def test_fast_path_matches_validated_fastapi_encoding():
+    page = {"items": [_to_record(row, TRANSLATIONS, "en") for row in rows()], "next_cursor": "abc"}
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # pydantic warns when a value does not fit the schema
+        fast = json_response(page, AnswerTypeRecordPage)
+
+    legacy = JSONResponse(jsonable_encoder(AnswerTypePage.model_validate(page))).body
+    assert fast.body == legacy
+    assert fast.media_type == "application/json"
+
+def test_dump_json_infers_type_by_default():
+    assert dump_json({"at": datetime(2024, 1, 1)}) == b'{"at":"2024-01-01T00:00:00"}'
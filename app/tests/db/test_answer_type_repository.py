@@ -0,0 +1,119 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from app.db.repositories import translation
+from app.db.repositories.lov.answer_type import AnswerTypeFilter, UpsertResult, answer_types
+from app.models.lov.answer_type import AnswerTypeImport
+
+def row(answer_type_id, sort=None):
+    return (
+        answer_type_id, 1, "Ada", "Lovelace", None, None, None,
+        f"Type {answer_type_id}", None, None, sort, 0,
+        datetime(2024, 1, 1), datetime(2024, 1, 2), 1, f"type-{answer_type_id}"
+    )
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(translation, "get_cached_data", AsyncMock(return_value=None))
+    monkeypatch.setattr(translation, "set_cached_data", AsyncMock())
+    cursor = AsyncMock()
+    conn = MagicMock()
+    conn.cursor.return_value.__aenter__.return_value = cursor
+    return conn, cursor
+
+@pytest.mark.asyncio
+async def test_get_many_loads_in_one_query_and_keeps_id_order(db):
+    conn, cursor = db
+    cursor.fetchall.side_effect = [[row(3), row(5)], [("fr", "5", "title", "Cinq")]]
+
+    items = await answer_types.get_many(conn, [5, 4, 3, 5])
+
+    assert [item["id"] for item in items] == [5, 3]
+    assert items[0]["title_fr"] == "Cinq" and items[0]["create_user"]["firstname"] == "Ada"
+    sql, params = cursor.execute.await_args_list[0].args
+    assert "at.id IN (%s,%s,%s)" in sql and params == [5, 4, 3]
+
+@pytest.mark.asyncio
+async def test_list_without_limit_returns_everything(db):
+    conn, cursor = db
+    cursor.fetchall.side_effect = [[row(1), row(2)], []]
+
+    items, next_cursor = await answer_types.list(conn, AnswerTypeFilter(keyword="50%", is_valid=False))
+
+    assert len(items) == 2 and next_cursor is None
+    sql, params = cursor.execute.await_args_list[0].args
+    assert "LIMIT" not in sql
+    assert params == (False, "%50\\%%", "%50\\%%", "%50\\%%")
+
+@pytest.mark.asyncio
+async def test_list_skips_translations_for_empty_page(db):
+    conn, cursor = db
+    cursor.fetchall.return_value = []
+
+    items, _ = await answer_types.list(conn, limit=10)
+
+    assert items == []
+    cursor.execute.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_upsert_many_batches_writes_in_one_transaction(db):
+    conn, cursor = db
+    conn.begin, conn.commit, conn.rollback = AsyncMock(), AsyncMock(), AsyncMock()
+    rows = [
+        AnswerTypeImport(id=7, title="Choix multiple", title_fr="Choix multiple"),
+        AnswerTypeImport(id=8, title="Inconnu"),
+        AnswerTypeImport(title="Vrai ou faux"),
+        AnswerTypeImport(title="Échelle", title_fr="Échelle"),
+        AnswerTypeImport(title="echelle"),
+    ]
+    cursor.fetchall.side_effect = [
+        [(7, 7)],  # existing ids
+        [(3, "vrai-ou-faux")],  # existing slugs
+        [(21, "echelle")],  # ids of the inserted rows
+    ]
+
+    results = await answer_types.upsert_many(conn, rows, user_id=1)
+
+    assert results == [
+        UpsertResult(7, "updated"), UpsertResult(8, "not_found"), UpsertResult(3, "updated"),
+        UpsertResult(21, "created"), UpsertResult(None, "duplicate")
+    ]
+    upsert, insert, translations = [call.args for call in cursor.executemany.await_args_list]
+    assert "ON DUPLICATE KEY UPDATE" in upsert[0] and [row[0] for row in upsert[1]] == [7, 3]
+    assert [row[2] for row in insert[1]] == ["Échelle"]
+    assert [row[3:] for row in translations[1]] == [("7", "Choix multiple"), ("21", "Échelle")]
+    conn.begin.assert_awaited_once()
+    conn.commit.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_upsert_many_flags_rows_resolving_to_the_same_answer_type(db):
+    conn, cursor = db
+    conn.begin, conn.commit, conn.rollback = AsyncMock(), AsyncMock(), AsyncMock()
+    rows = [
+        AnswerTypeImport(id=5, title="Oui ou non", title_fr="Oui ou non"),
+        AnswerTypeImport(title="Type 5", title_fr="Type cinq"),  # slug of answer type 5
+    ]
+    cursor.fetchall.side_effect = [
+        [(5, 5)],  # existing ids
+        [(5, "type-5")],  # existing slugs
+    ]
+
+    results = await answer_types.upsert_many(conn, rows, user_id=1)
+
+    assert results == [UpsertResult(5, "updated"), UpsertResult(None, "duplicate")]
+    upsert, translations = [call.args for call in cursor.executemany.await_args_list]
+    assert [row[0] for row in upsert[1]] == [5]
+    assert [row[3:] for row in translations[1]] == [("5", "Oui ou non")]
+
+@pytest.mark.asyncio
+async def test_upsert_many_rolls_back_on_error(db):
+    conn, cursor = db
+    conn.begin, conn.commit, conn.rollback = AsyncMock(), AsyncMock(), AsyncMock()
+    cursor.fetchall.return_value = []
+    cursor.executemany.side_effect = RuntimeError("deadlock")
+
+    with pytest.raises(RuntimeError):
+        await answer_types.upsert_many(conn, [AnswerTypeImport(title="Nouveau")], user_id=1)
+
+    conn.rollback.assert_awaited_once()
+    conn.commit.assert_not_awaited()
@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from app.db.repositories import translation
+from app.db.repositories.lov import answer_type as answer_type_repository
+from app.db.repositories.lov.answer_type_search import FulltextAnswerTypeSearch, MemoryAnswerTypeSearch
+from app.core.pagination import encode_cursor
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(translation, "get_cached_data", AsyncMock(return_value=None))
+    monkeypatch.setattr(translation, "set_cached_data", AsyncMock())
+    monkeypatch.setattr(answer_type_repository, "invalidate_tags", AsyncMock())
+    cursor = AsyncMock()
+    conn = MagicMock()
+    conn.cursor.return_value.__aenter__.return_value = cursor
+    return conn, cursor
+
+@pytest.fixture
+def get_many(monkeypatch):
+    get_many = AsyncMock(side_effect=lambda db, ids, locale: [{"id": answer_type_id} for answer_type_id in ids])
+    monkeypatch.setattr(answer_type_repository.answer_types, "get_many", get_many)
+    return get_many
+
+INDEX_ROWS = [(1, "Choix multiple", None, "qcm", 1), (2, "Texte libre", "Réponse écrite", None, 0)]
+
+@pytest.mark.asyncio
+async def test_memory_search_builds_once_and_ranks(db, get_many):
+    conn, cursor = db
+    cursor.fetchone.return_value = (datetime(2024, 1, 1), 2)
+    cursor.fetchall.side_effect = [INDEX_ROWS, [("fr", "2", "title", "Réponse libre")]]
+    search = MemoryAnswerTypeSearch(check_interval=60)
+
+    items, next_cursor = await search.search(conn, "reponse")
+    assert items == [{"id": 2}] and next_cursor is None  # French title and description
+
+    items, _ = await search.search(conn, "QCM", is_valid=True)
+    assert items == [{"id": 1}]
+    assert cursor.execute.await_count == 3  # fingerprint, rows, translations: the second search uses the index
+
+@pytest.mark.asyncio
+async def test_memory_search_rebuilds_after_write_hook(db, get_many):
+    conn, cursor = db
+    cursor.fetchone.return_value = (datetime(2024, 1, 1), 2)
+    cursor.fetchall.side_effect = [INDEX_ROWS, [], [*INDEX_ROWS, (3, "Choix unique", None, None, 1)], []]
+    search = MemoryAnswerTypeSearch(check_interval=60)
+    answer_type_repository.answer_types.on_write(search.mark_stale)
+    try:
+        assert [item["id"] for item in (await search.search(conn, "choix"))[0]] == [1]
+        await answer_type_repository.answer_types.invalidate(3)
+        assert sorted(item["id"] for item in (await search.search(conn, "choix"))[0]) == [1, 3]
+    finally:
+        answer_type_repository.answer_types._write_hooks.remove(search.mark_stale)
+
+@pytest.mark.asyncio
+async def test_memory_search_notices_writes_of_other_workers(db, get_many):
+    conn, cursor = db
+    cursor.fetchone.side_effect = [(datetime(2024, 1, 1), 2), (datetime(2024, 1, 2), 2)]
+    cursor.fetchall.side_effect = [INDEX_ROWS, [], [(1, "Vrai ou faux", None, None, 1), INDEX_ROWS[1]], []]
+    search = MemoryAnswerTypeSearch(check_interval=0)
+
+    assert (await search.search(conn, "choix"))[0] == [{"id": 1}]
+    assert (await search.search(conn, "choix"))[0] == []
+
+@pytest.mark.asyncio
+async def test_fulltext_search_uses_boolean_prefix_query_and_keyset(db, get_many):
+    conn, cursor = db
+    cursor.fetchall.return_value = [(4, 2.5), (9, 1.25), (7, 1.25)]
+    search = FulltextAnswerTypeSearch()
+
+    items, next_cursor = await search.search(conn, "Réponse libre", is_valid=True, page_cursor=encode_cursor([3.0, 2]), limit=2)
+
+    assert items == [{"id": 4}, {"id": 9}] and next_cursor == encode_cursor([1.25, 9])
+    sql, params = cursor.execute.await_args.args
+    assert "IN BOOLEAN MODE" in sql and "ranked.score < %s" in sql
+    assert params == ["+reponse* +libre*", "+reponse* +libre*", True, 3.0, 3.0, 2, 3]
+
+@pytest.mark.asyncio
+async def test_fulltext_search_without_terms_skips_the_query(db, get_many):
+    conn, cursor = db
+    assert await FulltextAnswerTypeSearch().search(conn, "?!") == ([], None)
+    cursor.execute.assert_not_awaited()
@@ -0,0 +1,94 @@
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock
+from app.db import instrumentation
+from app.db.instrumentation import (
+    InstrumentedCursorMixin, QueryStatsMiddleware, RequestQueries, fingerprint, redact_params, request_queries
+)
+
+class FakeCursor:
+    """Stands in for aiomysql.Cursor: executemany() loops over execute() like the real one"""
+
+    def __init__(self, connection=None):
+        self.connection = connection
+        self.executed = []
+
+    async def execute(self, query, args=None):
+        self.executed.append((query, args))
+        return 1
+
+    async def executemany(self, query, args):
+        for row in args:
+            await self.execute(query, row)
+
+class TimedCursor(InstrumentedCursorMixin, FakeCursor):
+    pass
+
+def test_fingerprint_replaces_literals_and_value_lists():
+    assert fingerprint("SELECT  id FROM answer_type\n WHERE id IN (%s, %s, %s) AND title = 'x'") == (
+        "select id from answer_type where id in (...) and title = ?"
+    )
+    assert fingerprint("select id from answer_type where id in (%s)") == fingerprint("SELECT id FROM answer_type WHERE id IN (12, 13)")
+    assert fingerprint("SELECT * FROM t1 LIMIT 50") == "select * from t1 limit ?"
+
+def test_redact_params_keeps_types_and_lengths_only():
+    assert redact_params(("secret", 3, None, [1, 2])) == ["<str:6>", "<int>", None, ["<int>", "<int>"]]
+    assert redact_params({"email": "a@b.c"}) == {"email": "<str:5>"}
+    assert redact_params([("a", 1), ("b", 2)], many=True) == {"rows": 2, "first": ["<str:1>", "<int>"]}
+
+@pytest.mark.asyncio
+async def test_cursor_counts_executemany_once_and_logs_slow_queries(monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation.settings, "SQL_SLOW_QUERY_MS", 0)
+    queries = RequestQueries()
+    token = request_queries.set(queries)
+    try:
+        cursor = TimedCursor()
+        with caplog.at_level(logging.WARNING, logger=instrumentation.__name__):
+            await cursor.execute("SELECT title FROM answer_type WHERE slug = %s", ("top-secret",))
+            await cursor.executemany("UPDATE answer_type SET sort = %s WHERE id = %s", [(1, 1), (2, 2), (3, 3)])
+    finally:
+        request_queries.reset(token)
+
+    assert len(cursor.executed) == 4 and queries.count == 2
+    assert "top-secret" not in caplog.text and "<str:10>" in caplog.text
+    assert "'rows': 3" in caplog.text
+
+@pytest.mark.asyncio
+async def test_slow_select_is_explained_once_per_fingerprint(monkeypatch):
+    monkeypatch.setattr(instrumentation.settings, "SQL_SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(instrumentation.settings, "SQL_EXPLAIN_SLOW", True)
+    monkeypatch.setattr(instrumentation, "_explained", instrumentation.LRUCache(max_size=8, ttl=60))
+    explain_cursor = AsyncMock()
+    explain_cursor.description = [("id",), ("type",)]
+    explain_cursor.fetchall.return_value = [(1, "ALL")]
+    connection = MagicMock()
+    connection.cursor.return_value.__aenter__.return_value = explain_cursor
+    cursor = TimedCursor(connection)
+
+    await cursor.execute("SELECT * FROM answer_type WHERE id = %s", (1,))
+    await cursor.execute("SELECT * FROM answer_type WHERE id = %s", (2,))
+    await cursor.execute("DELETE FROM answer_type WHERE id = %s", (2,))
+
+    explain_cursor.execute.assert_awaited_once_with("EXPLAIN SELECT * FROM answer_type WHERE id = %s", (1,))
+
+def test_middleware_flags_repeated_fingerprints_in_debug_headers(monkeypatch):
+    monkeypatch.setattr(instrumentation.settings, "SQL_DEBUG_HEADERS", True)
+    monkeypatch.setattr(instrumentation.settings, "SQL_N_PLUS_ONE_THRESHOLD", 3)
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/test-queries")
+    async def loop():
+        cursor = TimedCursor()
+        await cursor.execute("SELECT COUNT(*) FROM answer_type")
+        for answer_type_id in range(4):
+            await cursor.execute("SELECT title FROM answer_type WHERE id = %s", (answer_type_id,))
+        return {}
+
+    response = TestClient(app).get("/test-queries")
+
+    assert response.headers["x-db-query-count"] == "5"
+    assert response.headers["x-db-n-plus-one"] == "4 x select title from answer_type where id = ?"
+    assert request_queries.get() is None
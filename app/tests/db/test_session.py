@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from app.db import session
+from app.core.errors import DatabaseError
+
+class FakePool:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.closed = False
+        self.released = []
+
+    async def acquire(self):
+        await asyncio.sleep(self.delay)
+        return MagicMock()
+
+    def release(self, conn):
+        self.released.append(conn)
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(session, "_pool", pool)
+    return pool
+
+@pytest.mark.asyncio
+async def test_connection_is_released_after_dependency(fake_pool):
+    dependency = session.get_db_connection()
+    conn = await dependency.__anext__()
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+    assert fake_pool.released == [conn]
+
+@pytest.mark.asyncio
+async def test_connection_is_released_on_error(fake_pool):
+    with pytest.raises(RuntimeError):
+        async with session.acquire_connection() as conn:
+            raise RuntimeError("query failed")
+    assert fake_pool.released == [conn]
+
+@pytest.mark.asyncio
+async def test_acquire_timeout_raises_database_error(fake_pool, monkeypatch):
+    fake_pool.delay = 1
+    monkeypatch.setattr(session.settings, "MYSQL_POOL_ACQUIRE_TIMEOUT", 0.01)
+    with pytest.raises(DatabaseError):
+        async with session.acquire_connection():
+            pass
+    assert fake_pool.released == []
+    assert session._waiters == 0
@@ -0,0 +1,57 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.db.repositories import translation
+from app.db.repositories.translation import TranslationRepository, negotiate_locale, parse_accept_language
+
+def test_parse_accept_language_orders_by_quality():
+    assert parse_accept_language("en;q=0.5, fr-CH, de;q=0.9, *;q=0.1, es;q=0") == ["fr", "de", "en"]
+    assert parse_accept_language(None) == []
+
+def test_negotiate_locale_falls_back_to_default():
+    assert negotiate_locale("de, en;q=0.8", supported=["fr", "en"], default="fr") == "en"
+    assert negotiate_locale("de", supported=["fr", "en"], default="fr") == "fr"
+
+@pytest.fixture
+def db():
+    cursor = AsyncMock()
+    conn = MagicMock()
+    conn.cursor.return_value.__aenter__.return_value = cursor
+    return conn, cursor
+
+@pytest.mark.asyncio
+async def test_fetch_batches_locales_and_fields(db):
+    conn, cursor = db
+    cursor.fetchall.return_value = [("fr", "1", "title", "Un"), ("en", "1", "label", "One")]
+    repository = TranslationRepository("App\\Entity\\Thing", fields=("title", "label"))
+
+    maps = await repository.fetch(conn, ["fr", "en"], foreign_keys=[1, 2])
+
+    assert maps == {"fr": {"1": {"title": "Un"}}, "en": {"1": {"label": "One"}}}
+    sql, params = cursor.execute.await_args.args
+    assert sql.index("locale IN") < sql.index("object_class = %s") < sql.index("foreign_key IN")
+    assert params == ["fr", "en", "App\\Entity\\Thing", "title", "label", "1", "2"]
+
+@pytest.mark.asyncio
+async def test_get_maps_loads_only_uncached_locales(db, monkeypatch):
+    conn, cursor = db
+    cursor.fetchall.return_value = [("en", "1", "title", "One")]
+    set_cached_data = AsyncMock()
+    monkeypatch.setattr(translation, "get_cached_data", AsyncMock(side_effect=[{"1": {"title": "Un"}}, None]))
+    monkeypatch.setattr(translation, "set_cached_data", set_cached_data)
+    repository = TranslationRepository("App\\Entity\\Thing", fields=("title",))
+
+    maps = await repository.get_maps(conn, ["fr", "en"])
+
+    assert maps == {"fr": {"1": {"title": "Un"}}, "en": {"1": {"title": "One"}}}
+    assert cursor.execute.await_args.args[1][0] == "en"
+    assert set_cached_data.await_args.kwargs["tags"] == ["translation:App\\Entity\\Thing"]
+
+@pytest.mark.asyncio
+async def test_save_skips_missing_values():
+    cursor = AsyncMock()
+    repository = TranslationRepository("App\\Entity\\Thing", fields=("title", "label"))
+
+    await repository.save(cursor, 3, "fr", {"title": "Trois", "label": None})
+
+    rows = cursor.executemany.await_args.args[1]
+    assert rows == [("fr", "App\\Entity\\Thing", "title", "3", "Trois")]
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from fastmcp import Client
+from app import mcp_server
+from app.core.errors import ServiceUnavailableError
+from app.db.repositories.lov import answer_type as answer_type_repository
+
+RECORD = {
+    "id": 12, "create_user": None, "update_user": None, "title": "Choix multiple", "title_fr": "Choix multiple",
+    "description": None, "keywords": None, "sort": 1, "revision": 0, "create_date": None, "update_date": None,
+    "is_valid": True, "conditional": "choix-multiple", "translations": {"fr": {}}
+}
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = MagicMock()
+    pool.acquire = AsyncMock(side_effect=lambda: MagicMock())
+    monkeypatch.setattr(mcp_server, "init_db_pool", AsyncMock(return_value=pool))
+    monkeypatch.setattr(mcp_server, "close_db_pool", AsyncMock())
+    monkeypatch.setattr(mcp_server, "redis", AsyncMock())
+    return pool
+
+@pytest.mark.asyncio
+async def test_lifespan_owns_the_pool_and_tools_borrow_from_it(pool, monkeypatch):
+    get = AsyncMock(return_value=RECORD)
+    monkeypatch.setattr(mcp_server.answer_types, "get", get)
+
+    async with Client(mcp_server.mcp) as client:
+        result = await client.call_tool("get_answer_type", {"answer_type_id": 12})
+        prompt = await client.get_prompt("explain_answer_type", {"answer_type_id": "12"})
+
+    assert not result.isError and json.loads(result.content[0].text) == RECORD
+    assert "Choix multiple" in prompt.messages[0].content.text
+    mcp_server.init_db_pool.assert_awaited_once()
+    mcp_server.close_db_pool.assert_awaited_once()
+    # The prompt reuses the tool result cached for the session: one connection, returned to the lifespan pool
+    assert pool.acquire.await_count == 1 and pool.release.call_count == 1
+    get.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_tool_connection_caps_concurrent_tools(monkeypatch):
+    monkeypatch.setattr(mcp_server.settings, "MCP_TOOL_QUEUE_TIMEOUT", 0.01)
+    pool = MagicMock()
+    pool.acquire = AsyncMock(return_value=MagicMock())
+    resources = mcp_server.MCPResources(pool, AsyncMock(), asyncio.Semaphore(1))
+    ctx = SimpleNamespace(request_context=SimpleNamespace(lifespan_context=resources))
+
+    async with mcp_server.tool_connection(ctx):
+        with pytest.raises(ServiceUnavailableError):
+            async with mcp_server.tool_connection(ctx):
+                pass
+    # The slot is free again once the first tool is done
+    async with mcp_server.tool_connection(ctx):
+        pass
+    assert pool.release.call_count == 2
+
+def record(answer_type_id, description=None):
+    return {**RECORD, "id": answer_type_id, "sort": answer_type_id, "description": description}
+
+def test_bounded_page_cuts_items_over_the_byte_budget():
+    items = [record(1, "x" * 300), record(2, "x" * 300), record(3, "x" * 300)]
+    cursors = ["after-1", "after-2", "after-3"]
+
+    page = mcp_server.bounded_page(items, cursors, "after-3", max_bytes=1500)
+
+    assert [item["id"] for item in page["items"]] == [1, 2]
+    assert page["next_cursor"] == "after-2" and page["truncated"]["omitted_items"] == 1
+    assert mcp_server.bounded_page(items, cursors, None, max_bytes=10**6) == {"items": items, "next_cursor": None}
+
+def test_bounded_page_compact_projection_and_long_fields(monkeypatch):
+    monkeypatch.setattr(mcp_server.settings, "MCP_FIELD_MAX_CHARS", 5)
+
+    compact = mcp_server.bounded_page([record(1, "long description")], ["c"], None, compact=True)
+    full = mcp_server.bounded_page([record(1, "long description")], ["c"], None)
+
+    assert compact["items"] == [{"id": 1, "title": "Choix multiple", "title_fr": "Choix multiple"}]
+    assert full["items"][0]["description"] == "long " + mcp_server._TRUNCATION_MARKER
+
+@pytest.mark.asyncio
+async def test_list_tool_pages_and_caches_per_session(pool, monkeypatch):
+    monkeypatch.setattr(answer_type_repository, "invalidate_tags", AsyncMock())
+    listing = AsyncMock(return_value=([record(1), record(2)], "next"))
+    monkeypatch.setattr(mcp_server.answer_types, "list", listing)
+
+    async with Client(mcp_server.mcp) as client:
+        first = await client.call_tool("list_answer_types", {"limit": 2, "compact": True})
+        again = await client.call_tool("list_answer_types", {"limit": 2, "compact": True})
+        await mcp_server.answer_types.invalidate(1)
+        await client.call_tool("list_answer_types", {"limit": 2, "compact": True})
+    async with Client(mcp_server.mcp) as client:
+        await client.call_tool("list_answer_types", {"limit": 2, "compact": True})
+
+    page = json.loads(first.content[0].text)
+    assert [item["id"] for item in page["items"]] == [1, 2] and page["next_cursor"] == "next"
+    assert set(page["items"][0]) == {"id", "title", "title_fr"}
+    assert again.content[0].text == first.content[0].text
+    # The repeated call is cached; after a write, and in a new session, the tool loads again
+    assert listing.await_count == 3
+    assert listing.await_args.kwargs == {"page_cursor": None, "limit": 2}
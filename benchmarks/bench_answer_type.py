@@ -0,0 +1,18 @@
+import pytest
+from slugify import slugify
+from app.db.repositories.lov.answer_type import _to_record
+from serialization import make_rows, make_translations
+
+@pytest.mark.parametrize("count", [1, 100, 10_000])
+def bench_rows_to_records(benchmark, count):
+    """The repository's row -> AnswerTypeRecord mapping, as list() runs it on a page"""
+    rows = make_rows(count)
+    translations = make_translations(count)
+    records = benchmark(lambda: [_to_record(row, translations, "en") for row in rows])
+    assert len(records) == count
+
+def bench_slugify_title(benchmark):
+    """create_answer_type derives `conditional` from the title"""
+    assert benchmark(slugify, "Question à choix multiple (réponse libre) — Évaluation") == (
+        "question-a-choix-multiple-reponse-libre-evaluation"
+    )
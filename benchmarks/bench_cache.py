@@ -0,0 +1,25 @@
+from app.core import cache
+from app.core.cache import get_cached_data, set_cached_data
+from app.db.repositories.lov.answer_type import _to_record
+from serialization import make_rows, make_translations
+
+def json_record(row, translations) -> dict:
+    record = _to_record(row, translations, "en")
+    return {**record, "create_date": record["create_date"].isoformat(), "update_date": record["update_date"].isoformat()}
+
+# A cached list response: one page of 50 records, as JSON-compatible values
+PAGE = {"items": [json_record(row, make_translations(50)) for row in make_rows(50)], "next_cursor": None}
+
+def bench_set_cached_data(benchmark, fake_redis):
+    benchmark.run_async(set_cached_data, "cache:bench:page", PAGE, expire=300, tags=["answer_type:list"])
+
+def bench_get_cached_data_l1(benchmark, fake_redis):
+    """Hit in the worker's LRU: no Redis round trip, no JSON decoding"""
+    benchmark.loop.run_until_complete(set_cached_data("cache:bench:page", PAGE))
+    assert benchmark.run_async(get_cached_data, "cache:bench:page") == PAGE
+
+def bench_get_cached_data_redis(benchmark, fake_redis, monkeypatch):
+    """L1 disabled: a Redis GET and json.loads per call"""
+    monkeypatch.setattr(cache, "local_cache", None)
+    benchmark.loop.run_until_complete(set_cached_data("cache:bench:page", PAGE))
+    assert benchmark.run_async(get_cached_data, "cache:bench:page") == PAGE
@@ -0,0 +1,18 @@
+import pytest
+from starlette.requests import Request
+from app.core.rate_limit import RateLimiter
+
+def make_request(client_ip: str = "10.0.0.1") -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "client": (client_ip, 40000)})
+
+@pytest.mark.parametrize("algorithm", ["sliding_window_counter", "sliding_window_log", "gcra"])
+def bench_is_rate_limited_exact(benchmark, fake_redis, algorithm):
+    # A budget no benchmark run exhausts, so every call takes the admit path
+    limiter = RateLimiter(requests_per_minute=10**9, burst_size=10**9, algorithm=algorithm, mode="exact")
+    assert not benchmark.run_async(limiter.is_rate_limited, make_request())
+    benchmark.loop.run_until_complete(limiter.close())
+
+def bench_is_rate_limited_approximate(benchmark, fake_redis):
+    limiter = RateLimiter(requests_per_minute=10**9, mode="approximate", sync_interval_ms=100)
+    assert not benchmark.run_async(limiter.is_rate_limited, make_request())
+    benchmark.loop.run_until_complete(limiter.close())
@@ -0,0 +1,29 @@
+import bcrypt
+import pytest
+from jose import jwt
+from app.core.config import settings
+from app.core.security import create_access_token, decode_access_token, forget_tokens, verify_password
+
+# Cost 10 keeps the suite short; production hashes (Symfony, cost 13) are 8x slower per call
+BCRYPT_ROUNDS = 10
+PASSWORD = "benchmark-password"
+HASH_2B = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(BCRYPT_ROUNDS)).decode()
+HASH_2Y = "$2y$" + HASH_2B[4:]
+
+@pytest.mark.parametrize("password_hash", [HASH_2Y, HASH_2B], ids=["2y", "2b"])
+def bench_verify_password(benchmark, password_hash):
+    assert benchmark(verify_password, PASSWORD, password_hash)
+
+def bench_create_access_token(benchmark):
+    benchmark(create_access_token, {"sub": "user1@example.com"})
+
+def bench_jwt_decode(benchmark):
+    token = create_access_token({"sub": "user1@example.com"})
+    claims = benchmark(jwt.decode, token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    assert claims["sub"] == "user1@example.com"
+
+def bench_decode_access_token_cached(benchmark):
+    """What get_current_user pays per request once the token has been verified"""
+    forget_tokens()
+    token = create_access_token({"sub": "user1@example.com"})
+    assert benchmark(decode_access_token, token)["sub"] == "user1@example.com"
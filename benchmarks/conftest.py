@@ -0,0 +1,172 @@
+"""
+`benchmark` fixture for the bench_*.py microbenchmarks (pytest-benchmark style, no plugin needed).
+
+    def bench_slugify(benchmark):
+        benchmark(slugify, "Question à choix multiple")
+
+    def bench_get_cached_data(benchmark):
+        benchmark.run_async(get_cached_data, "key")
+
+Each case is calibrated to run about --bench-min-time seconds per round, timed
+over --bench-rounds rounds, then run once more under tracemalloc. The summary
+reports ops/sec (best round), mean time per call, the peak memory one call
+allocates and the memory retained per call (a growing value is a leak).
+--bench-json saves the results; --bench-baseline compares with a saved file.
+
+Usage:
+    python -m pytest benchmarks [-k rate_limit] [--bench-json results.json] [--bench-baseline old.json]
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+_results: List[Dict[str, Any]] = []
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark")
+    group.addoption("--bench-min-time", type=float, default=0.1, help="seconds per round")
+    group.addoption("--bench-rounds", type=int, default=5)
+    group.addoption("--bench-json", help="save the results to this file")
+    group.addoption("--bench-baseline", help="compare with results saved by --bench-json")
+    group.addoption("--bench-tolerance", type=float, default=0.1, help="relative ops/sec drop flagged as a regression")
+
+class Benchmark:
+    def __init__(self, name: str, loop: asyncio.AbstractEventLoop, min_time: float, rounds: int):
+        self.name = name
+        self.loop = loop
+        self.min_time = min_time
+        self.rounds = rounds
+
+    def __call__(self, func: Callable, *args, **kwargs) -> Any:
+        """Benchmark func(*args, **kwargs); returns its result"""
+        def repeat(iterations: int) -> None:
+            for _ in range(iterations):
+                func(*args, **kwargs)
+
+        return self._measure(repeat, lambda: func(*args, **kwargs))
+
+    def run_async(self, func: Callable, *args, **kwargs) -> Any:
+        """Benchmark await func(*args, **kwargs) on the session's event loop; returns its result"""
+        async def repeat(iterations: int) -> None:
+            for _ in range(iterations):
+                await func(*args, **kwargs)
+
+        return self._measure(
+            lambda iterations: self.loop.run_until_complete(repeat(iterations)),
+            lambda: self.loop.run_until_complete(func(*args, **kwargs))
+        )
+
+    def _measure(self, repeat: Callable[[int], None], once: Callable[[], Any]) -> Any:
+        result = once()  # warm-up: caches, lazy imports, connections
+        iterations = 1
+        while True:
+            started = time.perf_counter()
+            repeat(iterations)
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.min_time / 10 or iterations >= 10**7:
+                break
+            iterations *= 10
+        iterations = max(1, int(iterations * self.min_time / elapsed)) if elapsed else iterations
+
+        timings = []
+        for _ in range(self.rounds):
+            started = time.perf_counter()
+            repeat(iterations)
+            timings.append((time.perf_counter() - started) / iterations)
+
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            once()
+            _, peak = tracemalloc.get_traced_memory()
+            sample = min(iterations, 1000)
+            before, _ = tracemalloc.get_traced_memory()
+            repeat(sample)
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        _results.append({
+            "name": self.name,
+            "ops_per_sec": round(1 / min(timings), 1),
+            "mean_us": round(statistics.mean(timings) * 1e6, 3),
+            "stdev_us": round(statistics.pstdev(timings) * 1e6, 3),
+            "iterations": iterations,
+            "rounds": self.rounds,
+            "peak_bytes": peak - baseline,
+            "retained_bytes_per_call": round((after - before) / sample, 1)
+        })
+        return result
+
+@pytest.fixture(scope="session")
+def event_loop_for_benchmarks():
+    # One loop for every async case: clients and pools stay bound to it
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="session")
+def fake_redis():
+    """app.core.cache.redis on fakeredis without injected latency: the cost of the client code itself"""
+    from fakes import install_fake_redis
+    return install_fake_redis(latency=0)
+
+@pytest.fixture
+def benchmark(request, event_loop_for_benchmarks) -> Benchmark:
+    config = request.config
+    return Benchmark(
+        request.node.name.removeprefix("bench_"), event_loop_for_benchmarks,
+        config.getoption("--bench-min-time"), config.getoption("--bench-rounds")
+    )
+
+def _format_rate(value: float) -> str:
+    for unit, scale in (("M", 1e6), ("k", 1e3)):
+        if value >= scale:
+            return f"{value / scale:.2f}{unit}"
+    return f"{value:.1f}"
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _results:
+        return
+    baseline = {}
+    if config.getoption("--bench-baseline"):
+        with open(config.getoption("--bench-baseline")) as file:
+            baseline = {result["name"]: result for result in json.load(file)["results"]}
+    tolerance = config.getoption("--bench-tolerance")
+
+    write = terminalreporter.write_line
+    terminalreporter.section("microbenchmarks")
+    width = max(len(result["name"]) for result in _results)
+    write(f"{'case':<{width}} {'ops/sec':>9} {'mean us':>11} {'peak B':>10} {'kept B/call':>11}" + ("  vs baseline" if baseline else ""))
+    regressions = []
+    for result in _results:
+        line = (
+            f"{result['name']:<{width}} {_format_rate(result['ops_per_sec']):>9} {result['mean_us']:>11.2f} "
+            f"{result['peak_bytes']:>10} {result['retained_bytes_per_call']:>11.1f}"
+        )
+        before = baseline.get(result["name"])
+        if before:
+            change = result["ops_per_sec"] / before["ops_per_sec"] - 1
+            line += f"  {change:+7.1%}"
+            if change < -tolerance:
+                line += "  REGRESSION"
+                regressions.append(result["name"])
+        write(line)
+    if regressions:
+        write(f"{len(regressions)} case(s) slower than the baseline by more than {tolerance:.0%}: {', '.join(regressions)}")
+
+    if config.getoption("--bench-json"):
+        with open(config.getoption("--bench-json"), "w") as file:
+            json.dump({"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "results": _results}, file, indent=2)
+        write(f"results: {config.getoption('--bench-json')}")
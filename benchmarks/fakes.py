@@ -0,0 +1,376 @@
+"""
+Deterministic in-process stand-ins for MySQL and Redis, for benchmarks.
+
+FakeDataset holds fos_user, answer_type and ext_translations rows generated
+from a seed and answers the statements the API sends (matched by their
+app.db.instrumentation fingerprint). FakePool replaces the aiomysql pool of
+app.db.session; its cursors go through the same SQL instrumentation as the
+real ones. Redis is fakeredis (Lua included, for the rate limiter scripts)
+behind the existing app.core.cache client. Both add a configurable round-trip
+latency, so the event loop sees the awaits it would see in production.
+
+Extra dependency: pip install "fakeredis[lua]"
+"""
+
+import asyncio
+import bisect
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import bcrypt
+from app.core import cache
+from app.db import session
+from app.db.instrumentation import InstrumentedCursorMixin, fingerprint
+from app.db.repositories.lov.answer_type import ANSWER_TYPE_CLASS
+
+PASSWORD = "benchmark-password"
+
+# answer_type columns, in the order of the rows kept by FakeDataset
+(AT_ID, AT_CREATE_USER, AT_UPDATE_USER, AT_TITLE, AT_DESCRIPTION, AT_KEYWORDS, AT_SORT, AT_REVISION,
+ AT_CREATE_DATE, AT_UPDATE_DATE, AT_IS_VALID, AT_CONDITIONAL) = range(12)
+
+class FakeResult:
+    """What one statement returns: rows plus the cursor attributes callers read"""
+
+    __slots__ = ("rows", "rowcount", "lastrowid")
+
+    def __init__(self, rows: Sequence[tuple] = (), rowcount: Optional[int] = None, lastrowid: Optional[int] = None):
+        self.rows = list(rows)
+        self.rowcount = len(self.rows) if rowcount is None else rowcount
+        self.lastrowid = lastrowid
+
+class FakeDataset:
+    """
+    Tables generated from `seed`: `users` fos_user rows (user{id}@example.com,
+    password PASSWORD) and `answer_types` answer types, every other one with a
+    French title. Unknown statements raise NotImplementedError with their
+    fingerprint, so a new query shape is noticed instead of silently answered.
+    """
+
+    def __init__(self, answer_types: int = 100_000, users: int = 50_000, bcrypt_rounds: int = 13, seed: int = 1):
+        rng = random.Random(seed)
+        # One hash for everyone (Symfony's $2y$ prefix): hashing 50k passwords would dominate setup
+        self.password_hash = "$2y$" + bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(bcrypt_rounds)).decode()[4:]
+        self.users: Dict[int, tuple] = {}
+        self.users_by_login: Dict[str, int] = {}
+        for user_id in range(1, users + 1):
+            email = f"user{user_id}@example.com"
+            # id, email, username, firstname, lastname, roles, enabled, is_valid
+            self.users[user_id] = (user_id, email, f"user{user_id}", f"First{user_id}", f"Last{user_id}", '["ROLE_USER"]', 1, 1)
+            self.users_by_login[email] = self.users_by_login[f"user{user_id}"] = user_id
+
+        start = datetime(2024, 1, 1)
+        self.answer_types: Dict[int, list] = {}
+        # (locale, object_class, field) -> {foreign_key: content}
+        self.translations: Dict[Tuple[str, str, str], Dict[str, str]] = {}
+        titles_fr = self.translations[("fr", ANSWER_TYPE_CLASS, "title")] = {}
+        for answer_type_id in range(1, answer_types + 1):
+            user_id = rng.randint(1, users) if users else None
+            created = start + timedelta(minutes=answer_type_id)
+            self.answer_types[answer_type_id] = [
+                answer_type_id, user_id, user_id, f"Answer type {answer_type_id}", "Description " * rng.randint(1, 8),
+                "kw1, kw2" if answer_type_id % 3 else None, rng.randint(0, 1000), 0, created, created,
+                answer_type_id % 10 != 0, f"answer-type-{answer_type_id}"
+            ]
+            if answer_type_id % 2:
+                titles_fr[str(answer_type_id)] = f"Type de réponse {answer_type_id}"
+        # (sort, id) keys in list order, kept sorted across writes
+        self.order: List[Tuple[int, int]] = sorted((row[AT_SORT], row[AT_ID]) for row in self.answer_types.values())
+        self.next_id = answer_types + 1
+        self.last_update = max((row[AT_UPDATE_DATE] for row in self.answer_types.values()), default=None)
+        self._handlers = (
+            ("select id, email, password, ldap_user", self._login_user),
+            ("select id, email, username, firstname", self._principal),
+            ("select max(update_date), count(*) from answer_type", self._fingerprint),
+            ("select revision, update_date from answer_type where id = ?", self._version),
+            ("select at.id, cu.id", self._answer_types),
+            ("select locale, foreign_key, field, content from ext_translations", self._translations),
+            ("insert into answer_type (create_user_id", self._insert_answer_type),
+            ("update answer_type set update_user_id=?", self._update_answer_type),
+            ("update answer_type set is_valid = false", lambda sql, args: self._set_valid(args, False)),
+            ("update answer_type set is_valid = true", lambda sql, args: self._set_valid(args, True)),
+            ("insert into ext_translations", self._save_translation),
+        )
+
+    def run(self, sql: str, args: Any = None) -> FakeResult:
+        statement = fingerprint(sql)
+        args = list(args or ())
+        for prefix, handler in self._handlers:
+            if statement.startswith(prefix):
+                return handler(sql, args)
+        raise NotImplementedError(f"FakeDataset has no handler for: {statement}")
+
+    # fos_user
+
+    def _user(self, login: str) -> Optional[tuple]:
+        user_id = self.users_by_login.get(login)
+        return self.users[user_id] if user_id is not None else None
+
+    def _login_user(self, sql, args) -> FakeResult:
+        user = self._user(args[0])
+        return FakeResult([(user[0], user[1], self.password_hash, 0, None)] if user else [])
+
+    def _principal(self, sql, args) -> FakeResult:
+        user = self._user(args[0])
+        return FakeResult([user] if user else [])
+
+    # answer_type
+
+    def _joined(self, row: list) -> tuple:
+        create_user = self.users.get(row[AT_CREATE_USER])
+        update_user = self.users.get(row[AT_UPDATE_USER])
+        return (
+            row[AT_ID],
+            *((create_user[0], create_user[3], create_user[4]) if create_user else (None, None, None)),
+            *((update_user[0], update_user[3], update_user[4]) if update_user else (None, None, None)),
+            row[AT_TITLE], row[AT_DESCRIPTION], row[AT_KEYWORDS], row[AT_SORT], row[AT_REVISION],
+            row[AT_CREATE_DATE], row[AT_UPDATE_DATE], row[AT_IS_VALID], row[AT_CONDITIONAL]
+        )
+
+    def _touch(self, when: datetime) -> None:
+        if self.last_update is None or when > self.last_update:
+            self.last_update = when
+
+    def _fingerprint(self, sql, args) -> FakeResult:
+        return FakeResult([(self.last_update, len(self.answer_types))])
+
+    def _version(self, sql, args) -> FakeResult:
+        row = self.answer_types.get(args[0])
+        return FakeResult([(row[AT_REVISION], row[AT_UPDATE_DATE])] if row else [])
+
+    def _answer_types(self, sql, args) -> FakeResult:
+        """The repository join: by id (get_many) or a keyset page of list() filtered on is_valid"""
+        if "at.id IN" in sql:
+            return FakeResult([self._joined(self.answer_types[i]) for i in args if i in self.answer_types])
+        unsupported = [condition for condition in ("LIKE", "update_date >", "update_date <") if condition in sql]
+        if unsupported:
+            raise NotImplementedError(f"FakeDataset does not filter on {unsupported}")
+        start = 0
+        if "at.sort IS NULL" in sql:
+            args.pop(0)  # no NULL sort values here: every row comes after the cursor
+        elif "at.sort >" in sql:
+            last_sort, _, last_id = args[:3]
+            del args[:3]
+            start = bisect.bisect_right(self.order, (last_sort, last_id))
+        is_valid = args.pop(0) if "at.is_valid = %s" in sql else None
+        limit = args.pop(0) if "LIMIT" in sql else None
+        rows = []
+        for _, answer_type_id in self.order[start:]:
+            row = self.answer_types[answer_type_id]
+            if is_valid is not None and bool(row[AT_IS_VALID]) != bool(is_valid):
+                continue
+            rows.append(self._joined(row))
+            if limit is not None and len(rows) == limit:
+                break
+        return FakeResult(rows)
+
+    def _insert_answer_type(self, sql, args) -> FakeResult:
+        answer_type_id = self.next_id
+        self.next_id += 1
+        self.answer_types[answer_type_id] = [answer_type_id, *args]
+        bisect.insort(self.order, (args[AT_SORT - 1], answer_type_id))
+        self._touch(args[AT_UPDATE_DATE - 1])
+        return FakeResult(rowcount=1, lastrowid=answer_type_id)
+
+    def _update_answer_type(self, sql, args) -> FakeResult:
+        user_id, title, description, keywords, sort, now, answer_type_id = args
+        row = self.answer_types.get(answer_type_id)
+        if row is None:
+            return FakeResult(rowcount=0)
+        self.order.remove((row[AT_SORT], answer_type_id))
+        bisect.insort(self.order, (sort, answer_type_id))
+        row[AT_UPDATE_USER], row[AT_TITLE], row[AT_DESCRIPTION], row[AT_KEYWORDS], row[AT_SORT] = (
+            user_id, title, description, keywords, sort
+        )
+        row[AT_REVISION] = (row[AT_REVISION] or 0) + 1
+        row[AT_UPDATE_DATE] = now
+        self._touch(now)
+        return FakeResult(rowcount=1)
+
+    def _set_valid(self, args, is_valid: bool) -> FakeResult:
+        user_id, now, answer_type_id = args
+        row = self.answer_types.get(answer_type_id)
+        if row is None or bool(row[AT_IS_VALID]) == is_valid:
+            return FakeResult(rowcount=0)
+        row[AT_IS_VALID], row[AT_UPDATE_USER], row[AT_UPDATE_DATE] = is_valid, user_id, now
+        self._touch(now)
+        return FakeResult(rowcount=1)
+
+    # ext_translations
+
+    def _translations(self, sql, args) -> FakeResult:
+        """TranslationRepository.fetch: locales, object class, fields and optional foreign keys"""
+        locale_count = sql.split("locale IN (", 1)[1].split(")", 1)[0].count("%s")
+        field_count = sql.split("field IN (", 1)[1].split(")", 1)[0].count("%s")
+        locales = set(args[:locale_count])
+        object_class = args[locale_count]
+        fields = set(args[locale_count + 1:locale_count + 1 + field_count])
+        foreign_keys = args[locale_count + 1 + field_count:] if "foreign_key IN" in sql else None
+        rows = []
+        for locale in locales:
+            for field in fields:
+                contents = self.translations.get((locale, object_class, field), {})
+                if foreign_keys is None:
+                    rows.extend((locale, foreign_key, field, content) for foreign_key, content in contents.items())
+                else:
+                    rows.extend((locale, key, field, contents[key]) for key in foreign_keys if key in contents)
+        return FakeResult(rows)
+
+    def _save_translation(self, sql, args) -> FakeResult:
+        locale, object_class, field, foreign_key, content = args
+        self.translations.setdefault((locale, object_class, field), {})[foreign_key] = content
+        return FakeResult(rowcount=1)
+
+class _FakeCursorBase:
+    """The part of aiomysql's Cursor the repositories use, one `latency` sleep per round trip"""
+
+    def __init__(self, connection: "FakeConnection"):
+        self.connection = connection
+        self.description = None
+        self.rowcount = -1
+        self.lastrowid = None
+        self._rows: List[tuple] = []
+        self._position = 0
+
+    async def execute(self, query, args=None):
+        await asyncio.sleep(self.connection.latency)
+        result = self.connection.dataset.run(query, args)
+        self._set(result)
+        return result.rowcount
+
+    async def executemany(self, query, args):
+        # One multi-row statement on the wire, as aiomysql sends INSERT ... VALUES batches
+        await asyncio.sleep(self.connection.latency)
+        rowcount = 0
+        for row in args:
+            rowcount += self.connection.dataset.run(query, row).rowcount
+        self._set(FakeResult(rowcount=rowcount))
+        return rowcount
+
+    def _set(self, result: FakeResult) -> None:
+        self._rows, self._position = result.rows, 0
+        self.rowcount, self.lastrowid = result.rowcount, result.lastrowid
+        self.description = [(f"column_{index}",) for index in range(len(result.rows[0]))] if result.rows else None
+
+    async def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        self._position += 1
+        return self._rows[self._position - 1]
+
+    async def fetchmany(self, size: int = 1):
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    async def fetchall(self):
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    async def close(self) -> None:
+        self._rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+class FakeCursor(InstrumentedCursorMixin, _FakeCursorBase):
+    """Timed and counted like the pool's InstrumentedCursor"""
+
+class FakeConnection:
+    def __init__(self, dataset: FakeDataset, latency: float):
+        self.dataset = dataset
+        self.latency = latency
+        self.closed = False
+
+    def cursor(self, *cursor_classes) -> FakeCursor:
+        # Buffered and server-side cursors behave alike on in-memory rows
+        return FakeCursor(self)
+
+    async def begin(self) -> None:
+        await asyncio.sleep(self.latency)
+
+    async def commit(self) -> None:
+        await asyncio.sleep(self.latency)
+
+    async def rollback(self) -> None:
+        await asyncio.sleep(self.latency)
+
+    def close(self) -> None:
+        self.closed = True
+
+class FakePool:
+    """Bounded pool of FakeConnections with the attributes get_pool_stats reads"""
+
+    def __init__(self, dataset: FakeDataset, latency: float = 0.0005, maxsize: int = 10, minsize: int = 1):
+        self.dataset = dataset
+        self.latency = latency
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self.size = 0
+        self.closed = False
+        self._free: "asyncio.Queue[FakeConnection]" = asyncio.Queue()
+
+    @property
+    def freesize(self) -> int:
+        return self._free.qsize()
+
+    async def acquire(self) -> FakeConnection:
+        if self._free.empty() and self.size < self.maxsize:
+            self.size += 1
+            return FakeConnection(self.dataset, self.latency)
+        return await self._free.get()
+
+    def release(self, conn: FakeConnection) -> None:
+        if conn.closed:
+            self.size -= 1  # dropped (abandoned stream): a new one is opened on demand
+        else:
+            self._free.put_nowait(conn)
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def wait_closed(self) -> None:
+        pass
+
+def install_fake_mysql(dataset: FakeDataset, latency: float = 0.0005, maxsize: int = 10) -> FakePool:
+    """Make app.db.session hand out FakeConnections (call from inside the running event loop)"""
+    pool = FakePool(dataset, latency, maxsize)
+    session._pool = pool
+    return pool
+
+def install_fake_redis(latency: float = 0.0002) -> Any:
+    """
+    Point app.core.cache.redis (shared by the cache, rate limiter and principal
+    lookups) at an empty fakeredis server, with `latency` per command or pipeline.
+    """
+    from fakeredis import aioredis as fakeredis
+
+    client = cache.redis
+    client.connection_pool = fakeredis.FakeRedis(decode_responses=True, encoding="utf-8").connection_pool
+    execute_command = client.execute_command
+    pipeline = client.pipeline
+
+    async def delayed_execute_command(*args, **options):
+        await asyncio.sleep(latency)
+        return await execute_command(*args, **options)
+
+    def delayed_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def delayed_execute(*execute_args, **execute_kwargs):
+            await asyncio.sleep(latency)
+            return await execute(*execute_args, **execute_kwargs)
+
+        pipe.execute = delayed_execute
+        return pipe
+
+    client.execute_command = delayed_execute_command
+    client.pipeline = delayed_pipeline
+    if cache.local_cache is not None:
+        cache.local_cache.clear()
+    return client
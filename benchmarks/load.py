@@ -0,0 +1,282 @@
+"""
+End-to-end load benchmark: app.main.app in-process over ASGI, MySQL and Redis faked.
+
+Each scenario runs --requests requests from --concurrency virtual users (one
+httpx client, client IP and user account each) after --warmup unrecorded ones,
+and reports throughput, latency percentiles, status codes and SQL statements
+per request. Results are saved as JSON; with --baseline they are compared with
+an earlier run and the exit status is 1 when a scenario regressed by more than
+--tolerance (throughput down, or p95/p99 up).
+
+Scenarios:
+    login       POST /auth/token storm (bcrypt on the password executor)
+    reads       authenticated list pages (following next_cursor) and detail reads
+    mixed       reads with 20% writes: updates, creates, disable/enable
+
+Usage:
+    python benchmarks/load.py [--scenarios login,reads,mixed] [--requests 2000] [--concurrency 50]
+        [--answer-types 100000] [--users 50000] [--db-latency-ms 0.5] [--redis-latency-ms 0.2]
+        [--output results.json] [--baseline benchmarks/results/baseline.json]
+
+Requires httpx and fakeredis[lua] (see benchmarks/fakes.py).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from app import main
+from app.core.config import settings
+from app.core.rate_limit import close_rate_limiters
+from app.core.security import create_access_token, shutdown_password_executor
+from app.db.instrumentation import db_query_duration
+from fakes import PASSWORD, FakeDataset, install_fake_mysql, install_fake_redis
+
+ANSWER_TYPES = f"{settings.API_V1_STR}/answer-type/answer-types"
+LOGIN = f"{settings.API_V1_STR}/auth/token"
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+class VirtualUser:
+    """One simulated client: its own connection state, IP (rate-limit identity) and account"""
+
+    def __init__(self, index: int, user_id: int, seed: int):
+        self.user_id = user_id
+        self.email = f"user{user_id}@example.com"
+        self.rng = random.Random(seed * 100_003 + index)
+        self.next_cursor: Optional[str] = None
+        transport = httpx.ASGITransport(app=main.app, client=(f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}", 40000))
+        self.auth = {"Authorization": f"Bearer {create_access_token({'sub': self.email})}"}
+        self.client = httpx.AsyncClient(transport=transport, base_url="http://benchmark")
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+# A scenario step sends one request and returns its response
+
+async def login(user: VirtualUser, dataset: FakeDataset) -> httpx.Response:
+    return await user.client.post(LOGIN, data={"username": user.email, "password": PASSWORD})
+
+async def read(user: VirtualUser, dataset: FakeDataset) -> httpx.Response:
+    """30% list pages (half of them continue the previous page), 70% detail reads"""
+    headers = {**user.auth, "Accept-Language": user.rng.choice(("fr", "en"))}
+    if user.rng.random() < 0.3:
+        params = {"limit": 50}
+        if user.next_cursor and user.rng.random() < 0.5:
+            params["cursor"] = user.next_cursor
+        response = await user.client.get(ANSWER_TYPES, params=params, headers=headers)
+        if response.status_code == 200:
+            user.next_cursor = response.json()["next_cursor"]
+        return response
+    answer_type_id = user.rng.randint(1, dataset.next_id - 1)
+    return await user.client.get(f"{ANSWER_TYPES}/{answer_type_id}", headers=headers)
+
+async def mixed(user: VirtualUser, dataset: FakeDataset) -> httpx.Response:
+    """80% reads, 10% updates, 5% creates, 5% disable or enable"""
+    draw = user.rng.random()
+    if draw < 0.8:
+        return await read(user, dataset)
+    answer_type_id = user.rng.randint(1, dataset.next_id - 1)
+    body = {
+        "title": f"Answer type {answer_type_id} ({user.rng.randint(1, 10**6)})",
+        "title_fr": f"Type de réponse {answer_type_id}",
+        "description": "Updated by the load benchmark",
+        "keywords": "benchmark",
+        "sort": user.rng.randint(0, 1000)
+    }
+    if draw < 0.9:
+        return await user.client.put(f"{ANSWER_TYPES}/{answer_type_id}", json=body, headers=user.auth)
+    if draw < 0.95:
+        return await user.client.post(ANSWER_TYPES, json=body, headers=user.auth)
+    action = user.rng.choice(("disable", "enable"))
+    return await user.client.post(f"{ANSWER_TYPES}/{answer_type_id}/{action}", headers=user.auth)
+
+SCENARIOS: Dict[str, Callable[[VirtualUser, FakeDataset], Any]] = {"login": login, "reads": read, "mixed": mixed}
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def statements_executed() -> int:
+    return sum(db_query_duration.count(statement) for statement in ("select", "insert", "update", "delete", "replace", "other"))
+
+async def run_scenario(name: str, users: List[VirtualUser], dataset: FakeDataset, requests: int, warmup: int) -> Dict[str, Any]:
+    step = SCENARIOS[name]
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = 0
+    record = False
+
+    async def worker(user: VirtualUser) -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                status = str((await step(user, dataset)).status_code)
+            except Exception as e:
+                status = type(e).__name__
+            if record:
+                latencies.append(time.perf_counter() - started)
+                statuses[status] += 1
+
+    remaining = warmup
+    await asyncio.gather(*(worker(user) for user in users))
+    record, remaining = True, requests
+    statements = statements_executed()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(user) for user in users))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 500)
+    return {
+        "requests": len(latencies),
+        "concurrency": len(users),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            **{f"p{p}": round(percentile(latencies, p) * 1000, 2) for p in (50, 95, 99)},
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0
+        },
+        "statuses": dict(sorted(statuses.items())),
+        "errors": errors,
+        "db_statements_per_request": round((statements_executed() - statements) / len(latencies), 2) if latencies else 0.0
+    }
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Print the change of each scenario against the baseline; returns the regressions"""
+    regressions = []
+    print(f"\nagainst {baseline['meta'].get('revision') or 'baseline'} ({baseline['meta']['timestamp']}), tolerance {tolerance:.0%}")
+    print(f"{'scenario':<10} {'rps':>16} {'p95 ms':>18} {'p99 ms':>18}")
+    for name, result in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"{name:<10} (not in baseline)")
+            continue
+        changes = {
+            "rps": (before["throughput_rps"], result["throughput_rps"], -1),
+            "p95": (before["latency_ms"]["p95"], result["latency_ms"]["p95"], 1),
+            "p99": (before["latency_ms"]["p99"], result["latency_ms"]["p99"], 1),
+        }
+        cells = []
+        for metric, (old, new, worse) in changes.items():
+            change = (new - old) / old if old else 0.0
+            if change * worse > tolerance:
+                regressions.append(f"{name} {metric}: {old} -> {new} ({change:+.0%})")
+            cells.append(f"{new:>8} ({change:+6.1%})")
+        print(f"{name:<10} " + " ".join(cells))
+    return regressions
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    started = time.perf_counter()
+    dataset = FakeDataset(args.answer_types, args.users, args.bcrypt_rounds, args.seed)
+    print(f"dataset: {args.answer_types} answer types, {args.users} users ({time.perf_counter() - started:.1f}s)")
+    install_fake_mysql(dataset, args.db_latency_ms / 1000, settings.MYSQL_POOL_MAX_SIZE)
+    install_fake_redis(args.redis_latency_ms / 1000)
+    if not args.rate_limit:
+        main.rate_limit_middleware = lambda request, call_next: call_next(request)
+
+    rng = random.Random(args.seed)
+    accounts = rng.sample(range(1, args.users + 1), args.concurrency)
+    users = [VirtualUser(index, user_id, args.seed) for index, user_id in enumerate(accounts)]
+    results = {"scenarios": {}}
+    try:
+        for name in args.scenarios:
+            results["scenarios"][name] = result = await run_scenario(name, users, dataset, args.requests, args.warmup)
+            latency = result["latency_ms"]
+            print(
+                f"{name:<8} {result['throughput_rps']:>9.1f} req/s  p50 {latency['p50']:>8.2f}  p95 {latency['p95']:>8.2f}  "
+                f"p99 {latency['p99']:>8.2f} ms  {result['db_statements_per_request']:>5.2f} stmt/req  {result['statuses']}"
+            )
+    finally:
+        for user in users:
+            await user.close()
+        await close_rate_limiters()
+    return results
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000, help="recorded requests per scenario")
+    parser.add_argument("--warmup", type=int, default=200, help="unrecorded requests before each scenario")
+    parser.add_argument("--concurrency", type=int, default=50, help="virtual users")
+    parser.add_argument("--answer-types", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--bcrypt-rounds", type=int, default=13, help="cost of the users' password hash")
+    parser.add_argument("--db-latency-ms", type=float, default=0.5, help="per statement round trip")
+    parser.add_argument("--redis-latency-ms", type=float, default=0.2, help="per command or pipeline")
+    parser.add_argument("--rate-limit", action="store_true", help="keep rate limiting on (429s are reported, not errors)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/load-<timestamp>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative regression")
+    parser.add_argument(
+        "--slow-query-ms", type=float, default=math.inf,
+        help="slow-query log threshold (default off: under saturation it mostly measures event-loop waits)"
+    )
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if args.concurrency > args.users:
+        parser.error("--concurrency cannot exceed --users (one account per virtual user)")
+    logging.getLogger().setLevel(args.log_level)
+    settings.SQL_SLOW_QUERY_MS = args.slow_query_ms
+
+    results = asyncio.run(run(args))
+    shutdown_password_executor()
+    timestamp = datetime.now(timezone.utc)
+    results = {
+        "meta": {
+            "timestamp": timestamp.isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "log_level", "slow_query_ms")}
+        },
+        **results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{timestamp:%Y%m%dT%H%M%SZ}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"results: {output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print("regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main_cli()
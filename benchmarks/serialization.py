@@ -0,0 +1,134 @@
+"""
+Serialization benchmark for large answer type lists.
+
+Compares, per row, the validated path (AnswerType/UserShort constructors,
+FastAPI's response_model re-validation and stdlib json) with the fast path
+(plain AnswerTypeRecord dicts + TypeAdapter.dump_json) used by the list endpoint.
+
+Usage:
+    python benchmarks/serialization.py [--rows 10000] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.core.serialization import dump_json
+from app.db.repositories.lov.answer_type import _to_record
+from app.models.lov.answer_type import AnswerType, AnswerTypePage, AnswerTypeRecordPage, UserShort
+
+def make_rows(count: int) -> list:
+    start = datetime(2024, 1, 1)
+    return [
+        (
+            i, 1, "Ada", "Lovelace", 2, "Alan", "Turing",
+            f"Answer type {i}", "Description " * 4, "kw1, kw2", i % 50, i % 7,
+            start + timedelta(minutes=i), start + timedelta(minutes=2 * i), i % 3 != 0, f"answer-type-{i}"
+        )
+        for i in range(1, count + 1)
+    ]
+
+def make_translations(count: int) -> dict:
+    return {"fr": {str(i): {"title": f"Type de réponse {i}"} for i in range(1, count + 1, 2)}, "en": {}}
+
+def validated_models(rows, translations, locale="en"):
+    """The models as the endpoints built them before the fast path"""
+    items = []
+    for row in rows:
+        key = str(row[0])
+        items.append(AnswerType(
+            id=row[0],
+            create_user=UserShort(user_id=row[1], firstname=row[2], lastname=row[3]) if row[1] else None,
+            update_user=UserShort(user_id=row[4], firstname=row[5], lastname=row[6]) if row[4] else None,
+            title=row[7],
+            title_fr=translations["fr"].get(key, {}).get("title"),
+            description=row[8],
+            keywords=row[9],
+            sort=row[10],
+            revision=row[11],
+            create_date=row[12],
+            update_date=row[13],
+            is_valid=bool(row[14]),
+            conditional=row[15],
+            translations={locale: translations[locale].get(key, {})}
+        ))
+    return items
+
+RESPONSE_FIELD = create_model_field("Response_list_answer_types", AnswerTypePage, mode="serialization")
+
+def validated_path(rows, translations) -> bytes:
+    page = AnswerTypePage(items=validated_models(rows, translations), next_cursor=None)
+    content = asyncio.run(serialize_response(field=RESPONSE_FIELD, response_content=page))
+    return JSONResponse(content).body
+
+def construct_path(rows, translations) -> bytes:
+    """model_construct instead of validation, for reference"""
+    items = [
+        AnswerType.model_construct(
+            **{
+                **record,
+                "create_user": UserShort.model_construct(**record["create_user"]) if record["create_user"] else None,
+                "update_user": UserShort.model_construct(**record["update_user"]) if record["update_user"] else None
+            }
+        )
+        for record in (_to_record(row, translations, "en") for row in rows)
+    ]
+    return dump_json(AnswerTypePage.model_construct(items=items, next_cursor=None))
+
+def fast_path(rows, translations) -> bytes:
+    items = [_to_record(row, translations, "en") for row in rows]
+    return dump_json({"items": items, "next_cursor": None}, AnswerTypeRecordPage)
+
+def measure(func, rows, translations, repeat: int) -> dict:
+    func(rows, translations)  # warm-up (adapters, caches)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(rows, translations)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    body = func(rows, translations)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = min(timings)
+    return {
+        "us_per_row": best / len(rows) * 1e6,
+        "total_ms": best * 1000,
+        "peak_bytes_per_row": peak / len(rows),
+        "bytes": len(body)
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    translations = make_translations(args.rows)
+    paths = {"validated": validated_path, "construct": construct_path, "fast": fast_path}
+    expected = validated_path(rows, translations)
+    assert all(path(rows, translations) == expected for path in paths.values()), "paths must produce identical JSON"
+
+    results = {name: measure(path, rows, translations, args.repeat) for name, path in paths.items()}
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"{'path':<10} {'us/row':>8} {'total ms':>9} {'peak B/row':>11} {'bytes':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<10} {result['us_per_row']:>8.2f} {result['total_ms']:>9.1f} "
+            f"{result['peak_bytes_per_row']:>11.0f} {result['bytes']:>10}"
+        )
+    speedup = results["validated"]["us_per_row"] / results["fast"]["us_per_row"]
+    print(f"fast path: {speedup:.1f}x less CPU per row")
+
+if __name__ == "__main__":
+    main()